@@ -0,0 +1,109 @@
+# backend/annotations.py — writing located issues onto a page as PDF annotations
+#
+#   each    — one highlight (all of the excerpt's line rects) + one sticky note per issue
+#   grouped — per page, one multi-quad highlight per issue type, and one note per cluster
+#             of nearby issues; pages with hundreds of spacing hits stay at a handful of
+#             annotation objects, which keeps viewers responsive and the file small
+#
+# Both functions take the page's issues already located, as (issue, rects) pairs, and return
+# how many annotation objects they added.
+import os
+from typing import Any, Dict, List, Sequence, Tuple
+
+import fitz  # PyMuPDF
+
+ANNOTATION_MODES = ("grouped", "each")
+NOTE_CLUSTER_PT = float(os.getenv("ANNOTATION_CLUSTER_PT", "36"))   # notes this close vertically share one
+NOTE_ICON_PT = 24   # keep sticky-note icons inside the page
+
+Located = Tuple[Dict[str, Any], List[fitz.Rect]]
+
+
+def note_text(issue: Dict[str, Any]) -> str:
+    itype = (issue.get("type") or "issue").strip()
+    problem = (issue.get("problem") or "").strip()
+    suggestion = (issue.get("suggestion") or "").strip()
+    return f"[{itype}] {problem}\nSuggestion: {suggestion}".strip()
+
+
+def _note_point(page: fitz.Page, rect: fitz.Rect) -> fitz.Point:
+    return fitz.Point(min(rect.x1 + 6, page.rect.x1 - NOTE_ICON_PT), rect.y0 + 6)
+
+
+def _usable(rects: Sequence[fitz.Rect]) -> List[fitz.Rect]:
+    return [r for r in rects if r.is_valid and not r.is_empty]
+
+
+def _add_note(page: fitz.Page, point: fitz.Point, text: str) -> int:
+    try:
+        page.add_text_annot(point, text).update()
+        return 1
+    except Exception:
+        return 0
+
+
+def _add_highlight(page: fitz.Page, rects: List[fitz.Rect], subject: str = "") -> int:
+    try:
+        hl = page.add_highlight_annot(quads=rects)
+        if subject:
+            hl.set_info(subject=subject)
+        hl.update()
+        return 1
+    except Exception:
+        return 0
+
+
+def annotate_page_each(page: fitz.Page, pg: int, located: Sequence[Located]) -> int:
+    count = 0
+    for it, rects in located:
+        rects = _usable(rects)
+        if rects:
+            count += _add_highlight(page, rects)
+            count += _add_note(page, _note_point(page, rects[0]), note_text(it))
+        else:
+            count += _add_note(page, fitz.Point(36, 36), f"[{(it.get('type') or 'issue').strip()} p.{pg}] {note_text(it)}")
+    return count
+
+
+def annotate_page_grouped(page: fitz.Page, pg: int, located: Sequence[Located],
+                          cluster_pt: float = NOTE_CLUSTER_PT) -> int:
+    count = 0
+    by_type: Dict[str, List[fitz.Rect]] = {}
+    anchored: List[Tuple[fitz.Rect, Dict[str, Any]]] = []
+    unplaced: List[Dict[str, Any]] = []
+    for it, rects in located:
+        rects = _usable(rects)
+        if not rects:
+            unplaced.append(it)
+            continue
+        by_type.setdefault((it.get("type") or "issue").strip(), []).extend(rects)
+        anchored.append((rects[0], it))
+
+    for itype, rects in by_type.items():
+        count += _add_highlight(page, rects, subject=itype)
+
+    # Sweep notes top to bottom; a note joins the open cluster while it is within cluster_pt of its top
+    anchored.sort(key=lambda a: (a[0].y0, a[0].x0))
+    clusters: List[List[Tuple[fitz.Rect, Dict[str, Any]]]] = []
+    for anchor in anchored:
+        if clusters and anchor[0].y0 - clusters[-1][0][0].y0 <= cluster_pt:
+            clusters[-1].append(anchor)
+        else:
+            clusters.append([anchor])
+    for cluster in clusters:
+        right = max(cluster, key=lambda a: a[0].x1)[0]
+        point = _note_point(page, fitz.Rect(right.x0, cluster[0][0].y0, right.x1, cluster[0][0].y1))
+        if len(cluster) == 1:
+            text = note_text(cluster[0][1])
+        else:
+            text = f"{len(cluster)} issues\n\n" + "\n\n".join(note_text(it) for _, it in cluster)
+        count += _add_note(page, point, text)
+
+    if unplaced:
+        text = "\n\n".join(note_text(it) for it in unplaced)
+        if len(unplaced) > 1:
+            text = f"{len(unplaced)} issues not located on p.{pg}\n\n{text}"
+        else:
+            text = f"[{(unplaced[0].get('type') or 'issue').strip()} p.{pg}] {text}"
+        count += _add_note(page, fitz.Point(36, 36), text)
+    return count
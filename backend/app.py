@@ -1,22 +1,49 @@
 # app.py — One-agent PDF proofreader with compact single-page summary
 import io
+import hashlib
 import os, textwrap, requests
 import json
+import queue
 import re
+import secrets
+import shutil
 import tempfile
 import traceback
+import uuid
 from datetime import datetime as dt
 from pathlib import Path
-from typing import List, Dict, Any
-from time import time
-from flask import Flask, request, send_file, jsonify
+from typing import List, Dict, Any, BinaryIO, Callable, Iterator, Optional, Tuple
+from time import perf_counter, time, sleep
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from flask import Flask, Response, abort, request, send_file, jsonify
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_cors import CORS
 from dotenv import load_dotenv
 import fitz  # PyMuPDF
-from openai import OpenAI
-from models import Lead
+from models import BrandRuleSet, Lead, ProofJob
+from jobs import JobRunner
+from llm_backends import FakeLLM, RecordReplayLLM
+from llm_client import CircuitBreaker, LLMClient
+from issue_merge import MERGE_VERSION, locate_span, merge_issues
+from issue_stream import ISSUES_SCHEMA, IssueStreamParser, PartialOutputError
+from pdf_workers import (
+    PDF_PARALLEL_PAGES, TEXTPAGE_FLAGS, locate_issue, page_record, parallel_extract,
+    parallel_locate, use_parallel,
+)
+from rules_store import RulesSnapshot, RulesStore
+from rule_sets import (
+    RuleSetCache, api_key_sha, find_rule_set, replace_rules, rule_set_to_dict, validate_rules,
+)
+from local_rules import make_context, page_local_issues, registered_rules, run_local_rules
+from word_index import PageWordIndex
+from proof_cache import ResultCache, file_sha256, page_key, result_key, sha256_hex
+from annotations import ANNOTATION_MODES, annotate_page_each, annotate_page_grouped
+import metrics
+from profiling import PROFILE_SORTS, ProfileCapture, list_profiles, profile_path, profile_text
+from metrics import counter, histogram
+from summary_report import SUMMARY_FORMATS, SUMMARY_MODES, add_summary_pages, summary_csv, summary_pdf
 from db import db, init_db
 
 # ---- Setup & config
@@ -46,10 +73,11 @@ def _require_admin_token():
 CORS(
     app,
     resources={r"/*": {"origins": "*"}},
-    expose_headers=["Content-Disposition"],
+    expose_headers=["Content-Disposition", "X-Proof-Cache", "X-Prompt-Tokens-Full", "X-Prompt-Tokens-Sent",
+                    "X-Annotation-Count", "X-Profile-Id"],
     supports_credentials=False,
-    methods=["GET", "POST", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization"],
+    methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization", "X-API-Key", "X-Profile"],
 )
 
 # Rate limiting
@@ -74,11 +102,7 @@ with app.app_context():
 
 app.config["MAX_CONTENT_LENGTH"] = 50 * 1024 * 1024  # 50 MB
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    raise RuntimeError("OPENAI_API_KEY is not set. Add it to .env or your environment.")
-
-client = OpenAI(api_key=OPENAI_API_KEY)
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  # required only when LLM_BACKEND talks to OpenAI
 
 # ---- Prompt used by the AI
 PROMPT_SYSTEM = """
@@ -92,7 +116,7 @@ Check for:
 - Inconsistent capitalization
 - Improper line breaks (e.g., names or phrases split across lines)
 - Company/brand name formatting
-- Incorrect or inconsistent brand names (e.g., Bristol-Myers Squibb)
+- Incorrect or inconsistent brand names (see the brand policies below, when present)
 
 Pay special attention to:
 - Dates (e.g., “Monday. September 1st” → “Monday, September 1st”)
@@ -100,13 +124,6 @@ Pay special attention to:
 - Line breaks that disrupt flow
 - Extra spaces
 
-Brand policy — Bristol Myers Squibb (BMS):
-- Preferred/trade name for body copy: “Bristol Myers Squibb” (no hyphen).
-- Abbreviation “BMS” is acceptable after the first full mention.
-- Legal entity name “Bristol-Myers Squibb Company” (with hyphen) is acceptable ONLY in legal contexts (e.g., SEC filings, © footers) or exact quotations.
-- Flag as inconsistent/outdated in normal copy: “Bristol-Myers Squibb” (hyphenated), “Bristol-Myers”, “Bristol Meyers”, “Bristol-Meyers”, “Bristol Myers-Squibb”, “Bristol-Myers-Squibb”, “Bristol Myers Squib”, or any other misspelling/variant.
-- When flagging a brand issue, set type to "brand" (or "brand_inconsistency") and suggest the correct form based on the context (body copy → “Bristol Myers Squibb”; legal context → “Bristol-Myers Squibb Company”; or use “BMS” if already introduced and appropriate).
-
 Output rules:
 - Return only JSON (no prose, markdown, or code fences).
 - Each issue MUST include: type, page, sentence_or_excerpt, problem, suggestion.
@@ -118,12 +135,17 @@ Output rules:
 # ---- Brand rules
 BRAND_RULES_PATH = Path(__file__).with_name("brand_rules.json")
 
+BRAND_RULES_CHECK_SECONDS = float(os.getenv("BRAND_RULES_CHECK_SECONDS", "2"))
+
+def _read_brand_rules(path: str) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    if not isinstance(rules, list):
+        raise ValueError("brand_rules.json must contain a list of brand objects")
+    return rules
+
 def load_brand_rules() -> list[dict]:
-    try:
-        with open(BRAND_RULES_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return []
+    return rules_store.snapshot().rules
 
 def render_brand_policy_section(rules: list[dict]) -> str:
     if not rules:
@@ -143,217 +165,627 @@ def render_brand_policy_section(rules: list[dict]) -> str:
         bad = r.get("disallow") or []
         if bad:
             lines.append(f"  * Treat as inconsistent/outdated in normal copy: {', '.join(bad)}.")
-    lines.append('When flagging, set type to "brand" or "brand_inconsistency" and suggest the correct form.')
+    lines.append("Also flag any other misspelling or variant of a preferred form, even if it is not listed above.")
+    lines.append('When flagging, set type to "brand" or "brand_inconsistency" and suggest the correct form for '
+                 'the context: the preferred name in body copy, a legal entity name in legal contexts '
+                 '(e.g., SEC filings, © footers) or exact quotations, an abbreviation once the full name has appeared.')
     return "\n".join(lines)
 
-def make_system_prompt() -> str:
+def build_system_prompt(rules: list[dict]) -> str:
     base = PROMPT_SYSTEM.strip()
-    br = render_brand_policy_section(load_brand_rules())
+    br = render_brand_policy_section(rules)
     return f"{base}{br}" if br else base
 
-# ---- Utilities
-def extract_pdf_text_per_page(pdf_path: str) -> List[Dict[str, Any]]:
-    pages = []
-    with fitz.open(pdf_path) as doc:
-        for i, page in enumerate(doc):
-            normalized = page.get_text("text")
-            preserve_ligs = getattr(fitz, "TEXT_PRESERVE_LIGATURES", 0)
-            preserve_ws   = getattr(fitz, "TEXT_PRESERVE_WHITESPACE", 0)
-            raw = page.get_text("text", flags=(preserve_ligs | preserve_ws))
-            pages.append({
-                "page_index": i,
-                "page_number": i + 1,
-                "text": normalized,
-                "raw_text": raw or normalized,
-            })
-    return pages
+# Parsed rules, rendered prompt, prompt hash and brand matcher, rebuilt only when the file changes
+rules_store = RulesStore(BRAND_RULES_PATH, _read_brand_rules, build_system_prompt,
+                         check_interval=BRAND_RULES_CHECK_SECONDS)
 
-def run_ai_proof(pages: List[Dict[str, Any]]) -> Dict[str, Any]:
-    payload = [{"page": p["page_number"], "text": p["text"]} for p in pages]
+def make_system_prompt() -> str:
+    return rules_store.snapshot().system_prompt
+
+# ---- Per-tenant rule sets (DB); compiled snapshots cached per (rule set, version)
+rule_set_cache = RuleSetCache(build_system_prompt, max_items=int(os.getenv("RULE_SET_CACHE_ITEMS", "64")))
+
+def rules_for(rule_set: Optional[str]) -> RulesSnapshot:
+    # Named rule set, or the global brand_rules.json when None
+    if not rule_set:
+        return rules_store.snapshot()
+    rs = find_rule_set(None, rule_set)
+    if rs is None:
+        raise LookupError(f"Unknown rule set: {rule_set}")
+    return rule_set_cache.get(rs)
+
+def request_rule_set() -> Optional[str]:
+    """Rule set name for this request; raises LookupError if unknown.
+
+    Tenants are identified only by their X-API-Key. Naming a rule set with `rule_set`
+    is an admin feature (previewing or testing a tenant's rules) and needs the admin token.
+    """
+    name = (request.values.get("rule_set") or "").strip()
+    if name:
+        _require_admin_token()
+        rs = find_rule_set(None, name)
+        if rs is None:
+            raise LookupError(f"Unknown rule set: {name}")
+        return rs.name
+    api_key = (request.headers.get("X-API-Key") or "").strip()
+    if not api_key:
+        return None
+    rs = find_rule_set(api_key, None)
+    if rs is None:
+        raise LookupError("Unknown API key")
+    return rs.name
+
+# ---- Metrics (exported on /metrics; see metrics.py for the multi-worker setup)
+STAGE_SECONDS = histogram("proof_stage_seconds", "Wall time per proofreading stage", ("stage",))
+LLM_CHUNK_SECONDS = histogram("llm_chunk_seconds", "Wall time per LLM chunk call", ("outcome",))
+LLM_TOKENS = counter("llm_tokens_total", "Estimated LLM tokens (~4 chars each) per direction", ("direction",))
+AI_CHUNK_RETRY_COUNT = counter("ai_chunk_retries_total", "Chunks sent again after failing or returning partial output")
+CACHE_REQUESTS = counter("proof_cache_requests_total", "Result and page cache lookups", ("cache", "result"))
+HTTP_REQUEST_SECONDS = histogram("http_request_seconds", "Request handling time", ("endpoint", "status"))
+HTTP_RATE_LIMITED = counter("http_rate_limited_total", "Requests rejected by the per-IP limiter", ("endpoint",))
+
+@app.before_request
+def _start_request_timer():
+    request.environ["proof.started"] = perf_counter()
+
+@app.after_request
+def _observe_request(resp):
+    # Streamed responses (SSE) finish long after this hook; their stages are timed instead
+    started = request.environ.get("proof.started")
+    if started is not None and resp.mimetype != "text/event-stream" and request.endpoint != "metrics_endpoint":
+        HTTP_REQUEST_SECONDS.observe(perf_counter() - started, endpoint=request.endpoint or "unknown",
+                                     status=str(resp.status_code))
+    return resp
+
+# ---- Profiling: admins send "X-Profile: 1" to capture one request (see profiling.py)
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR") or Path(app.instance_path) / "profiles")
+
+def _profile_request(endpoint: str):
+    # Off unless asked for: the only cost is this header lookup
+    if (request.headers.get("X-Profile") or "").strip().lower() not in {"1", "true", "yes"}:
+        return nullcontext()
+    _require_admin_token()
+    return ProfileCapture(endpoint, PROFILE_DIR)
+
+# ---- Utilities
+def _doc_path(src) -> Optional[str]:
+    # Worker processes re-open the file themselves, so they need a path on disk
+    if isinstance(src, str):
+        return src
+    name = getattr(src, "name", "") or ""
+    return name if name and os.path.isfile(name) else None
+
+def iter_pdf_text_per_page(src, keep_textpages: bool = False) -> Iterator[Dict[str, Any]]:
+    """Yield per-page text; `src` is a path or an open fitz.Document.
+
+    With keep_textpages=True each page dict also carries its fitz.TextPage under
+    "textpage" (and the Page it belongs to under "pdf_page", since PyMuPDF only searches a
+    TextPage through its own Page object) so annotate_pdf_with_issues() can search it
+    without re-laying out the page. Only meaningful when the same Document is annotated.
+    """
+    doc = src if isinstance(src, fitz.Document) else fitz.open(src)
     try:
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            temperature=0.0,
-            messages=[
-                {"role": "system", "content": make_system_prompt()},
-                {"role": "user", "content": f"Pages:\n{json.dumps(payload)}"},
-            ],
-        )
-        msg = resp.choices[0].message
-        output_text = getattr(msg, "content", None) or (msg.get("content") if isinstance(msg, dict) else None)
-        if not output_text:
-            print("DEBUG: No message content found:", resp)
-            return {"issues": []}
-
-        text = output_text.strip()
-        if text.startswith("```"):
-            lines = [ln for ln in text.splitlines() if not ln.strip().startswith("```")]
-            text = "\n".join(lines).strip()
-
-        data = json.loads(text)
-        if not isinstance(data, dict) or "issues" not in data or not isinstance(data["issues"], list):
-            return {"issues": []}
-        return data
-    except Exception as e:
-        print("ERROR in run_ai_proof:", e)
-        traceback.print_exc()
-        return {"issues": []}
+        for page in doc:
+            tp = page.get_textpage(flags=TEXTPAGE_FLAGS)
+            p = page_record(page, tp)
+            if keep_textpages:
+                p["textpage"] = tp
+                p["pdf_page"] = page
+            yield p
+    finally:
+        if doc is not src:
+            doc.close()
+
+def extract_pdf_text_per_page(src, keep_textpages: bool = False) -> List[Dict[str, Any]]:
+    with STAGE_SECONDS.time(stage="extract"):
+        return _extract_pdf_text_per_page(src, keep_textpages)
+
+def _extract_pdf_text_per_page(src, keep_textpages: bool) -> List[Dict[str, Any]]:
+    path = _doc_path(src)
+    if path and PDF_PARALLEL_PAGES:
+        if isinstance(src, fitz.Document):
+            page_count = len(src)
+        else:
+            with fitz.open(path) as doc:
+                page_count = len(doc)
+        if use_parallel(page_count):
+            pages = parallel_extract(path, page_count)
+            if pages is not None:
+                return pages
+    return list(iter_pdf_text_per_page(src, keep_textpages=keep_textpages))
+
+# ---- Uploads: read once, open in memory; spill to disk only when large
+UPLOAD_SPILL_BYTES = int(os.getenv("UPLOAD_SPILL_BYTES", str(16 * 1024 * 1024)))
+
+class PdfUpload:
+    """One read of an uploaded PDF → a single open Document shared by every stage.
+
+    Small uploads are opened straight from memory with fitz.open(stream=...).
+    Uploads above UPLOAD_SPILL_BYTES (or big enough for the process-pool mode,
+    whose workers open the file by path) are written to a temp file instead.
+    """
+
+    def __init__(self, storage):
+        h = hashlib.sha256()
+        blocks: List[bytes] = []
+        size = 0
+        spill = None
+        self.path: Optional[str] = None
+        try:
+            for block in iter(lambda: storage.stream.read(1 << 20), b""):
+                h.update(block)
+                size += len(block)
+                if spill is None and size > UPLOAD_SPILL_BYTES:
+                    spill = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+                    self.path = spill.name
+                    spill.writelines(blocks)
+                    blocks = []
+                if spill is not None:
+                    spill.write(block)
+                else:
+                    blocks.append(block)
+            self.sha256 = h.hexdigest()
+            self.size = size
+            if spill is not None:
+                spill.close()
+                self.doc = fitz.open(self.path)
+                return
+
+            data = b"".join(blocks)
+            blocks = []
+            self.doc = fitz.open(stream=data, filetype="pdf")
+            if PDF_PARALLEL_PAGES and use_parallel(len(self.doc)):
+                self.doc.close()
+                with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+                    self.path = tmp.name
+                    tmp.write(data)
+                self.doc = fitz.open(self.path)
+        except Exception:
+            # Corrupt or truncated upload: __exit__ never runs, so drop the temp file here
+            if spill is not None:
+                spill.close()
+            if self.path:
+                try:
+                    os.remove(self.path)
+                except OSError:
+                    pass
+            raise
+
+    def close(self) -> None:
+        try:
+            self.doc.close()
+        except Exception:
+            pass
+        if self.path:
+            try:
+                os.remove(self.path)
+            except Exception:
+                pass
+
+    def __enter__(self) -> "PdfUpload":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+# ---- AI proofreading (page-window chunks fanned out over a bounded pool)
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+AI_CHUNK_TOKENS = int(os.getenv("AI_CHUNK_TOKENS", "6000"))   # page-text budget per request
+AI_MAX_WORKERS = int(os.getenv("AI_MAX_WORKERS", "4"))        # shared across all requests
+AI_CHUNK_RETRIES = int(os.getenv("AI_CHUNK_RETRIES", "2"))    # extra attempts for failed chunks only
+AI_STRUCTURED_OUTPUT = os.getenv("AI_STRUCTURED_OUTPUT", "1") == "1"  # json_schema response_format
+AI_STREAM = os.getenv("AI_STREAM", "1") == "1"                  # stream completions, parse issues as they close
+AI_OUTPUT_TOKENS = int(os.getenv("AI_OUTPUT_TOKENS", "1000"))   # expected completion size, for the TPM budget
+AI_PAGE_MAX_CHARS = AI_CHUNK_TOKENS * 4                        # longer pages are cut; see truncated_pages
+
+AI_PAGE_CACHE = os.getenv("AI_PAGE_CACHE", "1") == "1"        # incremental mode: only send changed pages
+BRAND_PROMPT_PRUNING = os.getenv("BRAND_PROMPT_PRUNING", "1") == "1"  # brand policy only for brands on the page
+
+_ai_pool = ThreadPoolExecutor(max_workers=AI_MAX_WORKERS, thread_name_prefix="ai-chunk")
+
+# ---- LLM backend
+# openai — live API through the shared, rate-limited client (see llm_client.py)
+# fake   — deterministic offline stand-in (LLM_FAKE_LATENCY, LLM_FAKE_ISSUES_PER_PAGE)
+# record — live API, saving every completion under LLM_RECORD_DIR
+# replay — recorded completions only; an unrecorded request fails its chunk
+LLM_BACKEND = (os.getenv("LLM_BACKEND") or "openai").lower()
+LLM_RECORD_DIR = os.getenv("LLM_RECORD_DIR") or os.path.join(app.instance_path, "llm_recordings")
+
+def _openai_llm() -> LLMClient:
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY is not set. Add it to .env or your environment.")
+    return LLMClient(
+        OPENAI_API_KEY,
+        max_connections=AI_MAX_WORKERS * 2,
+        timeout=float(os.getenv("LLM_TIMEOUT", "120")),
+        rpm=float(os.getenv("LLM_RPM", "0")),          # 0 = no client-side limit
+        tpm=float(os.getenv("LLM_TPM", "0")),
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+        breaker=CircuitBreaker(
+            threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+            reset_after=float(os.getenv("LLM_BREAKER_RESET", "60")),
+        ),
+    )
 
-def _safe_excerpt(s: str, limit: int = 200) -> str:
-    s = (s or "").strip()
-    return s if len(s) <= limit else s[: limit - 3] + "..."
-
-# ---- Summary table (compact single-page)
-def add_summary_table(doc: fitz.Document, issues: List[Dict[str, Any]], compact: bool = True) -> None:
-    margin = 36
-    page = doc.new_page()
-    width = page.rect.width
-    height = page.rect.height
-    usable_w = width - 2 * margin
-
-    col_fracs = [0.07, 0.13, 0.30, 0.25, 0.25]
-    col_x = [margin]
-    for f in col_fracs[:-1]:
-        col_x.append(col_x[-1] + usable_w * f)
-    col_x.append(margin + usable_w)
-
-    headers = ["Pg", "Type", "Excerpt / Sentence", "Problem", "Suggestion"]
-
-    y = margin
-    title = "Proofreading Summary"
-    page.insert_text((margin, y), title, fontsize=18, fontname="helv")
-    y += 26
-
-    header_h = 20
-    hrect = fitz.Rect(margin, y, margin + usable_w, y + header_h)
-    page.draw_rect(hrect, fill=(0.92, 0.92, 0.92), color=(0.7, 0.7, 0.7), width=0.6)
-    for i, label in enumerate(headers):
-        page.insert_textbox(
-            fitz.Rect(col_x[i] + 4, y + 3, col_x[i + 1] - 4, y + header_h),
-            label, fontsize=10, fontname="helv", align=0
+def make_llm(backend: str):
+    if backend == "openai":
+        return _openai_llm()
+    if backend == "fake":
+        return FakeLLM(
+            latency=float(os.getenv("LLM_FAKE_LATENCY", "0")),
+            issues_per_page=float(os.getenv("LLM_FAKE_ISSUES_PER_PAGE", "2")),
+            seed=int(os.getenv("LLM_FAKE_SEED", "0")),
         )
-        if i > 0:
-            page.draw_line((col_x[i], y), (col_x[i], y + header_h), color=(0.7, 0.7, 0.7), width=0.6)
-    y = hrect.br.y
+    if backend == "record":
+        return RecordReplayLLM(LLM_RECORD_DIR, inner=_openai_llm())
+    if backend == "replay":
+        return RecordReplayLLM(LLM_RECORD_DIR)
+    raise RuntimeError(f"Unknown LLM_BACKEND: {backend!r} (use openai, fake, record or replay)")
+
+llm = make_llm(LLM_BACKEND)
+# Cache keys must never mix fake issues with real ones; recordings are real responses
+LLM_CACHE_TAG = f"fake:{OPENAI_MODEL}" if LLM_BACKEND == "fake" else OPENAI_MODEL
+
+# Issues per page, keyed by page text hash; lets re-uploads of an edited PDF skip unchanged pages
+page_cache = ResultCache(
+    max_items=int(os.getenv("PAGE_CACHE_ITEMS", "20000")),
+    ttl=float(os.getenv("PROOF_CACHE_TTL", "3600")),
+    db_path=os.getenv("PROOF_CACHE_DB") or None,
+    db_ttl=float(os.getenv("PROOF_CACHE_DB_TTL", str(7 * 24 * 3600))),
+)
 
-    if not issues:
-        page.insert_text((margin, y + 16), "No issues detected.", fontsize=11, fontname="helv")
-        return
+def estimate_tokens(text: str) -> int:
+    # ~4 chars/token for English copy; close enough for budgeting without a tokenizer
+    return max(1, len(text or "") // 4)
 
-    avail_h = (height - margin) - y
-    rows = max(1, len(issues))
-    row_h = avail_h / rows
-
-    if row_h >= 20:
-        fontsize = 10.5
-    elif row_h >= 18:
-        fontsize = 10
-    elif row_h >= 16:
-        fontsize = 9.5
-    elif row_h >= 14:
-        fontsize = 9
-    elif row_h >= 12:
-        fontsize = 8.5
-    elif row_h >= 10:
-        fontsize = 8
-    else:
-        fontsize = 6.5
-
-    base_limits = [4, 10, 120, 100, 100]
-    scale = max(0.5, min(1.2, row_h / 16.0))
-    limits = [max(2, int(b * scale)) for b in base_limits]
-
-    def clip(txt: str, limit: int) -> str:
-        t = (txt or "").strip().replace("\n", " ")
-        return (t[:limit] + "…") if len(t) > limit else t
-
-    for r, it in enumerate(issues):
-        cells = [
-            clip(str(it.get("page", "")), limits[0]),
-            clip(str(it.get("type", "")), limits[1]),
-            clip(it.get("sentence_or_excerpt") or "", limits[2]),
-            clip(it.get("problem") or "", limits[3]),
-            clip(it.get("suggestion") or "", limits[4]),
-        ]
-
-        row_rect = fitz.Rect(margin, y, margin + usable_w, y + row_h)
-        if r % 2 == 0:
-            page.draw_rect(row_rect, fill=(0.975, 0.975, 0.975))
-        page.draw_rect(row_rect, color=(0.85, 0.85, 0.85), width=0.4)
-        for i in range(1, 5):
-            page.draw_line((col_x[i], y), (col_x[i], y + row_h), color=(0.9, 0.9, 0.9), width=0.4)
-
-        for i in range(5):
-            page.insert_textbox(
-                fitz.Rect(col_x[i] + 4, y + 2, col_x[i + 1] - 4, y + row_h - 2),
-                cells[i],
-                fontsize=fontsize,
-                fontname="helv",
-                align=0,
-            )
+def page_tokens(p: Dict[str, Any]) -> int:
+    return estimate_tokens(p.get("text", "")) + 8  # + JSON framing per page
+
+def chunk_pages(pages: List[Dict[str, Any]], budget: int = AI_CHUNK_TOKENS) -> List[List[Dict[str, Any]]]:
+    chunks: List[List[Dict[str, Any]]] = []
+    cur: List[Dict[str, Any]] = []
+    cur_tokens = 0
+    for p in pages:
+        t = page_tokens(p)
+        if cur and cur_tokens + t > budget:
+            chunks.append(cur)
+            cur, cur_tokens = [], 0
+        cur.append(p)
+        cur_tokens += t
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+def _fix_issue_pages(issues: List[Dict[str, Any]], chunk: List[Dict[str, Any]], log: bool = True) -> List[Dict[str, Any]]:
+    # The model sometimes numbers pages relative to the chunk, or invents one. An issue whose
+    # page isn't in the chunk moves to the chunk page its excerpt is found on, else is dropped.
+    valid = {p["page_number"] for p in chunk}
+    kept = []
+    for it in issues:
+        try:
+            pg = int(it.get("page", 0))
+        except Exception:
+            pg = 0
+        if pg not in valid:
+            excerpt = it.get("sentence_or_excerpt", "")
+            found = next((p["page_number"] for p in chunk if locate_span(p.get("text") or "", excerpt)), None)
+            if found is None:
+                if log:
+                    print(f"WARN: dropping AI issue on page {it.get('page')!r} (not in chunk, excerpt not found)")
+                continue
+            pg = found
+        it["page"] = pg
+        kept.append(it)
+    return kept
+
+def _proof_chunk(
+    chunk: List[Dict[str, Any]],
+    system_prompt: str,
+    on_issue: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> List[Dict[str, Any]]:
+    payload = [{"page": p["page_number"], "text": (p.get("text") or "")[:AI_PAGE_MAX_CHARS]} for p in chunk]
+    kwargs: Dict[str, Any] = dict(
+        model=OPENAI_MODEL,
+        temperature=0.0,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Pages:\n{json.dumps(payload)}"},
+        ],
+    )
+    if AI_STRUCTURED_OUTPUT:
+        kwargs["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {"name": "proofread_issues", "strict": True, "schema": ISSUES_SCHEMA},
+        }
+
+    in_tokens = estimate_tokens(system_prompt) + estimate_tokens(kwargs["messages"][1]["content"])
+    est_tokens = in_tokens + AI_OUTPUT_TOKENS
+    parser = IssueStreamParser()
+    out_chars = 0
+    usage = None
+    outcome = "error"
+    t0 = perf_counter()
+    try:
+        if AI_STREAM:
+            # Issues are handed on as each object closes, while the model is still generating
+            for event in llm.chat(est_tokens, stream=True, **kwargs):
+                usage = getattr(event, "usage", None) or usage   # last event, with include_usage
+                if not event.choices:
+                    continue
+                text = getattr(event.choices[0].delta, "content", None)
+                if not text:
+                    continue
+                out_chars += len(text)
+                for it in _fix_issue_pages(parser.feed(text), chunk, log=False):
+                    if on_issue:
+                        on_issue(it)
+        else:
+            resp = llm.chat(est_tokens, **kwargs)
+            usage = getattr(resp, "usage", None)
+            msg = resp.choices[0].message
+            output_text = getattr(msg, "content", None) or (msg.get("content") if isinstance(msg, dict) else None)
+            if not output_text:
+                raise ValueError("AI response has no message content")
+            out_chars = len(output_text)
+            parser.feed(output_text)
+        try:
+            issues = parser.close()
+        except PartialOutputError as e:
+            outcome = "partial"
+            e.issues = _fix_issue_pages(e.issues, chunk)
+            raise
+        outcome = "ok"
+        return _fix_issue_pages(issues, chunk)
+    finally:
+        LLM_CHUNK_SECONDS.observe(perf_counter() - t0, outcome=outcome)
+        # Prefer the API's own counts when the response carries them
+        LLM_TOKENS.inc(getattr(usage, "prompt_tokens", None) or in_tokens, direction="in")
+        LLM_TOKENS.inc(getattr(usage, "completion_tokens", None) or out_chars // 4, direction="out")
+
+def _page_cache_key(p: Dict[str, Any], prompt_sha: str) -> str:
+    text_sha = p.get("text_sha") or sha256_hex(p.get("text") or "")
+    return page_key(text_sha, prompt_sha, LLM_CACHE_TAG)
+
+def _store_page_issues(chunk: List[Dict[str, Any]], issues: List[Dict[str, Any]], page_sha: Dict[int, str]) -> None:
+    by_page: Dict[int, List[Dict[str, Any]]] = {p["page_number"]: [] for p in chunk}
+    for it in issues:
+        by_page.setdefault(it["page"], []).append({k: v for k, v in it.items() if k != "page"})
+    for p in chunk:
+        page_cache.set(_page_cache_key(p, page_sha[p["page_number"]]), by_page[p["page_number"]])
+
+def run_ai_proof(
+    pages: List[Dict[str, Any]],
+    incremental: bool = AI_PAGE_CACHE,
+    on_chunk: Optional[Callable[[List[Dict[str, Any]], int, int], None]] = None,
+    rules: Optional[RulesSnapshot] = None,
+    on_issue: Optional[Callable[[Dict[str, Any], int], None]] = None,
+    on_retry: Optional[Callable[[int], None]] = None,
+) -> Dict[str, Any]:
+    """Proofread `pages` with the model, chunk by chunk.
+
+    on_chunk(issues, done, total) fires per finished chunk (done == 0 for page-cache hits);
+    on_issue(issue, chunk) fires per issue while a chunk is still streaming, and
+    on_retry(chunk) means the issues streamed so far for that chunk are being redone.
+    """
+    if not pages:
+        return {"issues": []}
+    if not llm.available():
+        # Circuit open: don't queue behind a failing upstream; callers keep the local-rule results
+        print("WARN: LLM circuit breaker open, returning local results only")
+        return {"issues": [], "failed_pages": [p["page_number"] for p in pages], "ai_unavailable": True}
+    snap = rules or rules_store.snapshot()
+    # Brand policy only for brands a page actually mentions; a page's findings don't depend
+    # on policies for brands it never names, so page-cache entries are keyed per page subset.
+    page_brands: Dict[int, frozenset] = {}
+    page_sha: Dict[int, str] = {}
+    for p in pages:
+        if BRAND_PROMPT_PRUNING and snap.rules:
+            page_brands[p["page_number"]] = snap.matcher.mentions(p.get("text") or "")
+            page_sha[p["page_number"]] = rules_store.prompt_for(snap, page_brands[p["page_number"]])[1]
+        else:
+            page_sha[p["page_number"]] = snap.prompt_sha
+
+    spliced: List[Dict[str, Any]] = []
+    todo = pages
+    if incremental:
+        todo = []
+        for p in pages:
+            hit = page_cache.get(_page_cache_key(p, page_sha[p["page_number"]]))
+            CACHE_REQUESTS.inc(cache="page", result="miss" if hit is None else "hit")
+            if hit is None:
+                todo.append(p)
+            else:
+                spliced.extend({**it, "page": p["page_number"]} for it in hit)
+
+    chunks = chunk_pages(todo)
+    truncated = [p["page_number"] for p in todo if len(p.get("text") or "") > AI_PAGE_MAX_CHARS]
+    if truncated:
+        print(f"WARN: page(s) {truncated} longer than {AI_PAGE_MAX_CHARS} chars; the AI sees only the start")
+    prompts: List[str] = []
+    for chunk in chunks:
+        if page_brands:
+            ids = frozenset().union(*(page_brands[p["page_number"]] for p in chunk))
+            prompts.append(rules_store.prompt_for(snap, ids)[0])
+        else:
+            prompts.append(snap.system_prompt)
+    if spliced and on_chunk:
+        on_chunk(spliced, 0, len(chunks))
+    results: Dict[int, List[Dict[str, Any]]] = {}
+    partial: Dict[int, List[Dict[str, Any]]] = {}   # latest partial parse of chunks that keep failing
+    pending = list(range(len(chunks)))
+    attempts = 1 + max(0, AI_CHUNK_RETRIES)
+
+    for attempt in range(attempts):
+        if not pending:
+            break
+        if attempt:
+            AI_CHUNK_RETRY_COUNT.inc(len(pending))
+            sleep(min(8.0, 2 ** (attempt - 1)))
+        futures = {
+            _ai_pool.submit(_proof_chunk, chunks[i], prompts[i],
+                            (lambda it, i=i: on_issue(it, i)) if on_issue else None): i
+            for i in pending
+        }
+        failed = []
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                results[i] = fut.result()
+                partial.pop(i, None)
+                if incremental:
+                    _store_page_issues(chunks[i], results[i], page_sha)
+                if on_chunk:
+                    on_chunk(results[i], len(results), len(chunks))
+            except Exception as e:
+                print(f"WARN: AI chunk {i + 1}/{len(chunks)} failed (attempt {attempt + 1}):", e)
+                if isinstance(e, PartialOutputError):
+                    partial[i] = e.issues
+                else:
+                    partial.pop(i, None)
+                failed.append(i)
+                if on_retry and attempt + 1 < attempts:
+                    on_retry(i)
+        pending = sorted(failed)
+        if pending and not llm.available():
+            break
+
+    # Chunks that never parsed completely still contribute what did parse
+    for i in pending:
+        if partial.get(i):
+            results[i] = partial[i]
+    fresh = [it for i in sorted(results) for it in results[i]]
+    issues = sorted(spliced + fresh, key=lambda it: it["page"]) if spliced else fresh
+    out: Dict[str, Any] = {
+        "issues": issues,
+        "cached_pages": len(pages) - len(todo),
+        "prompt_tokens": {
+            "full": estimate_tokens(snap.system_prompt) * len(chunks),
+            "sent": sum(estimate_tokens(sp) for sp in prompts),
+        },
+    }
+    if truncated:
+        out["truncated_pages"] = truncated
+    if pending:
+        print(f"ERROR in run_ai_proof: {len(pending)}/{len(chunks)} chunk(s) failed after retries")
+        out["failed_pages"] = [p["page_number"] for i in pending for p in chunks[i]]
+        if not llm.available():
+            out["ai_unavailable"] = True
+    return out
+
+# ---- Saving: trade CPU against output size per request
+PDF_SAVE_MODES: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "fast": {"garbage": 0, "deflate": False},
+    "compact": {"garbage": 3, "deflate": True, "deflate_images": True, "deflate_fonts": True},
+    "incremental": {},   # append-only update of the original file; see save_pdf()
+}
+PDF_SAVE_MODE_DEFAULT = os.getenv("PDF_SAVE_MODE", "default")
+
+def save_pdf(doc: fitz.Document, mode: str = "default", spool: bool = False) -> BinaryIO:
+    """Save `doc` and return a readable binary file positioned at 0 (for send_file).
+
+    spool=True writes to an already-unlinked temp file instead of memory, so a large
+    output never sits in RAM; the space is released when the handle is closed.
+    "incremental" only applies to file-backed documents and otherwise saves as "fast".
+    """
+    with STAGE_SECONDS.time(stage="save"):
+        return _save_pdf(doc, mode, spool)
+
+def _save_pdf(doc: fitz.Document, mode: str, spool: bool) -> BinaryIO:
+    path = _doc_path(doc)
+    if mode == "incremental" and path and getattr(doc, "can_save_incrementally", lambda: True)():
+        try:
+            doc.save(path, incremental=True, encryption=getattr(fitz, "PDF_ENCRYPT_KEEP", 1))
+            return open(path, "rb")
+        except Exception as e:
+            print("WARN: incremental save failed, doing a full save:", e)
+    opts = PDF_SAVE_MODES.get(mode) or PDF_SAVE_MODES["fast" if mode == "incremental" else "default"]
 
-        y += row_h
+    if spool:
+        fd, tmp_path = tempfile.mkstemp(suffix=".pdf")
+        os.close(fd)
+        try:
+            doc.save(tmp_path, **opts)
+            return open(tmp_path, "rb")
+        finally:
+            os.remove(tmp_path)
+    out = io.BytesIO()
+    doc.save(out, **opts)
+    out.seek(0)
+    return out
 
 # ---- PDF annotation + summary
-def annotate_pdf_with_issues(src_pdf: str, issues: List[Dict[str, Any]]) -> bytes:
-    doc = fitz.open(src_pdf)
+def annotate_pdf_with_issues(
+    src_pdf,
+    issues: List[Dict[str, Any]],
+    pages: Optional[List[Dict[str, Any]]] = None,
+    save_mode: str = "default",
+    spool: bool = False,
+    summary: str = "append",
+    annotations: str = "each",
+    stats: Optional[Dict[str, Any]] = None,
+) -> BinaryIO:
+    # `src_pdf` is a path or an open Document (annotated in place, left open for the caller).
+    # `pages` from extract_pdf_text_per_page(doc, keep_textpages=True) lets us reuse TextPages.
+    # summary="none" leaves the summary table off (see summary_report for a separate PDF/CSV).
+    # annotations="grouped"|"each" (see annotations.py); pass `stats` to get annotation_count.
+    # Returns the saved PDF as a file object ready for send_file (see save_pdf()).
+    owns_doc = not isinstance(src_pdf, fitz.Document)
+    doc = fitz.open(src_pdf) if owns_doc else src_pdf
+    laid_out: Dict[int, Dict[str, Any]] = {p["page_number"]: p for p in (pages or []) if p.get("textpage")}
+    annot_count = 0
+    t0 = perf_counter()
 
     try:
-        per_page: Dict[int, List[Dict[str, Any]]] = {}
-        for it in issues:
+        per_page: Dict[int, List[Tuple[int, Dict[str, Any]]]] = {}
+        for idx, it in enumerate(issues):
             try:
                 page_num = int(it.get("page", 0))
             except Exception:
                 page_num = 0
             if page_num < 1 or page_num > len(doc):
                 continue
-            per_page.setdefault(page_num, []).append(it)
+            per_page.setdefault(page_num, []).append((idx, it))
+
+        # Large documents: find rectangles across worker processes, then annotate here
+        located: Optional[Dict[int, List[fitz.Rect]]] = None
+        path = _doc_path(doc)
+        if path and not laid_out and use_parallel(len(doc)):
+            located = parallel_locate(path, [(idx, pg, it) for pg, items in per_page.items() for idx, it in items])
 
         for pg, items in per_page.items():
-            page = doc[pg - 1]
-            for it in items:
-                excerpt = _safe_excerpt(it.get("sentence_or_excerpt", ""))
-                problem = (it.get("problem") or "").strip()
-                suggestion = (it.get("suggestion") or "").strip()
-                itype = (it.get("type") or "issue").strip()
-
-                rects = []
-                if excerpt:
-                    try:
-                        rects = page.search_for(excerpt, quads=False)
-                    except Exception:
-                        rects = []
-                if not rects and problem:
-                    try:
-                        key = " ".join(problem.split()[:8])
-                        rects = page.search_for(key, quads=False) if key else []
-                    except Exception:
-                        rects = []
-
-                note_text = f"[{itype}] {problem}\nSuggestion: {suggestion}".strip()
-                if rects:
-                    try:
-                        hl = page.add_highlight_annot(rects[0])
-                        hl.update()
-                    except Exception:
-                        pass
-                    try:
-                        pt = fitz.Point(rects[0].x1 + 6, rects[0].y0 + 6)
-                        ta = page.add_text_annot(pt, note_text)
-                        ta.update()
-                    except Exception:
-                        pass
+            page = tp = index = None
+            if pg in laid_out:
+                page, tp = laid_out[pg]["pdf_page"], laid_out[pg]["textpage"]
+            else:
+                page = doc[pg - 1]
+            found = []
+            for idx, it in items:
+                if located is not None:
+                    rects = located.get(idx, [])
                 else:
-                    try:
-                        ta = page.add_text_annot(fitz.Point(36, 36), f"[{itype} p.{pg}] {note_text}")
-                        ta.update()
-                    except Exception:
-                        pass
+                    if index is None:
+                        # Lay out and index the page once, then look up every issue on it
+                        if tp is None:
+                            tp = page.get_textpage(flags=TEXTPAGE_FLAGS)
+                        index = PageWordIndex.from_page(page, tp)
+                    rects = locate_issue(page, tp, it, index)
+                found.append((it, rects))
+            if annotations == "each":
+                annot_count += annotate_page_each(page, pg, found)
+            else:
+                annot_count += annotate_page_grouped(page, pg, found)
     except Exception as e:
         print("WARN: inline annotation phase failed:", e)
+    STAGE_SECONDS.observe(perf_counter() - t0, stage="annotate")
+    if stats is not None:
+        stats["annotation_count"] = annot_count
 
     try:
-        add_summary_table(doc, issues, compact=True)
+        if summary == "append":
+            with STAGE_SECONDS.time(stage="summary"):
+                add_summary_pages(doc, issues)
     except Exception as e:
         print("WARN: summary table phase failed:", e)
         try:
@@ -367,115 +799,374 @@ def annotate_pdf_with_issues(src_pdf: str, issues: List[Dict[str, Any]]) -> byte
         except Exception:
             pass
 
-    out = io.BytesIO()
-    doc.save(out)
-    doc.close()
-    out.seek(0)
-    return out.read()
+    try:
+        return save_pdf(doc, save_mode, spool=spool)
+    finally:
+        if owns_doc:
+            doc.close()
+
+# ---- Result cache (shared by /proofread-dryrun and /proofread)
+result_cache = ResultCache(
+    max_items=int(os.getenv("PROOF_CACHE_ITEMS", "128")),
+    ttl=float(os.getenv("PROOF_CACHE_TTL", "3600")),
+    db_path=os.getenv("PROOF_CACHE_DB") or None,
+    db_ttl=float(os.getenv("PROOF_CACHE_DB_TTL", str(7 * 24 * 3600))),
+)
 
-def find_extra_space_issues(pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    issues: List[Dict[str, Any]] = []
+# ---- Local rules vs. LLM
+# all       — every page goes to the model (local findings are added on top)
+# unflagged — pages the local rules already flagged skip the model
+# none      — local rules only, no model calls
+LLM_PAGE_MODES = ("all", "unflagged", "none")
+LLM_PAGES_DEFAULT = (os.getenv("LLM_PAGES") or "all").lower()
+ISSUE_MERGE = os.getenv("ISSUE_MERGE", "1") == "1"   # fold duplicate issues (same flagged text) before annotation
+SUMMARY_MODE_DEFAULT = (os.getenv("SUMMARY_MODE") or "append").lower()
+ANNOTATION_MODE_DEFAULT = (os.getenv("ANNOTATION_MODE") or "each").lower()
+
+def llm_pages_param() -> Optional[str]:
+    mode = (request.values.get("llm") or LLM_PAGES_DEFAULT).lower()
+    return mode if mode in LLM_PAGE_MODES else None
+
+def _result_key(upload_sha: str, llm_pages: str, rules: RulesSnapshot) -> str:
+    # Which pages reach the model, and which local rules ran, both change the result
+    tag = f"{LLM_CACHE_TAG}|llm={llm_pages}|rules={','.join(registered_rules())}|merge={MERGE_VERSION if ISSUE_MERGE else 0}"
+    return result_key(upload_sha, rules.prompt_sha, tag)
+
+def _pages_for_llm(pages: List[Dict[str, Any]], local_issues: List[Dict[str, Any]], llm_pages: str) -> List[Dict[str, Any]]:
+    if llm_pages == "none":
+        return []
+    if llm_pages == "unflagged":
+        flagged = {i.get("page") for i in local_issues}
+        return [p for p in pages if p["page_number"] not in flagged]
+    return pages
 
-    UNICODE_SPACES = "\u00A0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200A\u202F\u205F\u3000"
-    SPACE_CLASS = r"[ \t" + re.escape(UNICODE_SPACES) + r"]"
+def _set_result_headers(resp, result: Dict[str, Any]) -> None:
+    resp.headers["X-Proof-Cache"] = result["cache"]
+    tokens = result.get("prompt_tokens")
+    if tokens:
+        resp.headers["X-Prompt-Tokens-Full"] = str(tokens["full"])
+        resp.headers["X-Prompt-Tokens-Sent"] = str(tokens["sent"])
+
+def collect_issues(
+    src,
+    upload_sha: str,
+    progress: Optional[Callable[[str, float], None]] = None,
+    llm_pages: str = LLM_PAGES_DEFAULT,
+    rules: Optional[RulesSnapshot] = None,
+) -> Tuple[Dict[str, Any], Optional[List[Dict[str, Any]]]]:
+    """Return (result, pages); pages is None on a cache hit.
+
+    Pass an open Document as `src` to keep its TextPages for annotation.
+    """
+    rules = rules or rules_store.snapshot()
+    key = _result_key(upload_sha, llm_pages, rules)
+    cached = result_cache.get(key)
+    CACHE_REQUESTS.inc(cache="result", result="miss" if cached is None else "hit")
+    if cached is not None:
+        return {"issues": cached, "cache": "hit"}, None
+
+    if progress:
+        progress("extracting", 0.05)
+    pages = extract_pdf_text_per_page(src, keep_textpages=isinstance(src, fitz.Document))
+    with STAGE_SECONDS.time(stage="local_rules"):
+        local_issues = run_local_rules(pages, make_context(brand_matcher=rules.matcher))
+    ai_pages = _pages_for_llm(pages, local_issues, llm_pages)
+    on_chunk = None
+    if progress:
+        progress("proofreading", 0.1)
+        on_chunk = lambda _issues, done, total: progress("proofreading", 0.1 + 0.7 * done / max(1, total))
+    with STAGE_SECONDS.time(stage="ai"):
+        ai_json = run_ai_proof(ai_pages, on_chunk=on_chunk, rules=rules) if ai_pages else {"issues": []}
+    issues = ai_json.get("issues", []) + local_issues
+    raw_count = len(issues)
+    if ISSUE_MERGE:
+        with STAGE_SECONDS.time(stage="merge"):
+            issues = merge_issues(issues, pages)
+    out: Dict[str, Any] = {"issues": issues, "cache": "miss", "cached_pages": ai_json.get("cached_pages", 0),
+                           "llm_pages": len(ai_pages), "raw_issue_count": raw_count}
+    if ai_json.get("prompt_tokens"):
+        out["prompt_tokens"] = ai_json["prompt_tokens"]
+    if ai_json.get("ai_unavailable"):
+        out["ai_unavailable"] = True
+    if ai_json.get("truncated_pages"):
+        out["ai_truncated_pages"] = ai_json["truncated_pages"]
+    if ai_json.get("failed_pages"):
+        out["ai_failed_pages"] = ai_json["failed_pages"]
+    else:
+        result_cache.set(key, issues)  # never pin a partial result
+    return out, pages
 
-    re_double_between    = re.compile(rf"(\S)({SPACE_CLASS}{{2,}})(\S)")
-    re_space_before_punc = re.compile(rf"{SPACE_CLASS}+([,.;:?!])")
-    re_many_after_punc   = re.compile(rf"([,.;:?!]){SPACE_CLASS}{{2,}}")
-    re_leading           = re.compile(rf"^{SPACE_CLASS}{{2,}}")
-    re_trailing          = re.compile(rf"{SPACE_CLASS}{{2,}}$")
-    re_unicode_any       = re.compile(f"[{re.escape(UNICODE_SPACES)}]")
+# ---- Streaming progress (Server-Sent Events)
+SSE_KEEPALIVE_SECONDS = 15
 
-    def make_excerpt(line: str, start: int, end: int, pad: int = 40) -> str:
-        a = max(0, start - pad)
-        b = min(len(line), end + pad)
-        return line[a:b]
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-    for p in pages:
-        page_no = p["page_number"]
-        text = p.get("raw_text") or p.get("text") or ""
-        lines = text.splitlines()
-
-        for line in lines:
-            for m in re_double_between.finditer(line):
-                bad = m.group(0)
-                fixed = m.group(1) + " " + m.group(3)
-                excerpt = make_excerpt(line, m.start(), m.end())
-                issues.append({
-                    "type": "spacing",
-                    "page": page_no,
-                    "sentence_or_excerpt": excerpt,
-                    "problem": "Multiple consecutive spaces between words.",
-                    "suggestion": f"Replace “{bad}” with “{fixed}”."
-                })
-
-            for m in re_space_before_punc.finditer(line):
-                punct = m.group(1)
-                excerpt = make_excerpt(line, m.start(), m.end())
-                issues.append({
-                    "type": "spacing",
-                    "page": page_no,
-                    "sentence_or_excerpt": excerpt,
-                    "problem": f"Space before punctuation “{punct}”.",
-                    "suggestion": f"Remove the space before “{punct}”."
-                })
-
-            for m in re_many_after_punc.finditer(line):
-                punct = m.group(1)
-                excerpt = make_excerpt(line, m.start(), m.end())
-                issues.append({
-                    "type": "spacing",
-                    "page": page_no,
-                    "sentence_or_excerpt": excerpt,
-                    "problem": f"Multiple spaces after “{punct}”.",
-                    "suggestion": "Use a single space after punctuation."
-                })
-
-            if re_leading.search(line):
-                excerpt = line[: min(len(line), 80)]
-                issues.append({
-                    "type": "spacing",
-                    "page": page_no,
-                    "sentence_or_excerpt": excerpt,
-                    "problem": "Leading extra spaces at line start.",
-                    "suggestion": "Remove leading spaces unless an indent is intended."
-                })
-
-            if re_trailing.search(line):
-                excerpt = line[max(0, len(line) - 80):]
-                issues.append({
-                    "type": "spacing",
-                    "page": page_no,
-                    "sentence_or_excerpt": excerpt,
-                    "problem": "Trailing extra spaces at line end.",
-                    "suggestion": "Remove trailing spaces."
-                })
-
-        for m in re_unicode_any.finditer(text):
-            start = m.start()
-            end = m.end()
-            excerpt = text[max(0, start - 40): min(len(text), end + 40)]
-            issues.append({
-                "type": "spacing",
-                "page": page_no,
-                "sentence_or_excerpt": excerpt,
-                "problem": "Unicode space detected (e.g., NBSP, thin, narrow no-break).",
-                "suggestion": "Replace with a regular ASCII space."
-            })
-
-    return issues
+def _combine_ai_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # run_ai_proof outputs for disjoint page batches, as one run_ai_proof output
+    out: Dict[str, Any] = {
+        "issues": sorted((it for r in results for it in r.get("issues", [])), key=lambda it: it["page"]),
+        "cached_pages": sum(r.get("cached_pages", 0) for r in results),
+    }
+    tokens = [r["prompt_tokens"] for r in results if r.get("prompt_tokens")]
+    if tokens:
+        out["prompt_tokens"] = {k: sum(t[k] for t in tokens) for k in ("full", "sent")}
+    for field in ("truncated_pages", "failed_pages"):
+        pages = sorted(pg for r in results for pg in r.get(field, []))
+        if pages:
+            out[field] = pages
+    if any(r.get("ai_unavailable") for r in results):
+        out["ai_unavailable"] = True
+    return out
+
+def stream_proofread_events(src, upload_sha: str, llm_pages: str = LLM_PAGES_DEFAULT,
+                            rules: Optional[RulesSnapshot] = None) -> Iterator[str]:
+    """SSE events for one document; see README ("Streaming results") for the event list."""
+    rules = rules or rules_store.snapshot()
+    key = _result_key(upload_sha, llm_pages, rules)
+    cached = result_cache.get(key)
+    CACHE_REQUESTS.inc(cache="result", result="miss" if cached is None else "hit")
+    if cached is not None:
+        yield _sse("done", {"issue_count": len(cached), "cache": "hit", "issues": cached})
+        return
+
+    # Pages go to the model one chunk-sized batch at a time as soon as they are extracted, so
+    # AI chunks run while later pages are still being read. Each batch is a run_ai_proof call
+    # on a per-request driver thread (the chunk requests themselves still share _ai_pool).
+    # Everything the drivers report comes back through `events` and is sent from here.
+    events: "queue.Queue" = queue.Queue()
+    drivers = ThreadPoolExecutor(max_workers=AI_MAX_WORKERS, thread_name_prefix="sse-proof")
+    results: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    chunks = {"submitted": 0, "finished": 0, "total": None}
+    ai_started: List[float] = []
+
+    def run_batch(b: int, batch: List[Dict[str, Any]]) -> None:
+        # With streaming on, AI issues arrive one "issue" event at a time; a "chunk_retry"
+        # tells the client to drop what that chunk streamed so far
+        def on_chunk(chunk_issues, done, total):
+            if done == 0:
+                events.put(("issues", {"source": "page_cache", "chunk": b, "issues": chunk_issues}))
+            elif not AI_STREAM:
+                events.put(("issues", {"source": "ai", "chunk": b, "issues": chunk_issues}))
+
+        try:
+            res: Any = run_ai_proof(
+                batch, on_chunk=on_chunk, rules=rules,
+                on_issue=lambda it, _i: events.put(("issue", {"source": "ai", "chunk": b, "issue": it})),
+                on_retry=lambda _i: events.put(("chunk_retry", {"chunk": b})),
+            )
+        except Exception as e:
+            res = e
+        events.put(("_batch", b, res))
+
+    def submit(batch: List[Dict[str, Any]]) -> None:
+        if not ai_started:
+            ai_started.append(perf_counter())
+        drivers.submit(run_batch, chunks["submitted"], batch)
+        chunks["submitted"] += 1
+
+    def handle(item) -> str:
+        if item[0] != "_batch":
+            return _sse(*item)
+        _, b, res = item
+        chunks["finished"] += 1
+        if isinstance(res, Exception):
+            errors.append(str(res))
+            return ""
+        results.append(res)
+        return _sse("chunk_done", {"chunk": b, "chunks_done": chunks["finished"], "chunks": chunks["total"],
+                                   "issue_count": len(res.get("issues", []))})
+
+    def drain() -> Iterator[str]:
+        while True:
+            try:
+                item = events.get_nowait()
+            except queue.Empty:
+                return
+            out = handle(item)
+            if out:
+                yield out
+
+    try:
+        # Local checks are cheap: emit them page by page while extraction is still running
+        pages: List[Dict[str, Any]] = []
+        local_issues: List[Dict[str, Any]] = []
+        ai_page_count = 0
+        batch: List[Dict[str, Any]] = []
+        batch_tokens = 0
+        ctx = make_context(brand_matcher=rules.matcher)
+        extract_s = local_s = 0.0
+        t0 = perf_counter()
+        for p in iter_pdf_text_per_page(src):
+            extract_s += perf_counter() - t0
+            pages.append(p)
+            yield _sse("page_extracted", {"page": p["page_number"], "chars": len(p["text"])})
+            t0 = perf_counter()
+            found = page_local_issues(p, ctx)
+            local_s += perf_counter() - t0
+            if found:
+                local_issues.extend(found)
+                yield _sse("issues", {"source": "local", "page": p["page_number"], "issues": found})
+            if llm_pages == "all" or (llm_pages == "unflagged" and not found):   # as _pages_for_llm
+                ai_page_count += 1
+                t = page_tokens(p)
+                if batch and batch_tokens + t > AI_CHUNK_TOKENS:   # same cut as chunk_pages
+                    submit(batch)
+                    batch, batch_tokens = [], 0
+                batch.append(p)
+                batch_tokens += t
+            yield from drain()
+            t0 = perf_counter()
+        extract_s += perf_counter() - t0
+        STAGE_SECONDS.observe(extract_s, stage="extract")   # excludes time spent waiting on the client
+        STAGE_SECONDS.observe(local_s, stage="local_rules")
+        if batch:
+            submit(batch)
+        chunks["total"] = chunks["submitted"]
+        yield _sse("extracted", {"pages": len(pages), "chunks": chunks["total"]})
+
+        while chunks["finished"] < chunks["total"]:
+            try:
+                item = events.get(timeout=SSE_KEEPALIVE_SECONDS)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            out = handle(item)
+            if out:
+                yield out
+        if ai_started:
+            STAGE_SECONDS.observe(perf_counter() - ai_started[0], stage="ai")
+    finally:
+        # A client that goes away mid-stream cancels the batches that haven't started
+        drivers.shutdown(wait=False, cancel_futures=True)
+
+    if errors:
+        yield _sse("error", {"error": "Proofreading failed", "detail": errors[0]})
+        return
+    ai_json = _combine_ai_results(results)
+    issues = ai_json.get("issues", []) + local_issues
+    raw_count = len(issues)
+    if ISSUE_MERGE:
+        with STAGE_SECONDS.time(stage="merge"):
+            issues = merge_issues(issues, pages)
+    done: Dict[str, Any] = {"issue_count": len(issues), "raw_issue_count": raw_count, "cache": "miss",
+                            "cached_pages": ai_json.get("cached_pages", 0), "llm_pages": ai_page_count}
+    if ai_json.get("prompt_tokens"):
+        done["prompt_tokens"] = ai_json["prompt_tokens"]
+    if ai_json.get("ai_unavailable"):
+        done["ai_unavailable"] = True
+    if ai_json.get("truncated_pages"):
+        done["ai_truncated_pages"] = ai_json["truncated_pages"]
+    if ai_json.get("failed_pages"):
+        done["ai_failed_pages"] = ai_json["failed_pages"]
+    else:
+        result_cache.set(key, issues)
+    done["issues"] = issues   # final list (merged); replaces what was streamed
+    yield _sse("done", done)
+
+# ---- Background proofreading jobs
+JOBS_DIR = Path(os.getenv("JOBS_DIR") or Path(app.instance_path) / "jobs")
+JOBS_DIR.mkdir(parents=True, exist_ok=True)
+
+def _process_job(job: ProofJob, progress: Callable[[str, float], None]) -> None:
+    # Failed jobs are not retried, so the upload goes either way
+    try:
+        with fitz.open(job.input_path) as doc:
+            result, pages = collect_issues(doc, job.upload_sha, progress=progress, rules=rules_for(job.rule_set))
+            issues = result["issues"]
+            job.issues_json = json.dumps(issues)
+            job.issue_count = len(issues)
+            if job.mode == "pdf":
+                progress("annotating", 0.85)
+                out_path = JOBS_DIR / f"{job.id}.annotated.pdf"
+                with annotate_pdf_with_issues(doc, issues, pages, spool=True, summary=SUMMARY_MODE_DEFAULT,
+                                              annotations=ANNOTATION_MODE_DEFAULT) as src, open(out_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                job.result_path = str(out_path)
+    finally:
+        try:
+            os.remove(job.input_path)
+        except Exception:
+            pass
+
+job_runner = JobRunner(
+    app,
+    _process_job,
+    workers=int(os.getenv("JOB_WORKERS", "2")),
+    max_queued=int(os.getenv("JOB_QUEUE_SIZE", "32")),
+    ttl=float(os.getenv("JOB_TTL_SECONDS", "86400")),
+    sweep_every=float(os.getenv("JOB_SWEEP_SECONDS", "600")),
+)
+job_runner.resume()
+
+def _job_to_dict(job: ProofJob) -> Dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "mode": job.mode,
+        "filename": job.filename,
+        "stage": job.stage,
+        "progress": job.progress,
+        "issue_count": job.issue_count,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() + "Z",
+        "updated_at": job.updated_at.isoformat() + "Z",
+        "status_url": f"/jobs/{job.id}",
+        "result_url": f"/jobs/{job.id}/result",
+    }
 
 @app.errorhandler(429)
 def ratelimit_handler(e):
+    HTTP_RATE_LIMITED.inc(endpoint=request.endpoint or "unknown")
     return jsonify({"ok": False, "error": "Too many reports, please try again shortly."}), 429
 # ---- Routes
 @app.get("/health")
 def health():
     return jsonify({"ok": True, "time": dt.utcnow().isoformat() + "Z"})
 
+@app.get("/metrics")
+@limiter.exempt
+def metrics_endpoint():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.get("/brand-rules")
 def get_brand_rules():
-    return jsonify({"rules": load_brand_rules()})
+    try:
+        snap = rules_for(request_rule_set())
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    return jsonify({"rules": snap.rules, "prompt_sha": snap.prompt_sha})
+
+@app.post("/admin/brand-rules/reload")
+def reload_brand_rules():
+    _require_admin_token()
+    try:
+        snap = rules_store.reload()
+    except Exception as e:
+        return jsonify({"error": "Could not load brand rules", "detail": str(e)}), 400
+    return jsonify({"ok": True, "brands": len(snap.rules), "variants": len(snap.matcher),
+                    "prompt_sha": snap.prompt_sha})
+
+@app.get("/admin/profiles")
+def list_request_profiles():
+    _require_admin_token()
+    return jsonify({"profiles": list_profiles(PROFILE_DIR)})
+
+@app.get("/admin/profiles/<profile_id>")
+def get_request_profile(profile_id):
+    # Raw pstats file by default; ?format=text for the top functions as a table
+    _require_admin_token()
+    path = profile_path(PROFILE_DIR, profile_id)
+    if path is None:
+        return jsonify({"error": "Profile not found"}), 404
+    if (request.args.get("format") or "").lower() == "text":
+        sort = (request.args.get("sort") or "cumulative").lower()
+        if sort not in PROFILE_SORTS:
+            return jsonify({"error": f"sort must be one of: {', '.join(PROFILE_SORTS)}"}), 400
+        return Response(profile_text(path, sort=sort), mimetype="text/plain")
+    return send_file(str(path), mimetype="application/octet-stream", as_attachment=True,
+                     download_name=f"{profile_id}.prof")
 
 @app.get("/__routes")
 def __routes():
@@ -488,24 +1179,66 @@ def proofread_dryrun():
     f = request.files["file"]
     if not f.filename.lower().endswith(".pdf"):
         return jsonify({"error": "Only PDF files are supported"}), 400
-    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-        f.save(tmp.name)
-        tmp_path = tmp.name
+    llm_pages = llm_pages_param()
+    if llm_pages is None:
+        return jsonify({"error": f"llm must be one of: {', '.join(LLM_PAGE_MODES)}"}), 400
+    try:
+        rules = rules_for(request_rule_set())
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    profiler = _profile_request("proofread-dryrun")
     try:
-        pages = extract_pdf_text_per_page(tmp_path)
-        ai_json = run_ai_proof(pages)
-        issues = ai_json.get("issues", [])
-        issues.extend(find_extra_space_issues(pages))
-        return jsonify({"issues": issues})
+        with profiler as capture:
+            with PdfUpload(f) as upload:
+                result, _ = collect_issues(upload.doc, upload.sha256, llm_pages=llm_pages, rules=rules)
+                if capture:
+                    capture.tag(pdf_sha256=upload.sha256, page_count=len(upload.doc),
+                                issue_count=len(result["issues"]), cache=result["cache"])
+            resp = jsonify(result)
+        _set_result_headers(resp, result)
+        if capture:
+            resp.headers["X-Profile-Id"] = capture.id
+        return resp
     except Exception as e:
         print("ERROR in /proofread-dryrun:", e)
         traceback.print_exc()
         return jsonify({"error": "Dryrun failed", "detail": str(e)}), 500
-    finally:
+
+@app.post("/proofread-stream")
+def proofread_stream():
+    if "file" not in request.files:
+        return jsonify({"error": "Missing file field 'file'"}), 400
+    f = request.files["file"]
+    if not f.filename.lower().endswith(".pdf"):
+        return jsonify({"error": "Only PDF files are supported"}), 400
+    llm_pages = llm_pages_param()
+    if llm_pages is None:
+        return jsonify({"error": f"llm must be one of: {', '.join(LLM_PAGE_MODES)}"}), 400
+    try:
+        rules = rules_for(request_rule_set())
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    try:
+        upload = PdfUpload(f)
+    except Exception as e:
+        print("ERROR in /proofread-stream:", e)
+        return jsonify({"error": "Could not read PDF", "detail": str(e)}), 400
+
+    def generate():
         try:
-            os.remove(tmp_path)
-        except Exception:
-            pass
+            yield from stream_proofread_events(upload.doc, upload.sha256, llm_pages, rules)
+        except Exception as e:
+            print("ERROR in /proofread-stream:", e)
+            traceback.print_exc()
+            yield _sse("error", {"error": "Streaming failed", "detail": str(e)})
+        finally:
+            upload.close()
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.route("/lead", methods=["POST"])
 @limiter.limit("10 per minute")  # optional but recommended
@@ -599,32 +1332,175 @@ def proofread():
     if not f.filename.lower().endswith(".pdf"):
         return jsonify({"error": "Only PDF files are supported"}), 400
 
-    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-        f.save(tmp.name)
-        tmp_path = tmp.name
+    save_mode = (request.values.get("save") or PDF_SAVE_MODE_DEFAULT).lower()
+    if save_mode not in PDF_SAVE_MODES:
+        return jsonify({"error": f"save must be one of: {', '.join(PDF_SAVE_MODES)}"}), 400
+    summary = (request.values.get("summary") or SUMMARY_MODE_DEFAULT).lower()
+    if summary not in SUMMARY_MODES:
+        return jsonify({"error": f"summary must be one of: {', '.join(SUMMARY_MODES)}"}), 400
+    annotations = (request.values.get("annotations") or ANNOTATION_MODE_DEFAULT).lower()
+    if annotations not in ANNOTATION_MODES:
+        return jsonify({"error": f"annotations must be one of: {', '.join(ANNOTATION_MODES)}"}), 400
+    llm_pages = llm_pages_param()
+    if llm_pages is None:
+        return jsonify({"error": f"llm must be one of: {', '.join(LLM_PAGE_MODES)}"}), 400
+    try:
+        rules = rules_for(request_rule_set())
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    profiler = _profile_request("proofread")
 
     try:
-        pages = extract_pdf_text_per_page(tmp_path)
-        ai_json = run_ai_proof(pages)
-        issues = ai_json.get("issues", [])
-        issues.extend(find_extra_space_issues(pages))
-        final_pdf = annotate_pdf_with_issues(tmp_path, issues)
+        with profiler as capture:
+            with PdfUpload(f) as upload:
+                page_count = len(upload.doc)
+                result, pages = collect_issues(upload.doc, upload.sha256, llm_pages=llm_pages, rules=rules)
+                stats: Dict[str, Any] = {}
+                final_pdf = annotate_pdf_with_issues(
+                    upload.doc, result["issues"], pages,
+                    save_mode=save_mode, spool=upload.path is not None, summary=summary,
+                    annotations=annotations, stats=stats,
+                )
+                if capture:
+                    capture.tag(pdf_sha256=upload.sha256, page_count=page_count,
+                                issue_count=len(result["issues"]), cache=result["cache"],
+                                annotation_count=stats.get("annotation_count", 0))
+
+            resp = send_file(
+                final_pdf,
+                mimetype="application/pdf",
+                as_attachment=True,
+                download_name="annotated_output.pdf",
+            )
+        _set_result_headers(resp, result)
+        resp.headers["X-Annotation-Count"] = str(stats.get("annotation_count", 0))
+        if capture:
+            resp.headers["X-Profile-Id"] = capture.id
+        return resp
+    except Exception as e:
+        print("ERROR in /proofread:", e)
+        traceback.print_exc()
+        return jsonify({"error": "Processing failed", "detail": str(e)}), 500
 
+def _summary_response(issues: List[Dict[str, Any]], fmt: str, base: str) -> Response:
+    if fmt == "csv":
+        # send_file writes an ASCII filename plus RFC 5987 filename*= for anything else
         return send_file(
-            io.BytesIO(final_pdf),
-            mimetype="application/pdf",
+            io.BytesIO(summary_csv(issues).encode("utf-8")),
+            mimetype="text/csv",
             as_attachment=True,
-            download_name="annotated_output.pdf",
+            download_name=f"{base}_summary.csv",
         )
+    return send_file(
+        io.BytesIO(summary_pdf(issues)),
+        mimetype="application/pdf",
+        as_attachment=True,
+        download_name=f"{base}_summary.pdf",
+    )
+
+@app.post("/proofread-summary")
+def proofread_summary():
+    # Just the summary table (PDF or CSV), without rewriting the uploaded document
+    if "file" not in request.files:
+        return jsonify({"error": "Missing file field 'file'"}), 400
+    f = request.files["file"]
+    if not f.filename.lower().endswith(".pdf"):
+        return jsonify({"error": "Only PDF files are supported"}), 400
+    fmt = (request.values.get("format") or "pdf").lower()
+    if fmt not in SUMMARY_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(SUMMARY_FORMATS)}"}), 400
+    llm_pages = llm_pages_param()
+    if llm_pages is None:
+        return jsonify({"error": f"llm must be one of: {', '.join(LLM_PAGE_MODES)}"}), 400
+    try:
+        rules = rules_for(request_rule_set())
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+
+    try:
+        with PdfUpload(f) as upload:
+            result, _ = collect_issues(upload.doc, upload.sha256, llm_pages=llm_pages, rules=rules)
+        resp = _summary_response(result["issues"], fmt, os.path.splitext(f.filename)[0] or "output")
+        _set_result_headers(resp, result)
+        return resp
     except Exception as e:
-        print("ERROR in /proofread:", e)
+        print("ERROR in /proofread-summary:", e)
         traceback.print_exc()
-        return jsonify({"error": "Processing failed", "detail": str(e)}), 500
-    finally:
+        return jsonify({"error": "Summary failed", "detail": str(e)}), 500
+
+@app.post("/jobs")
+def create_job():
+    if "file" not in request.files:
+        return jsonify({"error": "Missing file field 'file'"}), 400
+    f = request.files["file"]
+    if not f.filename.lower().endswith(".pdf"):
+        return jsonify({"error": "Only PDF files are supported"}), 400
+    mode = (request.form.get("mode") or request.args.get("mode") or "pdf").lower()
+    if mode not in ("pdf", "json"):
+        return jsonify({"error": "mode must be 'pdf' or 'json'"}), 400
+    try:
+        rule_set = request_rule_set()
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+
+    job_id = uuid.uuid4().hex
+    input_path = JOBS_DIR / f"{job_id}.pdf"
+    f.save(str(input_path))
+    job = ProofJob(
+        id=job_id,
+        mode=mode,
+        filename=f.filename,
+        upload_sha=file_sha256(str(input_path)),
+        input_path=str(input_path),
+        rule_set=rule_set,
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    if not job_runner.submit(job_id):
+        db.session.delete(job)
+        db.session.commit()
         try:
-            os.remove(tmp_path)
+            os.remove(input_path)
         except Exception:
             pass
+        resp = jsonify({"error": "Job queue is full, please retry shortly."})
+        resp.headers["Retry-After"] = "30"
+        return resp, 503
+
+    return jsonify(_job_to_dict(job)), 202
+
+@app.get("/jobs/<job_id>")
+def get_job(job_id):
+    job = db.session.get(ProofJob, job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(_job_to_dict(job))
+
+@app.get("/jobs/<job_id>/result")
+def get_job_result(job_id):
+    job = db.session.get(ProofJob, job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job.status == "failed":
+        return jsonify({"error": "Job failed", "detail": job.error}), 500
+    if job.status != "done":
+        return jsonify(_job_to_dict(job)), 409
+
+    fmt = (request.args.get("format") or job.mode).lower()
+    base = os.path.splitext(job.filename or "output")[0]
+    if fmt in ("csv", "summary"):
+        return _summary_response(json.loads(job.issues_json or "[]"), "csv" if fmt == "csv" else "pdf", base)
+    if fmt == "json" or not job.result_path:
+        return jsonify({"issues": json.loads(job.issues_json or "[]")})
+    if not os.path.exists(job.result_path):
+        return jsonify({"error": "Result file no longer available"}), 410
+    return send_file(
+        job.result_path,
+        mimetype="application/pdf",
+        as_attachment=True,
+        download_name=f"{base}_annotated.pdf",
+    )
 
 # ---- Slack report endpoint (rate-limited)
 @app.post("/api/report-issue")
@@ -697,6 +1573,70 @@ def admin_count_leads():
     total = Lead.query.count()
     return jsonify({"count": total})
 
+@app.get("/admin/rule-sets")
+def admin_list_rule_sets():
+    _require_admin_token()
+    rows = BrandRuleSet.query.order_by(BrandRuleSet.name).all()
+    return jsonify({"items": [rule_set_to_dict(r) for r in rows], "count": len(rows)})
+
+@app.get("/admin/rule-sets/<name>")
+def admin_get_rule_set(name):
+    _require_admin_token()
+    rs = BrandRuleSet.query.filter_by(name=name).first()
+    if rs is None:
+        return jsonify({"error": "Rule set not found"}), 404
+    return jsonify(rule_set_to_dict(rs, with_rules=True))
+
+@app.put("/admin/rule-sets/<name>")
+def admin_put_rule_set(name):
+    """Create or replace a rule set.
+
+    Body: {"rules": [...brand_rules.json entries...], "api_key": "..." | "generate_api_key": true}
+    """
+    _require_admin_token()
+    data = request.get_json(silent=True) or {}
+    try:
+        rules = validate_rules(data.get("rules"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    rs = BrandRuleSet.query.filter_by(name=name).first()
+    created = rs is None
+    if created:
+        rs = BrandRuleSet(name=name, version=0)
+        db.session.add(rs)
+    replace_rules(rs, rules)
+
+    new_key = None
+    if data.get("generate_api_key"):
+        new_key = secrets.token_urlsafe(32)
+    elif data.get("api_key"):
+        new_key = str(data["api_key"])
+    if new_key:
+        rs.api_key_sha = api_key_sha(new_key)
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Could not save rule set", "detail": str(e)}), 409
+    rule_set_cache.evict(rs.id)
+
+    out = rule_set_to_dict(rs)
+    if data.get("generate_api_key"):
+        out["api_key"] = new_key   # shown once; only its hash is stored
+    return jsonify(out), 201 if created else 200
+
+@app.delete("/admin/rule-sets/<name>")
+def admin_delete_rule_set(name):
+    _require_admin_token()
+    rs = BrandRuleSet.query.filter_by(name=name).first()
+    if rs is None:
+        return jsonify({"error": "Rule set not found"}), 404
+    rule_set_cache.evict(rs.id)
+    db.session.delete(rs)
+    db.session.commit()
+    return jsonify({"ok": True})
+
 if __name__ == "__main__":
     # Helpful: list routes on startup
     with app.app_context():
@@ -0,0 +1,202 @@
+# backend/benchmarks/bench_pipeline.py — per-stage timings for the whole proofreading pipeline
+#
+#   python benchmarks/bench_pipeline.py [--pages 1,10,100,1000] [--repeat 5] [--lines 40]
+#                                       [--error-rate 0.1] [--out results.json] [--compare old.json]
+#
+# Builds synthetic PDFs with controlled text density (lines per page) and error rate
+# (share of lines with an injected spacing/punctuation/brand/repeated-word slip), then times
+# each stage separately with the fake LLM backend, so nothing here touches the network.
+# Results (p50/p95 per stage, peak RSS) are written as JSON; pass an earlier file with
+# --compare to see the change per stage between commits.
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Configure app.py for offline runs before importing it
+_TMP = tempfile.mkdtemp(prefix="bench-pipeline-")
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'bench.db')}")
+os.environ.setdefault("JOBS_DIR", os.path.join(_TMP, "jobs"))
+os.environ["AI_PAGE_CACHE"] = "0"          # every run must reach the (fake) model
+os.environ.pop("PROOF_CACHE_DB", None)
+
+import fitz  # noqa: E402  PyMuPDF
+import app as pipeline  # noqa: E402
+from issue_merge import merge_issues  # noqa: E402
+from local_rules import make_context, run_local_rules  # noqa: E402
+from spacing import find_extra_space_issues  # noqa: E402
+from summary_report import add_summary_pages  # noqa: E402
+
+WORDS = ("the quarterly revenue growth margin patient outcomes clinical trial results were "
+         "reported across all regions with strong demand and improved operating efficiency").split()
+SLIPS = (
+    lambda line, rng: line.replace(" ", "  ", 1),                       # double space
+    lambda line, rng: line + " .",                                      # space before punctuation
+    lambda line, rng: line.replace(" ", "\u00a0", 1),                    # NBSP
+    lambda line, rng: line.replace(" the ", " the the ", 1) if " the " in line else line + " the the",
+    lambda line, rng: line + " by Bristol-Myers Squibb",               # brand variant
+    lambda line, rng: line + ",, then",                                 # doubled punctuation
+)
+
+
+def synth_pdf(pages: int, lines: int, error_rate: float, seed: int) -> bytes:
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        rows = []
+        for _ in range(lines):
+            line = " ".join(rng.choices(WORDS, k=rng.randint(6, 11)))
+            if rng.random() < error_rate:
+                line = rng.choice(SLIPS)(line, rng)
+            rows.append(line)
+        page.insert_textbox(fitz.Rect(36, 36, page.rect.width - 36, page.rect.height - 36),
+                            "\n".join(rows), fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(q * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024   # bytes on macOS, KiB on Linux
+
+
+def timed(samples: Dict[str, List[float]], stage: str, fn: Callable[[], Any]) -> Any:
+    t0 = time.perf_counter()
+    out = fn()
+    samples.setdefault(stage, []).append(time.perf_counter() - t0)
+    return out
+
+
+def stage_seconds(stage: str) -> float:
+    # Running total of app.py's own timer for one stage (used to split the save out of annotate)
+    series = pipeline.STAGE_SECONDS.series.get(json.dumps([stage]))
+    return series["sum"] if series else 0.0
+
+
+def run_once(data: bytes, samples: Dict[str, List[float]], counts: Dict[str, int]) -> None:
+    doc = timed(samples, "open", lambda: fitz.open(stream=data, filetype="pdf"))
+    try:
+        pages = timed(samples, "extract", lambda: pipeline.extract_pdf_text_per_page(doc, keep_textpages=True))
+        spacing = timed(samples, "spacing", lambda: find_extra_space_issues(pages))
+        ctx = make_context(brand_matcher=pipeline.rules_store.snapshot().matcher)
+        local = timed(samples, "local_rules", lambda: run_local_rules(pages, ctx))
+        ai = timed(samples, "ai_fake", lambda: pipeline.run_ai_proof(pages, incremental=False))
+        raw = ai["issues"] + local
+        issues = timed(samples, "merge", lambda: merge_issues(raw, pages)) if pipeline.ISSUE_MERGE else raw
+        stats: Dict[str, Any] = {}
+        saved_before = stage_seconds("save")
+        out = timed(samples, "annotate", lambda: pipeline.annotate_pdf_with_issues(
+            doc, issues, pages, summary="none", stats=stats))
+        # annotate_pdf_with_issues always saves; report that as its own stage
+        save = stage_seconds("save") - saved_before
+        samples["annotate"][-1] -= save
+        samples.setdefault("save", []).append(save)
+        counts["annotations"] = stats.get("annotation_count", 0)
+        out.close()
+    finally:
+        doc.close()
+
+    # The summary table on its own (left off above), on a clean copy of the document
+    with fitz.open(stream=data, filetype="pdf") as fresh:
+        counts["summary_pages"] = timed(samples, "summary", lambda: add_summary_pages(fresh, issues))
+
+    counts.update(pages=len(pages), spacing_issues=len(spacing), local_issues=len(local),
+                  ai_issues=len(ai["issues"]), raw_issues=len(raw), issues=len(issues))
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(results: Dict[str, Any], baseline_path: str) -> None:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    old = {r["pages"]: r for r in baseline.get("runs", [])}
+    print(f"\nvs. {baseline_path} ({baseline.get('commit', '?')}), p50 change:")
+    for run in results["runs"]:
+        prev = old.get(run["pages"])
+        if not prev:
+            continue
+        parts = []
+        for stage, st in run["stages"].items():
+            before = prev["stages"].get(stage, {}).get("p50_ms")
+            if before:
+                parts.append(f"{stage} {100.0 * (st['p50_ms'] - before) / before:+.0f}%")
+        print(f"  {run['pages']:>5} pages: " + ", ".join(parts))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Per-stage proofreading pipeline benchmark (fake LLM).")
+    ap.add_argument("--pages", default="1,10,100,1000", help="comma-separated page counts")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--lines", type=int, default=40, help="text lines per page")
+    ap.add_argument("--error-rate", type=float, default=0.1, help="share of lines with an injected error")
+    ap.add_argument("--llm-latency", type=float, default=0.0, help="fake LLM seconds per call")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", default=None, help="JSON results path (default: benchmarks/results/...)")
+    ap.add_argument("--compare", default=None, help="earlier results JSON to diff against")
+    args = ap.parse_args()
+
+    if hasattr(pipeline.llm, "latency"):
+        pipeline.llm.latency = args.llm_latency
+
+    results: Dict[str, Any] = {
+        "commit": git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "pymupdf": getattr(fitz, "VersionBind", "?"),
+        "args": vars(args),
+        "runs": [],
+    }
+    for n in [int(x) for x in args.pages.split(",") if x.strip()]:
+        data = synth_pdf(n, args.lines, args.error_rate, args.seed)
+        samples: Dict[str, List[float]] = {}
+        counts: Dict[str, int] = {}
+        for _ in range(args.repeat):
+            run_once(data, samples, counts)
+        stages = {
+            stage: {"p50_ms": round(percentile(v, 0.5) * 1000, 3), "p95_ms": round(percentile(v, 0.95) * 1000, 3)}
+            for stage, v in samples.items()
+        }
+        run = {"pages": n, "pdf_bytes": len(data), "counts": counts, "stages": stages,
+               "peak_rss_mb": round(peak_rss_mb(), 1)}
+        results["runs"].append(run)
+        print(f"{n:>5} pages, {len(data) / 1e6:.2f} MB, {counts['issues']} issues, peak RSS {run['peak_rss_mb']} MB")
+        for stage, st in stages.items():
+            print(f"    {stage:<12} p50 {st['p50_ms']:10.1f} ms   p95 {st['p95_ms']:10.1f} ms")
+
+    out = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), "results",
+                                   f"pipeline-{results['commit']}-{int(time.time())}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {out}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
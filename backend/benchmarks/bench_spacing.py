@@ -0,0 +1,131 @@
+# backend/benchmarks/bench_spacing.py — spacing scanner vs. the original per-line regex stack
+#
+#   python benchmarks/bench_spacing.py [--pages 200] [--repeat 5]
+#
+# Synthetic pages mix prose with table-like rows (runs of padding spaces, NBSPs,
+# spaces before punctuation) — the layouts that used to explode the issue count.
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from spacing import find_extra_space_issues  # noqa: E402
+
+
+def legacy_find_extra_space_issues(pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Verbatim copy of the implementation previously in app.py
+    issues: List[Dict[str, Any]] = []
+
+    UNICODE_SPACES = "\u00A0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200A\u202F\u205F\u3000"
+    SPACE_CLASS = r"[ \t" + re.escape(UNICODE_SPACES) + r"]"
+
+    re_double_between    = re.compile(rf"(\S)({SPACE_CLASS}{{2,}})(\S)")
+    re_space_before_punc = re.compile(rf"{SPACE_CLASS}+([,.;:?!])")
+    re_many_after_punc   = re.compile(rf"([,.;:?!]){SPACE_CLASS}{{2,}}")
+    re_leading           = re.compile(rf"^{SPACE_CLASS}{{2,}}")
+    re_trailing          = re.compile(rf"{SPACE_CLASS}{{2,}}$")
+    re_unicode_any       = re.compile(f"[{re.escape(UNICODE_SPACES)}]")
+
+    def make_excerpt(line: str, start: int, end: int, pad: int = 40) -> str:
+        a = max(0, start - pad)
+        b = min(len(line), end + pad)
+        return line[a:b]
+
+    for p in pages:
+        page_no = p["page_number"]
+        text = p.get("raw_text") or p.get("text") or ""
+        for line in text.splitlines():
+            for m in re_double_between.finditer(line):
+                issues.append({"type": "spacing", "page": page_no,
+                               "sentence_or_excerpt": make_excerpt(line, m.start(), m.end()),
+                               "problem": "Multiple consecutive spaces between words.",
+                               "suggestion": f"Replace “{m.group(0)}” with “{m.group(1)} {m.group(3)}”."})
+            for m in re_space_before_punc.finditer(line):
+                issues.append({"type": "spacing", "page": page_no,
+                               "sentence_or_excerpt": make_excerpt(line, m.start(), m.end()),
+                               "problem": f"Space before punctuation “{m.group(1)}”.",
+                               "suggestion": f"Remove the space before “{m.group(1)}”."})
+            for m in re_many_after_punc.finditer(line):
+                issues.append({"type": "spacing", "page": page_no,
+                               "sentence_or_excerpt": make_excerpt(line, m.start(), m.end()),
+                               "problem": f"Multiple spaces after “{m.group(1)}”.",
+                               "suggestion": "Use a single space after punctuation."})
+            if re_leading.search(line):
+                issues.append({"type": "spacing", "page": page_no, "sentence_or_excerpt": line[:80],
+                               "problem": "Leading extra spaces at line start.",
+                               "suggestion": "Remove leading spaces unless an indent is intended."})
+            if re_trailing.search(line):
+                issues.append({"type": "spacing", "page": page_no, "sentence_or_excerpt": line[-80:],
+                               "problem": "Trailing extra spaces at line end.",
+                               "suggestion": "Remove trailing spaces."})
+        for m in re_unicode_any.finditer(text):
+            issues.append({"type": "spacing", "page": page_no,
+                           "sentence_or_excerpt": text[max(0, m.start() - 40): m.end() + 40],
+                           "problem": "Unicode space detected (e.g., NBSP, thin, narrow no-break).",
+                           "suggestion": "Replace with a regular ASCII space."})
+    return issues
+
+
+WORDS = ("the quick brown fox jumps over lazy dog revenue quarter growth margin "
+         "Bristol Myers Squibb patient outcomes clinical trial results").split()
+
+
+def synth_page(rng: random.Random, n: int) -> Dict[str, Any]:
+    lines = []
+    for _ in range(60):
+        if rng.random() < 0.4:   # table row: padded columns, stray NBSPs
+            cells = [" ".join(rng.choices(WORDS, k=rng.randint(1, 3))) for _ in range(5)]
+            pad = lambda: " " * rng.randint(2, 8) if rng.random() < 0.8 else "\u00a0\u00a0"
+            lines.append("  " + pad().join(cells) + "   ")
+        else:                     # prose with occasional slips
+            words = rng.choices(WORDS, k=14)
+            line = " ".join(words)
+            if rng.random() < 0.3:
+                line = line.replace(" ", "  ", 1)
+            if rng.random() < 0.2:
+                line += " ."
+            if rng.random() < 0.1:
+                line = line.replace(" ", "\u00a0", 1)
+            lines.append(line)
+    text = "\n".join(lines)
+    return {"page_number": n, "text": text, "raw_text": text}
+
+
+def bench(fn, pages, repeat: int) -> Dict[str, float]:
+    times = []
+    count = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        count = len(fn(pages))
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    return {"best_s": times[0], "median_s": times[len(times) // 2], "issues": count}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--pages", type=int, default=200)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    pages = [synth_page(rng, i + 1) for i in range(args.pages)]
+    chars = sum(len(p["text"]) for p in pages)
+    print(f"{args.pages} pages, {chars / 1e6:.2f}M chars, best of {args.repeat}")
+
+    legacy = bench(legacy_find_extra_space_issues, pages, args.repeat)
+    single = bench(find_extra_space_issues, pages, args.repeat)
+    uncapped = bench(lambda p: find_extra_space_issues(p, max_per_rule=0), pages, args.repeat)
+    for name, r in (("legacy (5 regexes/line)", legacy), ("single pass, capped", single),
+                    ("single pass, uncapped", uncapped)):
+        print(f"  {name:<24} {r['best_s'] * 1000:8.1f} ms  (median {r['median_s'] * 1000:.1f} ms)  {r['issues']:>7} issues")
+    print(f"  speed-up (uncapped): {legacy['best_s'] / uncapped['best_s']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
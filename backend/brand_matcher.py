@@ -0,0 +1,231 @@
+# backend/brand_matcher.py — one-pass brand-variant scanner (Aho–Corasick)
+#
+# Every `disallow` string in brand_rules.json is compiled into one automaton, so a page is
+# scanned once no matter how many brands or variants the rules list. Preferred and legal
+# forms go into the same automaton as "allow" patterns: with leftmost-longest selection,
+# "Bristol-Myers Squibb Company" (legal) wins over the disallowed "Bristol-Myers Squibb".
+#
+# mentions() additionally catches misspellings nobody listed ("Bristal Myers") by matching
+# page words within an edit or two of the brand's name tokens, via a symmetric-delete index.
+import re
+from collections import deque
+from typing import Any, Dict, FrozenSet, List, Set, Tuple
+
+# Dash variants compare equal to "-"; any whitespace run (incl. NBSP, line breaks) to " "
+_DASHES = "-‐‑‒–—―−﹣－"
+_DASH_MAP = {ord(c): "-" for c in _DASHES}
+
+Match = Tuple[int, int, Dict[str, Any]]   # (start, end, pattern info) in original offsets
+
+# Fuzzy mentions: only distinctive name tokens take part; short ones and corporate filler
+# would match half the dictionary.
+_FUZZY_MIN_LEN = 5
+_GENERIC_TOKENS = frozenset({
+    "company", "companies", "corporation", "group", "holdings", "incorporated", "international",
+    "limited", "global", "pharma", "pharmaceutical", "pharmaceuticals", "services", "solutions",
+    "systems", "technologies", "partners",
+})
+_WORD = re.compile(r"[^\W\d_]+")
+
+
+def _normalize(text: str, loose: bool = False) -> Tuple[str, List[int]]:
+    # Returns the normalized string plus, for each of its characters, the original offset.
+    # `loose` also folds dashes into spaces ("Bristol-Myers" ~ "Bristol Myers") for mentions.
+    out: List[str] = []
+    offsets: List[int] = []
+    in_space = False
+    for i, ch in enumerate(text):
+        if ch.isspace() or (loose and ch in _DASHES):
+            if not in_space:
+                out.append(" ")
+                offsets.append(i)
+            in_space = True
+            continue
+        in_space = False
+        out.append(ch.translate(_DASH_MAP).casefold()[:1] or ch)
+        offsets.append(i)
+    return "".join(out), offsets
+
+
+def normalize_pattern(s: str, loose: bool = False) -> str:
+    return _normalize((s or "").strip(), loose)[0].strip()
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _max_edits(n: int) -> int:
+    return 1 if n < 8 else 2
+
+
+def _deletes(word: str, depth: int) -> Set[str]:
+    # `word` plus every string reachable by deleting up to `depth` characters
+    out = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        out |= frontier
+    return out
+
+
+def _within(a: str, b: str, k: int) -> bool:
+    # Edit distance (insert/delete/substitute/adjacent swap) of a and b is at most k
+    if abs(len(a) - len(b)) > k:
+        return False
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > k:
+            return False
+        prev2, prev = prev, cur
+    return prev[-1] <= k
+
+
+class _Automaton:
+    """Aho–Corasick automaton over normalized strings; each pattern carries an info dict."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self.patterns: List[Dict[str, Any]] = []
+
+    def add(self, norm: str, info: Dict[str, Any]) -> None:
+        node = 0
+        for ch in norm:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        info["length"] = len(norm)
+        self._out[node].append(len(self.patterns))
+        self.patterns.append(info)
+
+    def build(self) -> None:
+        q = deque(self._goto[0].values())
+        while q:
+            node = q.popleft()
+            for ch, nxt in self._goto[node].items():
+                q.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0) if self._goto[f].get(ch, 0) != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def matches(self, norm: str) -> List[Tuple[int, int, int]]:
+        # (start, end, pattern id) for every occurrence that sits on word boundaries
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        n = len(norm)
+        found: List[Tuple[int, int, int]] = []
+        node = 0
+        for i, ch in enumerate(norm):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pid in out[node]:
+                start = i + 1 - patterns[pid]["length"]
+                if (start == 0 or not _is_word(norm[start - 1])) and (i + 1 == n or not _is_word(norm[i + 1])):
+                    found.append((start, i + 1, pid))
+        return found
+
+
+class BrandMatcher:
+    """Disallowed-variant finder plus a looser brand-mention scan, both one pass per page."""
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        self.rules = rules
+        self._variants = _Automaton()
+        self._mentions = _Automaton()
+        self._token_rules: Dict[str, Set[int]] = {}     # distinctive name token -> rule indexes
+        self._fuzzy: Dict[str, Set[str]] = {}           # delete-variant -> tokens it came from
+
+        allowed = set()
+        for r in rules:
+            for s in [r.get("preferred"), r.get("name")] + list(r.get("legal_names") or []):
+                norm = normalize_pattern(s or "")
+                if norm and norm not in allowed:
+                    allowed.add(norm)
+                    self._variants.add(norm, {"allow": True, "text": s})
+        seen = set()
+        for r in rules:
+            preferred = r.get("preferred") or r.get("name") or ""
+            for s in r.get("disallow") or []:
+                norm = normalize_pattern(s)
+                # A variant that only differs from an allowed form by case/dash/spacing isn't one
+                if not norm or norm in allowed or norm in seen:
+                    continue
+                seen.add(norm)
+                self._variants.add(norm, {"allow": False, "text": s, "preferred": preferred, "brand": r.get("name")})
+        self._variants.build()
+
+        for i, r in enumerate(rules):
+            forms = ([r.get("name"), r.get("preferred")] + list(r.get("abbreviations") or [])
+                     + list(r.get("legal_names") or []) + list(r.get("disallow") or []))
+            for norm in {normalize_pattern(f or "", loose=True) for f in forms}:
+                if norm:
+                    self._mentions.add(norm, {"rule": i})
+            for f in [r.get("name"), r.get("preferred")] + list(r.get("legal_names") or []):
+                for tok in _WORD.findall(normalize_pattern(f or "", loose=True)):
+                    if len(tok) >= _FUZZY_MIN_LEN and tok not in _GENERIC_TOKENS:
+                        self._token_rules.setdefault(tok, set()).add(i)
+        self._mentions.build()
+        for tok in self._token_rules:
+            for d in _deletes(tok, _max_edits(len(tok))):
+                self._fuzzy.setdefault(d, set()).add(tok)
+
+    def __len__(self) -> int:
+        return sum(1 for p in self._variants.patterns if not p["allow"])
+
+    def find(self, text: str) -> List[Match]:
+        """Disallowed variants in `text`, leftmost-longest, skipping allowed forms."""
+        if not self._variants.patterns or not text:
+            return []
+        norm, offsets = _normalize(text)
+        cands = self._variants.matches(norm)
+        cands.sort(key=lambda c: (c[0], c[0] - c[1]))
+        out: List[Match] = []
+        pos = 0
+        for s, e, pid in cands:
+            if s < pos:
+                continue
+            pos = e
+            info = self._variants.patterns[pid]
+            if not info["allow"]:
+                out.append((offsets[s], offsets[e - 1] + 1, info))
+        return out
+
+    def mentions(self, text: str) -> FrozenSet[int]:
+        """Indexes into `rules` of brands named in `text` in any form (case/dash/spacing-insensitive),
+        including near-misses of a distinctive name token ("Bristal", "Squib")."""
+        if not self._mentions.patterns or not text:
+            return frozenset()
+        norm, _ = _normalize(text, loose=True)
+        found = {self._mentions.patterns[pid]["rule"] for _, _, pid in self._mentions.matches(norm)}
+        if len(found) < len(self.rules):
+            found |= self._fuzzy_mentions(norm)
+        return frozenset(found)
+
+    def _fuzzy_mentions(self, norm: str) -> Set[int]:
+        found: Set[int] = set()
+        hit: Set[str] = set()
+        for word in set(_WORD.findall(norm)):
+            if len(word) < _FUZZY_MIN_LEN - 1:
+                continue
+            for d in _deletes(word, 2):
+                for tok in self._fuzzy.get(d, ()):
+                    if tok not in hit and _within(word, tok, _max_edits(len(tok))):
+                        hit.add(tok)
+                        found |= self._token_rules[tok]
+        return found
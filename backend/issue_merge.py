@@ -0,0 +1,161 @@
+# backend/issue_merge.py — collapse duplicate issues before annotation
+#
+# The model and the local rules often flag the same thing twice. Issues are merged only when
+# they point at the same problem, never merely because their excerpts share a line:
+#   * problem spans — the flagged text itself: `span` from the local rules, or for model
+#     issues the text their `problem` quotes, found inside their excerpt — that are
+#     identical or overlap, or
+#   * exact duplicates: same page, same excerpt span, same type.
+# A merged issue lists each distinct problem and suggestion in its note, so annotation and
+# the summary scale with distinct findings rather than raw hits.
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+MERGE_MAX_SPAN = int(os.getenv("ISSUE_MERGE_MAX_SPAN", "300"))   # chars; never grow an excerpt past this
+MERGE_VERSION = 2   # bump when the merge rules change (part of the result cache key)
+
+Span = Tuple[int, int]
+
+_QUOTED = re.compile(r"“([^”]+)”|\"([^\"]+)\"")
+
+
+def _norm(s: str) -> str:
+    return " ".join((s or "").split()).casefold()
+
+
+def locate_span(text: str, excerpt: str) -> Optional[Span]:
+    """Character span of `excerpt` in `text`: exact first, then whitespace-insensitive."""
+    excerpt = (excerpt or "").strip()
+    if not excerpt or not text:
+        return None
+    if excerpt.endswith("...") or excerpt.endswith("…"):
+        excerpt = excerpt.rstrip(".…").rstrip()   # truncated excerpt: match the prefix
+    i = text.find(excerpt)
+    if i >= 0:
+        return i, i + len(excerpt)
+    words = excerpt.split()
+    if not words or len(words) > 80:
+        return None
+    m = re.search(r"\s+".join(re.escape(w) for w in words), text)
+    return (m.start(), m.end()) if m else None
+
+
+def _combine(group: List[Dict[str, Any]], text: str, span: Optional[Span]) -> Dict[str, Any]:
+    if len(group) == 1:
+        return group[0]
+    first = group[0]
+    distinct: List[Dict[str, str]] = []
+    seen = set()
+    for it in group:
+        key = (_norm(it.get("problem", "")), _norm(it.get("suggestion", "")))
+        if key in seen:
+            continue
+        seen.add(key)
+        distinct.append({
+            "type": it.get("type") or "issue",
+            "problem": (it.get("problem") or "").strip(),
+            "suggestion": (it.get("suggestion") or "").strip(),
+        })
+    types = list(dict.fromkeys(d["type"] for d in distinct))
+    merged = dict(first)
+    if span is not None:
+        merged["sentence_or_excerpt"] = text[span[0]:span[1]]
+    merged["merged_count"] = len(group)
+    if len(distinct) == 1:
+        return merged
+    merged["type"] = "/".join(types)
+    # Same problem with different fixes (or the reverse) keeps every distinct line once
+    merged["problem"] = "\n".join(f"• {p}" for p in dict.fromkeys(d["problem"] for d in distinct))
+    suggestions = dict.fromkeys(d["suggestion"] for d in distinct if d["suggestion"])
+    merged["suggestion"] = "\n".join(f"• {s}" for s in suggestions)
+    merged["problems"] = distinct
+    return merged
+
+
+def _page_of(issue: Dict[str, Any]) -> int:
+    try:
+        return int(issue.get("page", 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _given_span(issue: Dict[str, Any], text: str) -> Optional[Span]:
+    span = issue.get("span")
+    try:
+        start, end = int(span[0]), int(span[1])
+    except (TypeError, ValueError, IndexError, KeyError):
+        return None
+    return (start, end) if 0 <= start < end <= len(text) else None
+
+
+def _quoted_span(issue: Dict[str, Any], text: str, excerpt: Span) -> Optional[Span]:
+    # Model issues name the offending text in quotes ("Period after weekday in “Monday.”");
+    # the first quote that occurs inside the excerpt is the problem span
+    window = text[excerpt[0]:excerpt[1]]
+    for m in _QUOTED.finditer(issue.get("problem") or ""):
+        quoted = (m.group(1) or m.group(2) or "").strip()
+        i = window.find(quoted) if quoted else -1
+        if i >= 0 and window.find(quoted, i + 1) < 0:   # ambiguous if quoted twice
+            return excerpt[0] + i, excerpt[0] + i + len(quoted)
+    return None
+
+
+def _merged_excerpt(text: str, excerpts: List[Span], max_span: int) -> Optional[Span]:
+    if not excerpts:
+        return None
+    start, end = min(e[0] for e in excerpts), max(e[1] for e in excerpts)
+    return (start, end) if end - start <= max_span else excerpts[0]
+
+
+def merge_issues(issues: List[Dict[str, Any]], pages: List[Dict[str, Any]],
+                 max_span: int = MERGE_MAX_SPAN) -> List[Dict[str, Any]]:
+    texts = {p["page_number"]: p.get("raw_text") or p.get("text") or "" for p in pages}
+    excerpts: Dict[int, Span] = {}                           # issue index → excerpt span
+    flagged: Dict[int, List[Tuple[int, int, int]]] = {}     # page → (problem start, end, issue index)
+    exact: Dict[Tuple, List[int]] = {}                      # (page, excerpt span or text, type, ...) → indexes
+
+    for idx, it in enumerate(issues):
+        page = _page_of(it)
+        text = texts.get(page, "")
+        excerpt = locate_span(text, it.get("sentence_or_excerpt", ""))
+        if excerpt is not None:
+            excerpts[idx] = excerpt
+        problem = _given_span(it, text)
+        if problem is None and excerpt is not None:
+            problem = _quoted_span(it, text, excerpt)
+        if problem is not None:
+            flagged.setdefault(page, []).append((problem[0], problem[1], idx))
+        elif excerpt is not None:
+            exact.setdefault((page, excerpt, _norm(it.get("type", ""))), []).append(idx)
+        else:
+            key = (page, -1, _norm(it.get("sentence_or_excerpt", "")), _norm(it.get("problem", "")))
+            exact.setdefault(key, []).append(idx)
+
+    out: List[Tuple[int, int, Dict[str, Any]]] = []
+
+    def emit(page: int, idxs: List[int], problem: Optional[Span]) -> None:
+        text = texts.get(page, "")
+        ex = _merged_excerpt(text, [excerpts[i] for i in idxs if i in excerpts], max_span)
+        merged = _combine([issues[i] for i in idxs], text, ex)
+        if problem is not None and len(idxs) > 1:
+            merged["span"] = [problem[0], problem[1]]
+        out.append((page, ex[0] if ex else -1, merged))
+
+    for page, spans in flagged.items():
+        spans.sort()
+        g_start, g_end, g_idx = spans[0][0], spans[0][1], [spans[0][2]]
+        for start, end, idx in spans[1:]:
+            if start < g_end:   # identical or overlapping problem text
+                g_end = max(g_end, end)
+                g_idx.append(idx)
+                continue
+            emit(page, g_idx, (g_start, g_end))
+            g_start, g_end, g_idx = start, end, [idx]
+        emit(page, g_idx, (g_start, g_end))
+
+    for key, idxs in exact.items():
+        emit(key[0], idxs, None)
+
+    out.sort(key=lambda x: (x[0], x[1]))
+    return [it for _, _, it in out]
@@ -0,0 +1,164 @@
+# backend/issue_stream.py — incremental parser for the model's {"issues": [...]} output
+#
+# The completion is streamed, and each issue object is yielded as soon as its closing brace
+# arrives, so issues flow downstream while the model is still generating. A truncated or
+# malformed tail loses only the unfinished object: everything already closed survives and
+# close() raises PartialOutputError carrying it, so only that chunk needs a retry.
+import json
+from typing import Any, Dict, List, Optional
+
+ISSUE_FIELDS = ("type", "page", "sentence_or_excerpt", "problem", "suggestion")
+
+# Strict JSON schema for the chat completions `response_format`
+ISSUES_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "issues": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "type": {"type": "string"},
+                    "page": {"type": "integer"},
+                    "sentence_or_excerpt": {"type": "string"},
+                    "problem": {"type": "string"},
+                    "suggestion": {"type": "string"},
+                },
+                "required": list(ISSUE_FIELDS),
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["issues"],
+    "additionalProperties": False,
+}
+
+
+class PartialOutputError(ValueError):
+    """The output ended before a complete issues array; `issues` holds what did parse."""
+
+    def __init__(self, message: str, issues: List[Dict[str, Any]]):
+        super().__init__(message)
+        self.issues = issues
+
+
+def normalize_issue(obj: Any) -> Optional[Dict[str, Any]]:
+    # Drop anything that can't be an issue; coerce the rest to the documented field types
+    if not isinstance(obj, dict):
+        return None
+    try:
+        page = int(obj.get("page", 0))
+    except (TypeError, ValueError):
+        page = 0
+    out = {k: v for k, v in obj.items() if k not in ISSUE_FIELDS}
+    out.update({
+        "type": str(obj.get("type") or "other"),
+        "page": page,
+        "sentence_or_excerpt": str(obj.get("sentence_or_excerpt") or ""),
+        "problem": str(obj.get("problem") or ""),
+        "suggestion": str(obj.get("suggestion") or ""),
+    })
+    if not (out["problem"] or out["sentence_or_excerpt"]):
+        return None
+    return out
+
+
+class IssueStreamParser:
+    """Feed text deltas; get back the issue objects completed by each delta."""
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0            # next unscanned offset in _buf
+        self._in_array = False
+        self._done = False
+        self._depth = 0          # nesting depth inside the issues array
+        self._obj_start = -1
+        self._in_str = False
+        self._escape = False
+        self.issues: List[Dict[str, Any]] = []
+        self.dropped = 0
+
+    @property
+    def complete(self) -> bool:
+        return self._done
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        if self._done or not text:
+            return []
+        self._buf += text
+        if not self._in_array:
+            # Skip code fences/prose; the array starts at the first "[" after the "issues" key
+            key = self._buf.find('"issues"')
+            if key < 0:
+                return []
+            bracket = self._buf.find("[", key)
+            if bracket < 0:
+                return []
+            self._in_array = True
+            self._pos = bracket + 1
+
+        new: List[Dict[str, Any]] = []
+        buf = self._buf
+        i = self._pos
+        n = len(buf)
+        while i < n:
+            ch = buf[i]
+            if self._in_str:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_str = False
+            elif ch == '"':
+                self._in_str = True
+            elif ch in "{[":
+                if self._depth == 0 and ch == "{":
+                    self._obj_start = i
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 0:
+                    if ch == "]":
+                        self._done = True
+                        i += 1
+                        break
+                    # a stray "}" between items; ignore it
+                else:
+                    self._depth -= 1
+                    if self._depth == 0 and ch == "}" and self._obj_start >= 0:
+                        issue = self._parse(buf[self._obj_start:i + 1])
+                        self._obj_start = -1
+                        if issue is not None:
+                            new.append(issue)
+            i += 1
+
+        # Drop scanned text we no longer need (keep an open object intact)
+        keep = self._obj_start if self._obj_start >= 0 else i
+        self._buf = buf[keep:]
+        self._pos = i - keep
+        if self._obj_start >= 0:
+            self._obj_start = 0
+        self.issues.extend(new)
+        return new
+
+    def _parse(self, text: str) -> Optional[Dict[str, Any]]:
+        try:
+            issue = normalize_issue(json.loads(text))
+        except ValueError:
+            issue = None
+        if issue is None:
+            self.dropped += 1
+        return issue
+
+    def close(self) -> List[Dict[str, Any]]:
+        """All parsed issues; raises PartialOutputError if the array never closed."""
+        if not self._done:
+            what = "no issues array" if not self._in_array else "truncated issues array"
+            raise PartialOutputError(f"AI response has {what}", list(self.issues))
+        return list(self.issues)
+
+
+def parse_issues(text: str) -> List[Dict[str, Any]]:
+    parser = IssueStreamParser()
+    parser.feed(text or "")
+    return parser.close()
@@ -0,0 +1,134 @@
+# backend/jobs.py — background executor for proofreading jobs
+import os
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from time import sleep
+from typing import Callable
+
+from db import db
+from models import ProofJob
+
+
+class JobRunner:
+    """Works ProofJob rows on a small thread pool behind a bounded queue.
+
+    Job state lives in the database, so any worker process can answer status
+    polls and jobs interrupted by a restart are picked up again by `resume()`.
+    Finished jobs (row, upload and annotated result) are deleted `ttl` seconds after
+    they finish by `sweep()`, which runs on resume and every `sweep_every` seconds.
+    """
+
+    def __init__(self, app, process: Callable[[ProofJob, Callable[[str, float], None]], None],
+                 workers: int = 2, max_queued: int = 32, stale_after: float = 900.0,
+                 ttl: float = 86400.0, sweep_every: float = 600.0):
+        self.app = app
+        self.process = process
+        self.stale_after = stale_after
+        self.ttl = ttl
+        self.sweep_every = sweep_every
+        self._sweeper = None
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="proof-job")
+        self._slots = threading.BoundedSemaphore(max(1, max_queued))
+
+    def submit(self, job_id: str) -> bool:
+        if not self._slots.acquire(blocking=False):
+            return False
+        try:
+            self._executor.submit(self._run, job_id)
+        except Exception:
+            self._slots.release()
+            raise
+        return True
+
+    def resume(self) -> int:
+        # Re-queue work left behind by a previous process (queued, or running but gone quiet)
+        self.sweep()
+        self._start_sweeper()
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        with self.app.app_context():
+            stale = ProofJob.query.filter(ProofJob.status == "running", ProofJob.updated_at < cutoff).all()
+            for job in stale:
+                job.status = "queued"
+                job.updated_at = datetime.utcnow()
+            db.session.commit()
+            ids = [j.id for j in ProofJob.query.filter_by(status="queued").order_by(ProofJob.created_at).all()]
+        return sum(1 for job_id in ids if self.submit(job_id))
+
+    def sweep(self) -> int:
+        """Delete finished jobs last updated more than `ttl` seconds ago; returns how many."""
+        if self.ttl <= 0:
+            return 0
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+        with self.app.app_context():
+            expired = ProofJob.query.filter(ProofJob.status.in_(("done", "failed")),
+                                            ProofJob.updated_at < cutoff).all()
+            for job in expired:
+                for path in (job.result_path, job.input_path):
+                    if not path:
+                        continue
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        print(f"WARN: could not remove {path}:", e)
+                db.session.delete(job)
+            db.session.commit()
+        if expired:
+            print(f"Expired {len(expired)} finished job(s)")
+        return len(expired)
+
+    def _start_sweeper(self) -> None:
+        if self.ttl <= 0 or self.sweep_every <= 0 or self._sweeper is not None:
+            return
+
+        def loop() -> None:
+            while True:
+                sleep(self.sweep_every)
+                try:
+                    self.sweep()
+                except Exception as e:
+                    print("WARN: job sweep failed:", e)
+
+        self._sweeper = threading.Thread(target=loop, name="proof-job-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def _claim(self, job_id: str) -> bool:
+        # Atomic queued → running so two processes never work the same job
+        n = ProofJob.query.filter_by(id=job_id, status="queued").update(
+            {"status": "running", "stage": "starting", "updated_at": datetime.utcnow()},
+            synchronize_session=False,
+        )
+        db.session.commit()
+        return n == 1
+
+    def _run(self, job_id: str) -> None:
+        try:
+            with self.app.app_context():
+                if not self._claim(job_id):
+                    return
+                job = db.session.get(ProofJob, job_id)
+
+                def progress(stage: str, fraction: float) -> None:
+                    job.stage = stage
+                    job.progress = round(max(0.0, min(1.0, fraction)), 3)
+                    job.updated_at = datetime.utcnow()
+                    db.session.commit()
+
+                try:
+                    self.process(job, progress)
+                    job.status = "done"
+                    job.stage = "done"
+                    job.progress = 1.0
+                except Exception as e:
+                    print(f"ERROR in job {job_id}:", e)
+                    traceback.print_exc()
+                    db.session.rollback()
+                    job.status = "failed"
+                    job.error = str(e)[:2000]
+                job.updated_at = datetime.utcnow()
+                db.session.commit()
+        finally:
+            self._slots.release()
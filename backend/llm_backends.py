@@ -0,0 +1,145 @@
+# backend/llm_backends.py — stand-ins for the OpenAI backend (selected with LLM_BACKEND)
+#
+# Every backend exposes the same two methods as llm_client.LLMClient:
+#   chat(est_tokens, **chat_completions_kwargs) → an OpenAI-shaped response, or with
+#       stream=True an iterator of OpenAI-shaped stream events
+#   available() → False while the backend should be skipped (circuit breaker)
+# so run_ai_proof and everything downstream of it run unchanged offline and in CI.
+import json
+import os
+import random
+import re
+import threading
+from pathlib import Path
+from time import sleep
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+
+from proof_cache import sha256_hex
+
+_STREAM_PIECE = 24   # characters per fake stream delta
+
+
+def _response(content: str) -> Any:
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason="stop")])
+
+
+def _stream(content: str) -> Iterator[Any]:
+    for i in range(0, len(content), _STREAM_PIECE):
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content[i:i + _STREAM_PIECE]))])
+
+
+def _user_pages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # _proof_chunk sends "Pages:\n" + JSON list of {"page", "text"}
+    for m in messages:
+        content = m.get("content") or ""
+        if m.get("role") == "user" and content.startswith("Pages:"):
+            try:
+                return json.loads(content.split("\n", 1)[1])
+            except (IndexError, ValueError):
+                return []
+    return []
+
+
+class FakeLLM:
+    """Deterministic offline backend: same pages in → same issues out.
+
+    Issues quote real lines from the page so annotation finds them; `issues_per_page`
+    may be fractional (0.5 → roughly every other page) and `latency` is seconds per call.
+    """
+
+    def __init__(self, latency: float = 0.0, issues_per_page: float = 2.0, seed: int = 0):
+        self.latency = max(0.0, latency)
+        self.issues_per_page = max(0.0, issues_per_page)
+        self.seed = seed
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return True
+
+    def _issues(self, pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        out = []
+        for p in pages:
+            text = p.get("text") or ""
+            rng = random.Random(f"{self.seed}:{sha256_hex(text)}")
+            n = int(self.issues_per_page) + (rng.random() < self.issues_per_page % 1)
+            lines = [ln.strip() for ln in text.splitlines() if len(ln.strip()) >= 12]
+            for k in range(n if lines else 0):
+                line = rng.choice(lines)
+                words = re.findall(r"[A-Za-z]{4,}", line)
+                word = rng.choice(words) if words else line[:12]
+                out.append({
+                    "type": rng.choice(("grammar", "spelling", "style", "punctuation")),
+                    "page": p.get("page", 1),
+                    "sentence_or_excerpt": line[:120],
+                    "problem": f"Synthetic issue {k + 1} near “{word}”.",
+                    "suggestion": f"Review “{word}”.",
+                })
+        return out
+
+    def chat(self, est_tokens: int = 0, stream: bool = False, **kwargs) -> Any:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            sleep(self.latency)
+        content = json.dumps({"issues": self._issues(_user_pages(kwargs.get("messages") or []))})
+        return _stream(content) if stream else _response(content)
+
+
+class RecordReplayLLM:
+    """Stores completions on disk keyed by a hash of the request, and plays them back.
+
+    With `inner` set it records (calls inner on a miss, saves the text); without it
+    it only replays and a miss raises KeyError, so CI never reaches the network.
+    """
+
+    def __init__(self, directory, inner: Optional[Any] = None):
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.inner = inner
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def request_key(kwargs: Dict[str, Any]) -> str:
+        fields = {k: kwargs.get(k) for k in ("model", "messages", "temperature", "response_format")}
+        return sha256_hex(json.dumps(fields, sort_keys=True, ensure_ascii=False))
+
+    def available(self) -> bool:
+        return self.inner.available() if self.inner is not None else True
+
+    def _path(self, key: str) -> Path:
+        return self.dir / f"{key}.json"
+
+    def _save(self, key: str, kwargs: Dict[str, Any], content: str) -> None:
+        record = {"model": kwargs.get("model"), "content": content}
+        tmp = self._path(key).with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(record, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self._path(key))
+
+    def _record_stream(self, key: str, kwargs: Dict[str, Any], events: Iterator[Any]) -> Iterator[Any]:
+        parts: List[str] = []
+        for event in events:
+            if event.choices:
+                piece = getattr(event.choices[0].delta, "content", None)
+                if piece:
+                    parts.append(piece)
+            yield event
+        self._save(key, kwargs, "".join(parts))   # only complete streams are recorded
+
+    def chat(self, est_tokens: int = 0, stream: bool = False, **kwargs) -> Any:
+        key = self.request_key(kwargs)
+        path = self._path(key)
+        if path.exists():
+            self.hits += 1
+            content = json.loads(path.read_text(encoding="utf-8"))["content"]
+            return _stream(content) if stream else _response(content)
+        self.misses += 1
+        if self.inner is None:
+            raise KeyError(f"No recorded LLM response for request {key[:12]} in {self.dir}")
+        if stream:
+            return self._record_stream(key, kwargs, self.inner.chat(est_tokens, stream=True, **kwargs))
+        resp = self.inner.chat(est_tokens, **kwargs)
+        self._save(key, kwargs, resp.choices[0].message.content or "")
+        return resp
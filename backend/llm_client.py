@@ -0,0 +1,251 @@
+# backend/llm_client.py — shared, rate-aware wrapper around the OpenAI client
+#
+# Every chunk worker goes through one LLMClient, which
+#   * keeps a single pooled HTTP client with explicit timeouts (built on first use),
+#   * waits on token buckets for requests/minute and tokens/minute before each call,
+#   * retries 429/5xx/connection errors with exponential backoff + full jitter, honoring
+#     the server's Retry-After (for streams: errors before the first event),
+#   * trips a circuit breaker after repeated failures so callers can fall back to the
+#     local rules instead of queueing behind a dead upstream; a stream counts as a success
+#     only once it has been read to the end, and an error mid-stream counts as a failure, and
+#   * settles the tokens/minute bucket against the usage the API reports.
+import random
+import threading
+from time import monotonic, sleep
+from typing import Any, Callable, Iterator, Optional
+
+import openai
+
+from metrics import counter
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+LLM_RETRIES = counter("llm_retries_total", "LLM calls retried after a retryable error", ("reason",))
+LLM_RATE_LIMITED = counter("llm_rate_limited_total", "LLM calls held back by a rate limit", ("source",))
+LLM_CIRCUIT_REJECTED = counter("llm_circuit_rejected_total", "LLM calls refused while the circuit breaker was open")
+
+
+class CircuitOpenError(RuntimeError):
+    """The LLM is considered unavailable; use local results only."""
+
+
+class TokenBucket:
+    """Refills `rate_per_min` units per minute up to `capacity`; acquire() blocks until granted."""
+
+    def __init__(self, rate_per_min: float, capacity: Optional[float] = None):
+        self.rate = max(0.0, rate_per_min) / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_min)
+        self._tokens = self.capacity
+        self._stamp = monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n: float = 1.0, timeout: float = 120.0) -> bool:
+        if self.rate <= 0:
+            return True                 # unlimited
+        n = min(n, self.capacity)       # a single oversized request must still be able to run
+        deadline = monotonic() + timeout
+        while True:
+            with self._lock:
+                now = monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return True
+                wait = (n - self._tokens) / self.rate
+            if monotonic() + wait > deadline:
+                return False
+            sleep(min(wait, 1.0))
+
+    def credit(self, n: float) -> None:
+        # Give back an over-estimate, or (n < 0) charge for an under-estimate after the fact
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + n)
+
+
+class CircuitBreaker:
+    """closed → open after `threshold` consecutive failures; half-open after `reset_after` seconds."""
+
+    def __init__(self, threshold: int = 5, reset_after: float = 60.0):
+        self.threshold = max(1, threshold)
+        self.reset_after = reset_after
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if monotonic() - self._opened_at >= self.reset_after else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if monotonic() - self._opened_at < self.reset_after:
+                return False
+            self._opened_at = monotonic()   # half-open: let this one probe through, hold the rest
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.threshold or self._opened_at is not None:
+                self._opened_at = monotonic()   # (re)open; a failed half-open probe restarts the timer
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for name in ("retry-after-ms", "retry-after"):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            seconds = float(value)
+        except (TypeError, ValueError):
+            continue
+        return seconds / 1000.0 if name.endswith("-ms") else seconds
+    return None
+
+
+def _retryable(exc: Exception) -> bool:
+    if isinstance(exc, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    return isinstance(exc, openai.APIStatusError) and status in RETRYABLE_STATUS
+
+
+class LLMClient:
+    def __init__(
+        self,
+        api_key: Optional[str],
+        max_connections: int = 8,
+        timeout: float = 120.0,
+        rpm: float = 0.0,
+        tpm: float = 0.0,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        breaker: Optional[CircuitBreaker] = None,
+        make_client: Optional[Callable[[], Any]] = None,
+    ):
+        self.api_key = api_key
+        self.max_connections = max(1, max_connections)
+        self.timeout = timeout
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self._make_client = make_client or self._default_client
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def _default_client(self):
+        import httpx   # shipped with the openai package
+
+        http_client = openai.DefaultHttpxClient(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+        # Retries happen here, where they can see the rate limiter and the breaker
+        return openai.OpenAI(api_key=self.api_key, timeout=self.timeout, max_retries=0, http_client=http_client)
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._make_client()
+        return self._client
+
+    def available(self) -> bool:
+        # Doesn't consume the half-open probe; chat() does that
+        return self.breaker.state != "open"
+
+    def _backoff(self, attempt: int, exc: Exception) -> float:
+        hinted = _retry_after(exc)
+        if hinted is not None:
+            return min(self.backoff_max, hinted)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _settle_tokens(self, est_tokens: int, usage: Any) -> None:
+        used = getattr(usage, "total_tokens", None)
+        if used is not None:
+            self.tokens.credit(min(est_tokens, self.tokens.capacity) - used)
+
+    def _watch_stream(self, resp: Any, first: Any, events: Iterator[Any], est_tokens: int) -> Iterator[Any]:
+        # The breaker hears about a stream once it is over, not when it opens. A caller that
+        # stops reading early reports nothing either way; the connection is closed regardless.
+        usage = None
+        try:
+            for event in ((first,) if first is not None else ()):
+                usage = getattr(event, "usage", None) or usage
+                yield event
+            for event in events:
+                usage = getattr(event, "usage", None) or usage
+                yield event
+        except Exception as e:
+            print(f"WARN: LLM stream failed mid-response ({type(e).__name__})")
+            self.breaker.record_failure()
+            raise
+        finally:
+            close = getattr(resp, "close", None)
+            if close is not None:
+                close()
+        self.breaker.record_success()
+        self._settle_tokens(est_tokens, usage)
+
+    def chat(self, est_tokens: int = 0, **kwargs) -> Any:
+        """chat.completions.create() behind the limiter, retry policy and circuit breaker.
+
+        With stream=True this returns an iterator of events; usage arrives on the last one.
+        """
+        if not self.breaker.allow():
+            LLM_CIRCUIT_REJECTED.inc()
+            raise CircuitOpenError("LLM circuit breaker is open")
+        stream = bool(kwargs.get("stream"))
+        if stream:
+            kwargs.setdefault("stream_options", {"include_usage": True})
+        for attempt in range(self.max_retries + 1):
+            if not (self.requests.acquire(1) and self.tokens.acquire(est_tokens)):
+                LLM_RATE_LIMITED.inc(source="local")
+                raise TimeoutError("Timed out waiting for the LLM rate limiter")
+            try:
+                resp = self.client.chat.completions.create(**kwargs)
+                if stream:
+                    # Nothing has reached the caller yet, so a failure up to here can be retried
+                    events = iter(resp)
+                    first = next(events, None)
+            except Exception as e:
+                status = getattr(e, "status_code", None)
+                if status == 429:
+                    LLM_RATE_LIMITED.inc(source="upstream")
+                if not _retryable(e):
+                    raise
+                if attempt >= self.max_retries:
+                    self.breaker.record_failure()
+                    raise
+                delay = self._backoff(attempt, e)
+                LLM_RETRIES.inc(reason=str(status or type(e).__name__))
+                print(f"WARN: LLM call failed ({type(e).__name__}), retry {attempt + 1} in {delay:.1f}s")
+                sleep(delay)
+                continue
+            if stream:
+                return self._watch_stream(resp, first, events, est_tokens)
+            self.breaker.record_success()
+            self._settle_tokens(est_tokens, getattr(resp, "usage", None))
+            return resp
@@ -0,0 +1,167 @@
+# backend/local_rules.py — deterministic checks that run before (or instead of) the LLM
+#
+# Each rule takes one page dict (from extract_pdf_text_per_page) plus a shared context and
+# returns issues in the same schema the model produces: type, page, sentence_or_excerpt,
+# problem, suggestion, plus `span` — [start, end) of the flagged text in the page text, which
+# issue_merge uses to tell duplicates from distinct problems in the same excerpt. Register new
+# checks with @register_rule("name").
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from brand_matcher import BrandMatcher
+from spacing import scan_page
+
+LocalRule = Callable[[Dict[str, Any], Dict[str, Any]], List[Dict[str, Any]]]
+
+_REGISTRY: Dict[str, LocalRule] = {}
+
+
+def register_rule(name: str) -> Callable[[LocalRule], LocalRule]:
+    def deco(fn: LocalRule) -> LocalRule:
+        _REGISTRY[name] = fn
+        return fn
+    return deco
+
+
+def registered_rules() -> List[str]:
+    return list(_REGISTRY)
+
+
+def excerpt_at(text: str, start: int, end: int, pad: int = 40) -> str:
+    # Clip to the surrounding line so the excerpt stays searchable on the page
+    line_start = text.rfind("\n", 0, start) + 1
+    line_end = text.find("\n", end)
+    if line_end < 0:
+        line_end = len(text)
+    return text[max(line_start, start - pad): min(line_end, end + pad)]
+
+
+def _issue(itype: str, page: Dict[str, Any], text: str, m: "re.Match", problem: str, suggestion: str) -> Dict[str, Any]:
+    return {
+        "type": itype,
+        "page": page["page_number"],
+        "sentence_or_excerpt": excerpt_at(text, m.start(), m.end()),
+        "problem": problem,
+        "suggestion": suggestion,
+        "span": [m.start(), m.end()],
+    }
+
+
+def _text(page: Dict[str, Any]) -> str:
+    return page.get("raw_text") or page.get("text") or ""
+
+
+# ---- Rules
+@register_rule("spacing")
+def spacing_rule(page: Dict[str, Any], ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return scan_page(_text(page), page["page_number"])
+
+
+_DOUBLED_PUNCT = re.compile(
+    r"(?<![.])\.\.(?![.])"                       # two periods (an ellipsis has three)
+    r"|([,;:])[ \t]?(?:[,;:]|\.(?![A-Za-z0-9]))"  # ",," ",." ";," ... (not ", .NET" or ", .5")
+    r"|(?<![A-Za-z])\.,"                         # ".," but not after "e.g." "etc." "Inc." "U.S."
+    r"|([!?])\2+"                                # "!!" "??"
+)
+
+
+@register_rule("doubled_punctuation")
+def doubled_punctuation_rule(page: Dict[str, Any], ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+    text = _text(page)
+    return [
+        _issue("punctuation", page, text, m,
+               f"Doubled punctuation “{m.group(0)}”.",
+               f"Use a single punctuation mark instead of “{m.group(0)}”.")
+        for m in _DOUBLED_PUNCT.finditer(text)
+    ]
+
+
+@register_rule("brand")
+def brand_rule(page: Dict[str, Any], ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+    matcher: Optional[BrandMatcher] = ctx.get("brand_matcher")
+    if matcher is None:
+        matcher = ctx["brand_matcher"] = BrandMatcher(ctx.get("brand_rules") or [])
+    text = _text(page)
+    out = []
+    for start, end, info in matcher.find(text):
+        found = text[start:end]
+        preferred = info.get("preferred") or ""
+        out.append({
+            "type": "brand_inconsistency",
+            "page": page["page_number"],
+            "sentence_or_excerpt": excerpt_at(text, start, end),
+            "problem": f"Inconsistent/outdated brand name “{found}”.",
+            "suggestion": f"Use “{preferred}”." if preferred else "Use the preferred brand name.",
+            "span": [start, end],
+        })
+    return out
+
+
+_WEEKDAY = r"(?:Mon|Tues|Wednes|Thurs|Fri|Satur|Sun)day"
+_MONTH = (r"(?:January|February|March|April|May|June|July|August|September|October|November|December"
+          r"|Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)")
+_DATE_PERIOD = re.compile(rf"\b({_WEEKDAY})\.[ \t]+({_MONTH}\.?[ \t]+\d{{1,2}}(?:st|nd|rd|th)?)\b")
+_DATE_NO_COMMA = re.compile(rf"\b({_WEEKDAY})[ \t]+({_MONTH}\.?[ \t]+\d{{1,2}}(?:st|nd|rd|th)?)\b")
+
+
+@register_rule("date_format")
+def date_format_rule(page: Dict[str, Any], ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+    text = _text(page)
+    out = []
+    for m in _DATE_PERIOD.finditer(text):
+        out.append(_issue("date_format", page, text, m,
+                          f"Period after weekday in date “{m.group(0)}”.",
+                          f"Use “{m.group(1)}, {m.group(2)}”."))
+    for m in _DATE_NO_COMMA.finditer(text):
+        out.append(_issue("date_format", page, text, m,
+                          f"Missing comma after weekday in date “{m.group(0)}”.",
+                          f"Use “{m.group(1)}, {m.group(2)}”."))
+    return out
+
+
+# Same line only: table cells often repeat across rows ("Yes\nYes").
+_REPEATED_WORD = re.compile(r"\b([A-Za-z][A-Za-z'’]*)[ \t]+\1\b", re.IGNORECASE)
+
+
+@register_rule("repeated_words")
+def repeated_words_rule(page: Dict[str, Any], ctx: Dict[str, Any]) -> List[Dict[str, Any]]:
+    text = _text(page)
+    return [
+        _issue("repeated_word", page, text, m,
+               f"Repeated word “{m.group(1)}”.",
+               f"Remove the duplicate “{m.group(1)}”.")
+        for m in _REPEATED_WORD.finditer(text)
+    ]
+
+
+# ---- Runner
+def make_context(brand_rules: Optional[List[Dict[str, Any]]] = None,
+                 brand_matcher: Optional[BrandMatcher] = None) -> Dict[str, Any]:
+    # Rules may memoize compiled state in the context; build one per request
+    ctx: Dict[str, Any] = {"brand_rules": brand_rules or []}
+    if brand_matcher is not None:
+        ctx["brand_matcher"] = brand_matcher
+    return ctx
+
+
+def page_local_issues(page: Dict[str, Any], ctx: Dict[str, Any],
+                      rules: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for name in (rules or _REGISTRY):
+        fn = _REGISTRY.get(name)
+        if fn is None:
+            continue
+        try:
+            out.extend(fn(page, ctx))
+        except Exception as e:
+            print(f"WARN: local rule {name!r} failed on page {page.get('page_number')}:", e)
+    return out
+
+
+def run_local_rules(pages: List[Dict[str, Any]], ctx: Dict[str, Any],
+                    rules: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    rules = list(rules) if rules is not None else None
+    out: List[Dict[str, Any]] = []
+    for p in pages:
+        out.extend(page_local_issues(p, ctx, rules))
+    return out
@@ -0,0 +1,213 @@
+# backend/metrics.py — counters and histograms, exported in Prometheus text format
+#
+#   STAGE_SECONDS = histogram("proof_stage_seconds", "Time per pipeline stage", ("stage",))
+#   with STAGE_SECONDS.time(stage="extract"): ...
+#   CACHE = counter("proof_cache_requests_total", "Cache lookups", ("cache", "result"))
+#   CACHE.inc(cache="result", result="hit")
+#
+# Everything lives in process memory. Under gunicorn each worker has its own copy, so with
+# METRICS_DIR set every process also writes its series to METRICS_DIR/<pid>.json (at most
+# every METRICS_FLUSH_SECONDS, and at exit) and render() sums all files, so any worker can
+# answer /metrics for the whole server. Files of exited workers are kept so counters never
+# go backwards; point METRICS_DIR at a fresh directory per deploy.
+import atexit
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from time import monotonic, perf_counter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+METRICS_DIR = os.getenv("METRICS_DIR") or None
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_lock = threading.Lock()
+_metrics: Dict[str, "_Metric"] = {}
+_last_flush = 0.0
+
+
+def _label_key(names: Sequence[str], labels: Dict[str, Any]) -> str:
+    if set(labels) != set(names):
+        raise ValueError(f"expected labels {sorted(names)}, got {sorted(labels)}")
+    return json.dumps([str(labels[n]) for n in names])
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.series: Dict[str, Any] = {}
+
+    def state(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "help": self.help, "labels": list(self.labels), "series": self.series}
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, n: float = 1, **labels: Any) -> None:
+        key = _label_key(self.labels, labels)
+        with _lock:
+            self.series[key] = self.series.get(key, 0) + n
+        _maybe_flush()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def state(self) -> Dict[str, Any]:
+        return {**super().state(), "buckets": list(self.buckets)}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(self.labels, labels)
+        with _lock:
+            s = self.series.get(key)
+            if s is None:
+                s = self.series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    s["counts"][i] += 1
+                    break
+            s["sum"] += value
+            s["count"] += 1
+        _maybe_flush()
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        t0 = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - t0, **labels)
+
+
+def _register(metric: _Metric) -> Any:
+    with _lock:
+        existing = _metrics.get(metric.name)
+        if existing is not None:
+            if existing.kind != metric.kind or existing.labels != metric.labels:
+                raise ValueError(f"metric {metric.name} already registered differently")
+            return existing
+        _metrics[metric.name] = metric
+        return metric
+
+
+def counter(name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+    return _register(Counter(name, help, labels))
+
+
+def histogram(name: str, help: str, labels: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help, labels, buckets))
+
+
+# ---- Cross-process aggregation (METRICS_DIR)
+def _snapshot() -> Dict[str, Any]:
+    with _lock:
+        return json.loads(json.dumps({name: m.state() for name, m in _metrics.items()}))
+
+
+def flush() -> None:
+    global _last_flush
+    if not METRICS_DIR:
+        return
+    try:
+        directory = Path(METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{os.getpid()}.json"
+        tmp = path.with_name(f"{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(_snapshot()), encoding="utf-8")
+        os.replace(tmp, path)
+        _last_flush = monotonic()
+    except Exception as e:
+        print("WARN: metrics flush failed:", e)
+
+
+def _maybe_flush() -> None:
+    if METRICS_DIR and monotonic() - _last_flush >= METRICS_FLUSH_SECONDS:
+        flush()
+
+
+atexit.register(flush)
+
+
+def _merge(into: Dict[str, Any], other: Dict[str, Any]) -> None:
+    for name, m in other.items():
+        cur = into.get(name)
+        if cur is None:
+            into[name] = m
+            continue
+        if cur.get("kind") != m.get("kind") or cur.get("buckets") != m.get("buckets"):
+            continue   # a worker from an older deploy; skip rather than mis-add
+        for key, value in m["series"].items():
+            if m["kind"] == "counter":
+                cur["series"][key] = cur["series"].get(key, 0) + value
+            else:
+                s = cur["series"].get(key)
+                if s is None:
+                    cur["series"][key] = value
+                else:
+                    s["counts"] = [a + b for a, b in zip(s["counts"], value["counts"])]
+                    s["sum"] += value["sum"]
+                    s["count"] += value["count"]
+
+
+def collect() -> Dict[str, Any]:
+    """Every metric's series, summed over all worker files when METRICS_DIR is set."""
+    if not METRICS_DIR:
+        return _snapshot()
+    flush()
+    merged: Dict[str, Any] = {}
+    for path in sorted(Path(METRICS_DIR).glob("*.json")):
+        try:
+            _merge(merged, json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError) as e:
+            print(f"WARN: skipping metrics file {path.name}:", e)
+    return merged
+
+
+# ---- Text exposition format
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: List[str], values: List[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _num(v: float) -> str:
+    return repr(float(v)) if isinstance(v, float) and not float(v).is_integer() else str(int(v))
+
+
+def render() -> str:
+    lines: List[str] = []
+    for name, m in sorted(collect().items()):
+        lines.append(f"# HELP {name} {m['help']}")
+        lines.append(f"# TYPE {name} {m['kind']}")
+        for key, value in sorted(m["series"].items()):
+            values = json.loads(key)
+            if m["kind"] == "counter":
+                lines.append(f"{name}{_labels(m['labels'], values)} {_num(value)}")
+                continue
+            running = 0
+            for bound, n in zip(m["buckets"], value["counts"]):
+                running += n
+                lines.append(f"{name}_bucket{_labels(m['labels'], values, ('le', _num(bound)))} {running}")
+            lines.append(f"{name}_bucket{_labels(m['labels'], values, ('le', '+Inf'))} {value['count']}")
+            lines.append(f"{name}_sum{_labels(m['labels'], values)} {repr(float(value['sum']))}")
+            lines.append(f"{name}_count{_labels(m['labels'], values)} {value['count']}")
+    return "\n".join(lines) + "\n"
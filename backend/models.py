@@ -12,3 +12,43 @@ class Lead(db.Model):
     interest = db.Column(db.String(120), default="General", index=True)
     source = db.Column(db.String(120), default="agent_hub_frontend")
     ip = db.Column(db.String(64))
+
+class ProofJob(db.Model):
+    __tablename__ = "proof_jobs"
+    id = db.Column(db.String(32), primary_key=True)          # uuid4 hex; doubles as the access token
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    status = db.Column(db.String(20), nullable=False, default="queued", index=True)  # queued|running|done|failed
+    mode = db.Column(db.String(10), nullable=False, default="pdf")   # "pdf" (annotated) or "json" (issues only)
+    filename = db.Column(db.String(255))
+    upload_sha = db.Column(db.String(64), index=True)
+    input_path = db.Column(db.String(500))
+    result_path = db.Column(db.String(500))
+    stage = db.Column(db.String(40))
+    progress = db.Column(db.Float, nullable=False, default=0.0)
+    issue_count = db.Column(db.Integer)
+    issues_json = db.Column(db.Text)
+    error = db.Column(db.Text)
+    rule_set = db.Column(db.String(120))                     # tenant brand rule set (None = global file)
+
+class BrandRuleSet(db.Model):
+    __tablename__ = "brand_rule_sets"
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), nullable=False, unique=True, index=True)
+    api_key_sha = db.Column(db.String(64), unique=True, index=True)   # sha256 of the tenant's API key
+    version = db.Column(db.Integer, nullable=False, default=1)       # bumped on every change; part of cache keys
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    brands = db.relationship("BrandRule", backref="rule_set", cascade="all, delete-orphan",
+                             order_by="BrandRule.position")
+
+class BrandRule(db.Model):
+    __tablename__ = "brand_rules"
+    id = db.Column(db.Integer, primary_key=True)
+    rule_set_id = db.Column(db.Integer, db.ForeignKey("brand_rule_sets.id"), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    name = db.Column(db.String(200), nullable=False)
+    preferred = db.Column(db.String(200))
+    abbreviations_json = db.Column(db.Text)   # JSON lists, same shape as brand_rules.json
+    legal_names_json = db.Column(db.Text)
+    disallow_json = db.Column(db.Text)
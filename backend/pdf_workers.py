@@ -0,0 +1,179 @@
+# backend/pdf_workers.py — page-level PDF primitives, usable in-process or from a process pool
+#
+# PyMuPDF holds the GIL for the whole of a page layout/search, so threads don't help.
+# For large documents app.py can split page ranges across worker processes; each worker
+# opens the file itself and returns plain data (text records, highlight rectangles) that
+# the parent merges back in page order.
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import fitz  # PyMuPDF
+
+from proof_cache import sha256_hex
+from word_index import PageWordIndex
+
+# One layout pass per page: the default "text" flags already preserve ligatures and
+# whitespace, so a single TextPage serves the normalized view, the whitespace-preserving
+# view and every later search_for() during annotation.
+TEXTPAGE_FLAGS = getattr(fitz, "TEXTFLAGS_TEXT", 0) or (
+    getattr(fitz, "TEXT_PRESERVE_LIGATURES", 0) | getattr(fitz, "TEXT_PRESERVE_WHITESPACE", 0)
+)
+
+PDF_PARALLEL_PAGES = int(os.getenv("PDF_PARALLEL_PAGES", "0"))      # 0 = off; else min page count
+PDF_PARALLEL_WORKERS = int(os.getenv("PDF_PARALLEL_WORKERS", "0")) or (os.cpu_count() or 2)
+
+Placement = Tuple[int, List[Tuple[float, float, float, float]]]   # (issue index, rects)
+
+
+def page_record(page: fitz.Page, tp: fitz.TextPage) -> Dict[str, Any]:
+    raw = page.get_text("text", textpage=tp)
+    normalized = raw
+    return {
+        "page_index": page.number,
+        "page_number": page.number + 1,
+        "text": normalized,
+        "raw_text": raw or normalized,
+        "text_sha": sha256_hex(normalized),
+    }
+
+
+def safe_excerpt(s: str, limit: int = 200) -> str:
+    s = (s or "").strip()
+    return s if len(s) <= limit else s[: limit - 3] + "..."
+
+
+def locate_issue(page: fitz.Page, tp: fitz.TextPage, issue: Dict[str, Any],
+                 index: Optional[PageWordIndex] = None) -> List[fitz.Rect]:
+    # Word-index lookup first (fuzzy, cheap); exact page search only as a last resort
+    excerpt = safe_excerpt(issue.get("sentence_or_excerpt", ""))
+    problem = (issue.get("problem") or "").strip()
+    key = " ".join(problem.split()[:8])
+    if index is not None:
+        rects = index.locate(excerpt) if excerpt else []
+        if not rects and key:
+            rects = index.locate(key)
+        if rects:
+            return rects
+    rects: List[fitz.Rect] = []
+    if excerpt:
+        try:
+            rects = page.search_for(excerpt, quads=False, textpage=tp)
+        except Exception:
+            rects = []
+    if not rects and key and index is None:
+        try:
+            rects = page.search_for(key, quads=False, textpage=tp)
+        except Exception:
+            rects = []
+    return rects
+
+
+# ---- Worker entry points (must stay importable without app.py side effects)
+def _open(src) -> fitz.Document:
+    if isinstance(src, str):
+        return fitz.open(src)
+    return fitz.open(stream=src, filetype="pdf")
+
+
+def extract_range(src, start: int, stop: int) -> List[Dict[str, Any]]:
+    with _open(src) as doc:
+        out = []
+        for i in range(start, min(stop, len(doc))):
+            page = doc[i]
+            out.append(page_record(page, page.get_textpage(flags=TEXTPAGE_FLAGS)))
+        return out
+
+
+def locate_range(src, work: List[Tuple[int, int, Dict[str, Any]]]) -> List[Placement]:
+    # work: (issue index, 1-based page, issue) — sorted by page so each page is laid out once
+    out: List[Placement] = []
+    with _open(src) as doc:
+        page = tp = index = None
+        for idx, pg, issue in work:
+            if page is None or page.number != pg - 1:
+                page = doc[pg - 1]
+                tp = page.get_textpage(flags=TEXTPAGE_FLAGS)
+                index = PageWordIndex.from_page(page, tp)
+            out.append((idx, [tuple(r) for r in locate_issue(page, tp, issue, index)]))
+    return out
+
+
+# ---- Pool management (parent side)
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Never fork: the parent runs thread pools and holds open MuPDF state
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pool = ProcessPoolExecutor(max_workers=PDF_PARALLEL_WORKERS, mp_context=ctx)
+        return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def use_parallel(page_count: int) -> bool:
+    return PDF_PARALLEL_PAGES > 0 and page_count >= PDF_PARALLEL_PAGES and PDF_PARALLEL_WORKERS > 1
+
+
+def _ranges(n: int, parts: int) -> List[Tuple[int, int]]:
+    parts = max(1, min(parts, n))
+    step = -(-n // parts)
+    return [(a, min(n, a + step)) for a in range(0, n, step)]
+
+
+def parallel_extract(src, page_count: int) -> Optional[List[Dict[str, Any]]]:
+    """Extract all pages across the pool; None means "do it serially" (pool unavailable)."""
+    try:
+        pool = _get_pool()
+        futures = [pool.submit(extract_range, src, a, b) for a, b in _ranges(page_count, PDF_PARALLEL_WORKERS)]
+        pages: List[Dict[str, Any]] = []
+        for fut in futures:   # submission order == page order
+            pages.extend(fut.result())
+        return pages
+    except Exception as e:
+        print("WARN: parallel extraction failed, falling back to serial:", e)
+        _reset_pool()
+        return None
+
+
+def parallel_locate(src, work: Sequence[Tuple[int, int, Dict[str, Any]]]) -> Optional[Dict[int, List[fitz.Rect]]]:
+    """Locate issue rectangles across the pool; returns {issue index: rects} or None."""
+    work = sorted(work, key=lambda w: w[1])
+    if not work:
+        return {}
+    try:
+        pool = _get_pool()
+        # Split on page boundaries so no page is laid out by two workers
+        step = -(-len(work) // PDF_PARALLEL_WORKERS)
+        batches: List[List[Tuple[int, int, Dict[str, Any]]]] = []
+        cur: List[Tuple[int, int, Dict[str, Any]]] = []
+        for w in work:
+            if len(cur) >= step and cur[-1][1] != w[1]:
+                batches.append(cur)
+                cur = []
+            cur.append(w)
+        if cur:
+            batches.append(cur)
+        found: Dict[int, List[fitz.Rect]] = {}
+        for fut in [pool.submit(locate_range, src, b) for b in batches]:
+            for idx, rects in fut.result():
+                found[idx] = [fitz.Rect(r) for r in rects]
+        return found
+    except Exception as e:
+        print("WARN: parallel annotation lookup failed, falling back to serial:", e)
+        _reset_pool()
+        return None
@@ -0,0 +1,109 @@
+# backend/profiling.py — opt-in cProfile capture of a single request
+#
+#   with ProfileCapture("proofread", PROFILE_DIR) as capture:
+#       ...
+#       capture.tag(pdf_sha256=..., page_count=..., issue_count=...)
+#
+# Writes <id>.prof (pstats format: snakeviz, `python -m pstats`, pstats.Stats) next to
+# <id>.json with the tags and wall time, and keeps only the newest PROFILE_KEEP captures.
+# cProfile only sees the request's own thread: work fanned out to the AI chunk pool shows
+# up as time waiting in as_completed (the per-stage /metrics timings cover those threads).
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import uuid
+from datetime import datetime as dt
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+PROFILE_SORTS = ("cumulative", "tottime", "calls")
+
+_ID_RE = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$")
+
+
+class ProfileCapture:
+    def __init__(self, endpoint: str, directory: Path, keep: int = PROFILE_KEEP):
+        self.endpoint = endpoint
+        self.dir = Path(directory)
+        self.keep = keep
+        self.id = f"{dt.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        self.tags: Dict[str, Any] = {}
+        self._profiler = cProfile.Profile()
+        self._t0 = 0.0
+
+    def tag(self, **tags: Any) -> None:
+        self.tags.update(tags)
+
+    def __enter__(self) -> "ProfileCapture":
+        self._t0 = perf_counter()
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._profiler.disable()
+        meta = {
+            "id": self.id,
+            "endpoint": self.endpoint,
+            "created_at": dt.utcnow().isoformat() + "Z",
+            "seconds": round(perf_counter() - self._t0, 4),
+            "error": repr(exc) if exc is not None else None,
+            **self.tags,
+        }
+        try:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            self._profiler.dump_stats(str(self.dir / f"{self.id}.prof"))
+            (self.dir / f"{self.id}.json").write_text(json.dumps(meta), encoding="utf-8")
+            _prune(self.dir, self.keep)
+        except Exception as e:
+            print("WARN: could not save profile:", e)
+        return False
+
+
+def _by_age(directory: Path) -> List[Path]:
+    stamped = []
+    for path in Path(directory).glob("*.json"):
+        try:
+            stamped.append((path.stat().st_mtime_ns, path))
+        except FileNotFoundError:   # pruned by another worker meanwhile
+            continue
+    return [path for _, path in sorted(stamped)]
+
+
+def _prune(directory: Path, keep: int) -> None:
+    metas = _by_age(directory)
+    for old in metas[:max(0, len(metas) - keep)]:
+        for path in (old, old.with_suffix(".prof")):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(directory: Path) -> List[Dict[str, Any]]:
+    out = []
+    for path in reversed(_by_age(directory)):
+        try:
+            out.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return out
+
+
+def profile_path(directory: Path, profile_id: str) -> Optional[Path]:
+    if not _ID_RE.match(profile_id or ""):
+        return None
+    path = Path(directory) / f"{profile_id}.prof"
+    return path if path.exists() else None
+
+
+def profile_text(path: Path, sort: str = "cumulative", limit: int = 60) -> str:
+    """Human-readable pstats table of the top `limit` functions."""
+    out = io.StringIO()
+    stats = pstats.Stats(str(path), stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
@@ -0,0 +1,134 @@
+# backend/proof_cache.py — content-addressed cache for proofreading results
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from time import time
+from typing import Any, Dict, List, Optional
+
+
+def sha256_hex(data) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def result_key(upload_sha: str, prompt_sha: str, model: str) -> str:
+    # Same bytes + same prompt + same model → same issues
+    return sha256_hex(f"{upload_sha}:{prompt_sha}:{model}")
+
+
+def page_key(text_sha: str, prompt_sha: str, model: str) -> str:
+    # Page-level entries: unchanged page text under the same prompt/model is not re-checked
+    return sha256_hex(f"page:{text_sha}:{prompt_sha}:{model}")
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with a per-entry TTL."""
+
+    def __init__(self, max_items: int = 128, ttl: float = 3600.0):
+        self.max_items = max(1, max_items)
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            expires, value = hit
+            if expires < time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+
+class SQLiteCache:
+    """On-disk tier shared by every worker process on the host."""
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600.0):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS proof_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_proof_cache_expires ON proof_cache (expires_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM proof_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if not row or row[1] < time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        now = time()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO proof_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), now + self.ttl),
+            )
+            self._writes += 1
+            if self._writes % 50 == 0:
+                conn.execute("DELETE FROM proof_cache WHERE expires_at < ?", (now,))
+
+
+class ResultCache:
+    """LRU in front of an optional SQLite tier; values are issue lists."""
+
+    def __init__(self, max_items: int = 128, ttl: float = 3600.0,
+                 db_path: Optional[str] = None, db_ttl: float = 7 * 24 * 3600.0):
+        self.memory = LRUCache(max_items=max_items, ttl=ttl)
+        self.disk = SQLiteCache(db_path, ttl=db_ttl) if db_path else None
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            try:
+                value = self.disk.get(key)
+            except Exception as e:
+                print("WARN: proof cache read failed:", e)
+                value = None
+            if value is not None:
+                self.memory.set(key, value)
+        return None if value is None else [dict(it) for it in value]
+
+    def set(self, key: str, issues: List[Dict[str, Any]]) -> None:
+        value = [dict(it) for it in issues]
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except Exception as e:
+                print("WARN: proof cache write failed:", e)
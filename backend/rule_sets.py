@@ -0,0 +1,121 @@
+# backend/rule_sets.py — per-tenant brand rule sets stored in the database
+#
+# A tenant's requests pick their rule set by API key (X-API-Key header); naming one with the
+# `rule_set` parameter needs the admin token. Without either, requests use the global
+# brand_rules.json store. Compiled
+# snapshots (matcher, rendered prompt, prompt hash) live in an LRU keyed on
+# (rule set id, version), so a tenant's rules are compiled once per change.
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from time import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from brand_matcher import BrandMatcher
+from models import BrandRule, BrandRuleSet
+from proof_cache import sha256_hex
+from rules_store import RulesSnapshot
+
+_LIST_FIELDS = ("abbreviations", "legal_names", "disallow")
+
+
+def api_key_sha(api_key: str) -> str:
+    return sha256_hex(api_key.strip())
+
+
+def rule_set_rules(rs: BrandRuleSet) -> List[Dict[str, Any]]:
+    # Same shape as brand_rules.json entries
+    out = []
+    for b in rs.brands:
+        rule: Dict[str, Any] = {"name": b.name}
+        if b.preferred:
+            rule["preferred"] = b.preferred
+        for field in _LIST_FIELDS:
+            values = json.loads(getattr(b, f"{field}_json") or "[]")
+            if values:
+                rule[field] = values
+        out.append(rule)
+    return out
+
+
+def validate_rules(rules: Any) -> List[Dict[str, Any]]:
+    if not isinstance(rules, list):
+        raise ValueError("rules must be a list of brand objects")
+    for i, r in enumerate(rules):
+        if not isinstance(r, dict) or not str(r.get("name") or "").strip():
+            raise ValueError(f"rules[{i}] needs a non-empty name")
+        for field in _LIST_FIELDS:
+            v = r.get(field, [])
+            if not isinstance(v, list) or not all(isinstance(x, str) for x in v):
+                raise ValueError(f"rules[{i}].{field} must be a list of strings")
+    return rules
+
+
+def replace_rules(rs: BrandRuleSet, rules: List[Dict[str, Any]]) -> None:
+    """Replace the brands of `rs` (caller commits) and bump its version."""
+    rs.brands = [
+        BrandRule(
+            position=i,
+            name=r["name"].strip(),
+            preferred=(r.get("preferred") or None),
+            **{f"{field}_json": json.dumps(r.get(field) or []) for field in _LIST_FIELDS},
+        )
+        for i, r in enumerate(rules)
+    ]
+    rs.version = (rs.version or 0) + 1
+    rs.updated_at = datetime.utcnow()
+
+
+def find_rule_set(api_key: Optional[str], name: Optional[str]) -> Optional[BrandRuleSet]:
+    if api_key:
+        return BrandRuleSet.query.filter_by(api_key_sha=api_key_sha(api_key)).first()
+    if name:
+        return BrandRuleSet.query.filter_by(name=name).first()
+    return None
+
+
+class RuleSetCache:
+    """LRU of compiled RulesSnapshots keyed on (rule set id, version)."""
+
+    def __init__(self, build_prompt: Callable[[List[Dict[str, Any]]], str], max_items: int = 64):
+        self._build_prompt = build_prompt
+        self.max_items = max(1, max_items)
+        self._data: "OrderedDict[Tuple[int, int], RulesSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, rs: BrandRuleSet) -> RulesSnapshot:
+        key = (rs.id, rs.version)
+        with self._lock:
+            snap = self._data.get(key)
+            if snap is not None:
+                self._data.move_to_end(key)
+                return snap
+        rules = rule_set_rules(rs)
+        prompt = self._build_prompt(rules)
+        snap = RulesSnapshot(rules, float(rs.version), time(), prompt, sha256_hex(prompt), BrandMatcher(rules))
+        with self._lock:
+            self._data[key] = snap
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+        return snap
+
+    def evict(self, rule_set_id: int) -> None:
+        with self._lock:
+            for key in [k for k in self._data if k[0] == rule_set_id]:
+                del self._data[key]
+
+
+def rule_set_to_dict(rs: BrandRuleSet, with_rules: bool = False) -> Dict[str, Any]:
+    out: Dict[str, Any] = {
+        "name": rs.name,
+        "version": rs.version,
+        "has_api_key": bool(rs.api_key_sha),
+        "brand_count": len(rs.brands),
+        "created_at": rs.created_at.isoformat() + "Z",
+        "updated_at": rs.updated_at.isoformat() + "Z",
+    }
+    if with_rules:
+        out["rules"] = rule_set_rules(rs)
+    return out
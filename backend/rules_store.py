@@ -0,0 +1,95 @@
+# backend/rules_store.py — brand rules loaded once, with everything derived from them memoized
+#
+# Parsing brand_rules.json, rendering the system prompt, hashing it and compiling the brand
+# matcher all happen once per change of the file rather than once per request. The file's
+# mtime is checked at most every `check_interval` seconds; reload() forces a refresh.
+# prompt_for() renders (and memoizes) prompts limited to the brands a document mentions.
+import os
+import threading
+from collections import OrderedDict
+from time import time
+from typing import Any, Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from brand_matcher import BrandMatcher
+from proof_cache import sha256_hex
+
+
+class RulesSnapshot(NamedTuple):
+    rules: List[Dict[str, Any]]
+    mtime: float
+    loaded_at: float
+    system_prompt: str
+    prompt_sha: str
+    matcher: BrandMatcher
+
+
+PROMPT_VARIANTS_MAX = 256   # memoized per-brand-subset prompts per rules version
+
+
+class RulesStore:
+    def __init__(self, path, load: Callable[[str], List[Dict[str, Any]]],
+                 build_prompt: Callable[[List[Dict[str, Any]]], str], check_interval: float = 2.0):
+        self.path = str(path)
+        self._load = load
+        self._build_prompt = build_prompt
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snap: Optional[RulesSnapshot] = None
+        self._checked_at = 0.0
+        self._subset_prompts: "OrderedDict[Tuple[str, FrozenSet[int]], Tuple[str, str]]" = OrderedDict()
+
+    def _mtime(self) -> float:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return -1.0
+
+    def _compile(self, mtime: float) -> RulesSnapshot:
+        rules = self._load(self.path) if mtime >= 0 else []
+        prompt = self._build_prompt(rules)
+        return RulesSnapshot(rules, mtime, time(), prompt, sha256_hex(prompt), BrandMatcher(rules))
+
+    def snapshot(self) -> RulesSnapshot:
+        snap = self._snap
+        now = time()
+        if snap is not None and now - self._checked_at < self.check_interval:
+            return snap
+        with self._lock:
+            self._checked_at = now
+            mtime = self._mtime()
+            if self._snap is None or self._snap.mtime != mtime:
+                try:
+                    self._snap = self._compile(mtime)
+                    print(f"Brand rules loaded: {len(self._snap.rules)} brand(s), prompt {self._snap.prompt_sha[:12]}")
+                except Exception as e:
+                    # Keep serving the last good rules while the file is mid-edit or invalid
+                    print("WARN: brand rules reload failed:", e)
+                    if self._snap is None:
+                        self._snap = self._compile(-1.0)
+            return self._snap
+
+    def prompt_for(self, snap: RulesSnapshot, brand_ids: FrozenSet[int]) -> Tuple[str, str]:
+        """(system prompt, sha) covering only the brands in `brand_ids` (indexes into snap.rules)."""
+        if len(brand_ids) == len(snap.rules):
+            return snap.system_prompt, snap.prompt_sha
+        key = (snap.prompt_sha, brand_ids)
+        with self._lock:
+            hit = self._subset_prompts.get(key)
+            if hit is not None:
+                self._subset_prompts.move_to_end(key)
+                return hit
+        prompt = self._build_prompt([snap.rules[i] for i in sorted(brand_ids)])
+        hit = (prompt, sha256_hex(prompt))
+        with self._lock:
+            self._subset_prompts[key] = hit
+            while len(self._subset_prompts) > PROMPT_VARIANTS_MAX:
+                self._subset_prompts.popitem(last=False)
+        return hit
+
+    def reload(self) -> RulesSnapshot:
+        """Recompile now, regardless of mtime; raises if the file can't be parsed."""
+        with self._lock:
+            snap = self._compile(self._mtime())
+            self._snap = snap
+            self._checked_at = time()
+            return snap
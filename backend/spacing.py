@@ -0,0 +1,117 @@
+# backend/spacing.py — single-pass scanner for spacing problems
+#
+# One compiled scanner makes a single pass over each page and finds only suspicious
+# whitespace runs (2+ spaces, a Unicode space, a space before punctuation). Each run is
+# classified once from its neighbours, so a run that several of the old per-line regexes
+# (plus the separate Unicode-space scan) would each have reported yields a single issue.
+import os
+import re
+from typing import Any, Dict, List
+
+UNICODE_SPACES = "\u00A0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200A\u202F\u205F\u3000"
+PUNCT = ",.;:?!"
+
+_SP = r"[ \t" + re.escape(UNICODE_SPACES) + r"]"
+_UNI = "[" + re.escape(UNICODE_SPACES) + "]"
+_P = "[" + re.escape(PUNCT) + "]"
+
+# The pattern opens with a single space-class character, which lets the regex engine skip
+# ahead with a fast set scan; single ASCII spaces between words fail immediately.
+SPACING_SCANNER = re.compile(rf"{_SP}(?:{_SP}+|(?<={_UNI})|(?={_P}))")
+
+# Issues per page and rule before the rest are folded into one "and N more" issue
+SPACING_MAX_PER_RULE = int(os.getenv("SPACING_MAX_PER_RULE", "25"))
+
+_PROBLEM = {
+    "before_punc": "Space before punctuation “{}”.",
+    "after_punc":  "Multiple spaces after “{}”.",
+    "leading":     "Leading extra spaces at line start.",
+    "trailing":    "Trailing extra spaces at line end.",
+    "between":     "Multiple consecutive spaces between words.",
+    "unicode":     "Unicode space detected (e.g., NBSP, thin, narrow no-break).",
+}
+_SUGGESTION = {
+    "before_punc": "Remove the space before “{}”.",
+    "after_punc":  "Use a single space after punctuation.",
+    "leading":     "Remove leading spaces unless an indent is intended.",
+    "trailing":    "Remove trailing spaces.",
+    "between":     "Replace “{}” with “{}”.",
+    "unicode":     "Replace with a regular ASCII space.",
+}
+_UNICODE_NOTE = " Includes a Unicode space (e.g., NBSP)."
+
+
+def scan_page(text: str, page_no: int, max_per_rule: int = SPACING_MAX_PER_RULE) -> List[Dict[str, Any]]:
+    issues: List[Dict[str, Any]] = []
+    counts: Dict[str, int] = {}
+    n_text = len(text)
+    for m in SPACING_SCANNER.finditer(text):
+        start, end = m.span()
+        prev = text[start - 1] if start else "\n"
+        nxt = text[end] if end < n_text else "\n"
+        if nxt in PUNCT:
+            rule = "before_punc"
+        elif end - start < 2:
+            rule = "unicode"
+        elif prev in PUNCT:
+            rule = "after_punc"
+        elif prev == "\n":
+            rule = "leading"
+        elif nxt == "\n":
+            rule = "trailing"
+        else:
+            rule = "between"
+        n = counts.get(rule, 0) + 1
+        counts[rule] = n
+        if max_per_rule and n > max_per_rule:
+            continue
+
+        line_start = text.rfind("\n", 0, start) + 1
+        line_end = text.find("\n", end)
+        if line_end < 0:
+            line_end = n_text
+        if rule == "leading":
+            excerpt = text[line_start: min(line_end, line_start + 80)]
+        elif rule == "trailing":
+            excerpt = text[max(line_start, line_end - 80): line_end]
+        else:
+            excerpt = text[max(line_start, start - 40): min(line_end, end + 40)]
+
+        problem = _PROBLEM[rule]
+        suggestion = _SUGGESTION[rule]
+        if rule == "before_punc":
+            problem = problem.format(text[end])
+            suggestion = suggestion.format(text[end])
+        elif rule == "after_punc":
+            problem = problem.format(text[start - 1])
+        elif rule == "between":
+            suggestion = suggestion.format(text[start - 1:end + 1], text[start - 1] + " " + text[end])
+        if rule != "unicode" and not m.group().isascii():
+            problem += _UNICODE_NOTE
+        issues.append({
+            "type": "spacing",
+            "page": page_no,
+            "sentence_or_excerpt": excerpt,
+            "problem": problem,
+            "suggestion": suggestion,
+            "span": [start, end],
+        })
+
+    for rule, n in counts.items():
+        if max_per_rule and n > max_per_rule:
+            issues.append({
+                "type": "spacing",
+                "page": page_no,
+                "sentence_or_excerpt": "",
+                "problem": f"{n - max_per_rule} more similar issue(s) on this page: " + _PROBLEM[rule].format("…"),
+                "suggestion": _SUGGESTION[rule].format("…", "…"),
+            })
+    return issues
+
+
+def find_extra_space_issues(pages: List[Dict[str, Any]], max_per_rule: int = SPACING_MAX_PER_RULE) -> List[Dict[str, Any]]:
+    issues: List[Dict[str, Any]] = []
+    for p in pages:
+        text = p.get("raw_text") or p.get("text") or ""
+        issues.extend(scan_page(text, p["page_number"], max_per_rule))
+    return issues
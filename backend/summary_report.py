@@ -0,0 +1,230 @@
+# backend/summary_report.py — the "Proofreading Summary" table, as PDF pages or CSV
+#
+# Rows are wrapped to their columns up front, so each row is exactly as tall as its text and
+# the table simply continues on as many pages as it needs (header repeated on each). All
+# vector drawing and text for a page goes into a single Shape, committed once per page,
+# instead of one content-stream edit per rectangle, line and text box. (A TextWriter would
+# keep non-Latin-1 characters but measured ~8x slower per line, so typography is folded.)
+import csv
+import io
+import os
+from typing import Any, Dict, List, Sequence, Tuple
+
+import fitz  # PyMuPDF
+
+SUMMARY_MODES = ("append", "none")
+SUMMARY_FORMATS = ("pdf", "csv")
+SUMMARY_MAX_CELL_LINES = int(os.getenv("SUMMARY_MAX_CELL_LINES", "6"))   # longer cells end in "..."
+
+COLUMNS = (   # (header, share of the usable width, issue field)
+    ("Pg", 0.06, "page"),
+    ("Type", 0.13, "type"),
+    ("Excerpt / Sentence", 0.31, "sentence_or_excerpt"),
+    ("Problem", 0.25, "problem"),
+    ("Suggestion", 0.25, "suggestion"),
+)
+
+MARGIN = 36
+FONT = "helv"
+FONTSIZE = 8.5
+LEADING = FONTSIZE * 1.25
+PAD = 3
+HEADER_H = 18
+TITLE_FONTSIZE = 18
+
+_HEADER_FILL = (0.92, 0.92, 0.92)
+_STRIPE_FILL = (0.975, 0.975, 0.975)
+_GRID = (0.8, 0.8, 0.8)
+
+Row = List[List[str]]   # one list of wrapped lines per column
+
+# The base-14 "helv" font is written Latin-1 encoded; fold common typography into it
+_LATIN1 = str.maketrans({
+    "\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"', "\u2013": "-", "\u2014": "-",
+    "\u2022": "\u00b7", "\u2026": "...", "\u00a0": " ", "\u2009": " ", "\u202f": " ",
+})
+
+
+class _Wrapper:
+    """Greedy word wrap against measured Helvetica widths (word widths cached per run)."""
+
+    def __init__(self, fontsize: float = FONTSIZE):
+        self.font = fitz.Font(FONT)
+        self.fontsize = fontsize
+        self._widths: Dict[str, float] = {}
+
+    def width(self, s: str) -> float:
+        w = self._widths.get(s)
+        if w is None:
+            w = self._widths[s] = self.font.text_length(s, fontsize=self.fontsize)
+        return w
+
+    def _fit(self, word: str, max_w: float) -> Tuple[str, str]:
+        # Split a single word that is wider than the column
+        cut = len(word)
+        while cut > 1 and self.width(word[:cut]) > max_w:
+            cut -= 1
+        return word[:cut], word[cut:]
+
+    def wrap(self, text: str, max_w: float, max_lines: int) -> List[str]:
+        # Explicit line breaks (merged issues list one problem per line) are kept
+        lines: List[str] = []
+        for para in (text or "").translate(_LATIN1).splitlines() or [""]:
+            lines.extend(self._wrap_line(para, max_w, max_lines + 1 - len(lines)))
+            if len(lines) > max_lines:
+                break
+        if len(lines) > max_lines:
+            last = lines[max_lines - 1]
+            while last and self.width(last + "...") > max_w:
+                last = last[:-1]
+            lines = lines[:max_lines - 1] + [last.rstrip() + "..."]
+        return lines or [""]
+
+    def _wrap_line(self, text: str, max_w: float, limit: int) -> List[str]:
+        words = " ".join(text.split()).split(" ")
+        space = self.width(" ")
+        lines: List[str] = []
+        cur, cur_w = "", 0.0
+        i = 0
+        while i < len(words) and len(lines) < limit:
+            word = words[i]
+            w = self.width(word)
+            if not cur:
+                if w > max_w:
+                    head, words[i] = self._fit(word, max_w)
+                    lines.append(head)
+                    continue
+                cur, cur_w = word, w
+            elif cur_w + space + w <= max_w:
+                cur, cur_w = f"{cur} {word}", cur_w + space + w
+            else:
+                lines.append(cur)
+                cur, cur_w = "", 0.0
+                continue
+            i += 1
+        if cur and len(lines) < limit:
+            lines.append(cur)
+        return lines
+
+
+def _cell(issue: Dict[str, Any], field: str) -> str:
+    value = issue.get(field)
+    return "" if value is None else str(value)
+
+
+def _pdf_cell(issue: Dict[str, Any], field: str) -> str:
+    text = _cell(issue, field)
+    return text.replace("/", " / ") if field == "type" else text   # merged types wrap at the slash
+
+
+def _column_x(width: float) -> List[float]:
+    usable = width - 2 * MARGIN
+    xs = [float(MARGIN)]
+    for _, frac, _ in COLUMNS[:-1]:
+        xs.append(xs[-1] + usable * frac)
+    xs.append(width - MARGIN)
+    return xs
+
+
+def _layout_rows(issues: Sequence[Dict[str, Any]], col_x: List[float]) -> List[Row]:
+    wrapper = _Wrapper()
+    rows: List[Row] = []
+    for it in issues:
+        rows.append([
+            wrapper.wrap(_pdf_cell(it, field), col_x[i + 1] - col_x[i] - 2 * PAD, SUMMARY_MAX_CELL_LINES)
+            for i, (_, _, field) in enumerate(COLUMNS)
+        ])
+    return rows
+
+
+def _row_height(row: Row) -> float:
+    return max(len(lines) for lines in row) * LEADING + 2 * PAD
+
+
+def _draw_header(shape: "fitz.Shape", col_x: List[float], y: float) -> float:
+    shape.draw_rect(fitz.Rect(col_x[0], y, col_x[-1], y + HEADER_H))
+    shape.finish(fill=_HEADER_FILL, color=_GRID, width=0.6)
+    for x in col_x[1:-1]:
+        shape.draw_line((x, y), (x, y + HEADER_H))
+    shape.finish(color=_GRID, width=0.6)
+    for i, (label, _, _) in enumerate(COLUMNS):
+        shape.insert_text((col_x[i] + PAD, y + HEADER_H - 5), label, fontsize=10, fontname=FONT)
+    return y + HEADER_H
+
+
+def add_summary_pages(doc: fitz.Document, issues: Sequence[Dict[str, Any]],
+                      title: str = "Proofreading Summary") -> int:
+    """Append the summary table to `doc` on as many pages as it needs; returns the page count."""
+    size = doc[0].rect if len(doc) else fitz.paper_rect("a4")
+    width, height = size.width, size.height
+    col_x = _column_x(width)
+    bottom = height - MARGIN
+    rows = _layout_rows(issues, col_x)
+
+    page = doc.new_page(width=width, height=height)
+    shape = page.new_shape()
+    y = MARGIN + TITLE_FONTSIZE
+    shape.insert_text((MARGIN, y), title.translate(_LATIN1), fontsize=TITLE_FONTSIZE, fontname=FONT)
+    y += 16
+    if not rows:
+        shape.insert_text((MARGIN, y + 10), "No issues detected.", fontsize=11, fontname=FONT)
+        shape.commit()
+        return 1
+    shape.insert_text((MARGIN, y), f"{len(rows)} issue(s)", fontsize=9, fontname=FONT)
+    y = _draw_header(shape, col_x, y + 8)
+
+    pages_added = 1
+    stripes: List[fitz.Rect] = []
+    grid: List[fitz.Rect] = []
+
+    def flush() -> None:
+        # Shape.commit() writes all paths (stripes, then grid) before the queued text
+        for r in stripes:
+            shape.draw_rect(r)
+        if stripes:
+            shape.finish(fill=_STRIPE_FILL, color=None, width=0)
+        for r in grid:
+            shape.draw_rect(r)
+            for x in col_x[1:-1]:
+                shape.draw_line((x, r.y0), (x, r.y1))
+        if grid:
+            shape.finish(color=_GRID, width=0.4)
+        shape.commit()
+        stripes.clear()
+        grid.clear()
+
+    for n, row in enumerate(rows):
+        row_h = _row_height(row)
+        if y + row_h > bottom:
+            flush()
+            page = doc.new_page(width=width, height=height)
+            shape = page.new_shape()
+            pages_added += 1
+            y = _draw_header(shape, col_x, MARGIN)
+        rect = fitz.Rect(col_x[0], y, col_x[-1], y + row_h)
+        if n % 2 == 0:
+            stripes.append(rect)
+        grid.append(rect)
+        for i, lines in enumerate(row):
+            if lines[0] or len(lines) > 1:
+                shape.insert_text((col_x[i] + PAD, y + PAD + FONTSIZE), lines,
+                                  fontsize=FONTSIZE, fontname=FONT, lineheight=LEADING / FONTSIZE)
+        y += row_h
+    flush()
+    return pages_added
+
+
+def summary_pdf(issues: Sequence[Dict[str, Any]], title: str = "Proofreading Summary") -> bytes:
+    """The summary table as its own small PDF (no copy of the proofread document)."""
+    with fitz.open() as doc:
+        add_summary_pages(doc, issues, title=title)
+        return doc.tobytes(garbage=3, deflate=True)
+
+
+def summary_csv(issues: Sequence[Dict[str, Any]]) -> str:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow([label for label, _, _ in COLUMNS])
+    for it in issues:
+        writer.writerow([_cell(it, field) for _, _, field in COLUMNS])
+    return out.getvalue()
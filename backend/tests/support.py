@@ -0,0 +1,30 @@
+# backend/tests/support.py — import app.py configured for offline tests
+#
+# Run from backend/:  python -m unittest discover -s tests -t .
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+_TMP = tempfile.mkdtemp(prefix="agent-hub-tests-")
+
+
+def load_app():
+    """app.py on the fake LLM backend with a throwaway database, jobs dir and caches."""
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'test.db')}"
+    os.environ["JOBS_DIR"] = os.path.join(_TMP, "jobs")
+    os.environ["PROFILE_DIR"] = os.path.join(_TMP, "profiles")
+    os.environ["AI_PAGE_CACHE"] = "0"
+    os.environ["ADMIN_API_TOKEN"] = "test-admin-token"
+    os.environ.pop("PROOF_CACHE_DB", None)
+    os.environ.pop("METRICS_DIR", None)
+    import app
+    return app
+
+
+def page(number: int, text: str):
+    return {"page_number": number, "text": text, "raw_text": text}
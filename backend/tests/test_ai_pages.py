@@ -0,0 +1,45 @@
+import unittest
+from unittest import mock
+
+from tests.support import load_app, page
+
+A = load_app()
+
+CHUNK = [page(7, "Seventh page says hello.\nMore text."), page(8, "Eighth page has the typo teh here.")]
+
+
+def issue(pg, excerpt):
+    return {"type": "spelling", "page": pg, "sentence_or_excerpt": excerpt, "problem": "p", "suggestion": "s"}
+
+
+class FixIssuePagesTest(unittest.TestCase):
+    def test_pages_in_the_chunk_are_kept(self):
+        out = A._fix_issue_pages([issue(8, "anything")], CHUNK)
+        self.assertEqual([it["page"] for it in out], [8])
+
+    def test_out_of_range_page_is_relocated_by_excerpt(self):
+        # chunk-relative numbering ("page 1") pointing at text that is really on page 8
+        out = A._fix_issue_pages([issue(1, "the typo teh"), issue("x", "Seventh  page says")], CHUNK)
+        self.assertEqual([it["page"] for it in out], [8, 7])
+
+    def test_out_of_range_page_with_unknown_excerpt_is_dropped(self):
+        out = A._fix_issue_pages([issue(99, "text that is nowhere"), issue(2, "")], CHUNK)
+        self.assertEqual(out, [])
+
+
+class TruncatedPagesTest(unittest.TestCase):
+    def test_long_pages_are_reported(self):
+        long_text = "word " * (A.AI_PAGE_MAX_CHARS // 5 + 10)
+        pages = [page(1, "Short page."), page(2, long_text)]
+        with mock.patch.object(A, "llm", A.FakeLLM()):
+            out = A.run_ai_proof(pages, incremental=False)
+        self.assertEqual(out["truncated_pages"], [2])
+
+    def test_short_pages_report_nothing(self):
+        with mock.patch.object(A, "llm", A.FakeLLM()):
+            out = A.run_ai_proof([page(1, "Short page.")], incremental=False)
+        self.assertNotIn("truncated_pages", out)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from unittest import mock
+
+from tests.support import load_app, page
+
+A = load_app()
+
+
+class FlakyLLM:
+    """Fails each chunk's first call (raising, or cutting the stream short), then behaves."""
+
+    def __init__(self, mode: str = "raise"):
+        self.inner = A.FakeLLM()
+        self.mode = mode
+        self.seen = set()
+        self.calls = 0
+
+    def available(self):
+        return True
+
+    def chat(self, est_tokens=0, stream=False, **kwargs):
+        self.calls += 1
+        key = kwargs["messages"][1]["content"]
+        first = key not in self.seen
+        self.seen.add(key)
+        if first and self.mode == "raise":
+            raise RuntimeError("upstream hiccup")
+        out = self.inner.chat(est_tokens, stream=stream, **kwargs)
+        if first and self.mode == "truncate":
+            if stream:
+                return iter(list(out)[:-1])
+            out.choices[0].message.content = out.choices[0].message.content[:-3]
+        return out
+
+
+PAGES = [page(n, f"Page {n} has a line of text that is long enough to quote.\nAnother line on page {n} here.")
+         for n in range(1, 4)]
+
+
+class RunAiProofRetryTest(unittest.TestCase):
+    def run_with(self, llm):
+        with mock.patch.object(A, "llm", llm), mock.patch.object(A, "sleep"):
+            return A.run_ai_proof(PAGES, incremental=False)
+
+    def test_failed_chunk_is_retried(self):
+        llm = FlakyLLM("raise")
+        retries_before = A.AI_CHUNK_RETRY_COUNT.series.get("[]", 0)
+        out = self.run_with(llm)
+        self.assertNotIn("failed_pages", out)
+        self.assertGreater(len(out["issues"]), 0)
+        self.assertEqual(llm.calls, 2 * len(A.chunk_pages(PAGES)))
+        self.assertGreater(A.AI_CHUNK_RETRY_COUNT.series.get("[]", 0), retries_before)
+
+    def test_truncated_output_is_retried(self):
+        out = self.run_with(FlakyLLM("truncate"))
+        self.assertNotIn("failed_pages", out)
+        self.assertGreater(len(out["issues"]), 0)
+
+    def test_chunk_failing_every_attempt_reports_its_pages(self):
+        llm = mock.Mock()
+        llm.available.return_value = True
+        llm.chat.side_effect = RuntimeError("down")
+        out = self.run_with(llm)
+        self.assertEqual(out["issues"], [])
+        self.assertEqual(sorted(out["failed_pages"]), [1, 2, 3])
+        self.assertEqual(llm.chat.call_count, (1 + A.AI_CHUNK_RETRIES) * len(A.chunk_pages(PAGES)))
+
+
+if __name__ == "__main__":
+    unittest.main()
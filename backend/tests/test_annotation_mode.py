@@ -0,0 +1,32 @@
+import io
+import unittest
+
+import fitz  # PyMuPDF
+
+from tests.support import load_app
+
+A = load_app()
+
+
+def pdf_bytes():
+    with fitz.open() as doc:
+        doc.new_page().insert_text((72, 72), "Hello  world , again and and again.")
+        return doc.tobytes()
+
+
+class AnnotationModeTest(unittest.TestCase):
+    def annotation_count(self, query=""):
+        client = A.app.test_client()
+        resp = client.post(f"/proofread?llm=none&summary=none{query}",
+                           data={"file": (io.BytesIO(pdf_bytes()), "a.pdf")}, content_type="multipart/form-data")
+        self.assertEqual(resp.status_code, 200)
+        return int(resp.headers["X-Annotation-Count"])
+
+    def test_default_is_one_annotation_per_issue(self):
+        each = self.annotation_count("&annotations=each")
+        self.assertEqual(self.annotation_count(), each)
+        self.assertLess(self.annotation_count("&annotations=grouped"), each)
+
+
+if __name__ == "__main__":
+    unittest.main()
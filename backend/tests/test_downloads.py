@@ -0,0 +1,47 @@
+import io
+import unittest
+
+import fitz  # PyMuPDF
+from werkzeug.http import parse_options_header
+
+from tests.support import load_app
+
+A = load_app()
+
+
+def pdf_bytes():
+    with fitz.open() as doc:
+        doc.new_page().insert_text((72, 72), "Hello  world , again.")
+        return doc.tobytes()
+
+
+class SummaryFilenameTest(unittest.TestCase):
+    def summary(self, filename, fmt):
+        client = A.app.test_client()
+        return client.post(f"/proofread-summary?format={fmt}&llm=none",
+                           data={"file": (io.BytesIO(pdf_bytes()), filename)}, content_type="multipart/form-data")
+
+    def assert_safe_disposition(self, resp, expected_ext):
+        self.assertEqual(resp.status_code, 200)
+        cd = resp.headers["Content-Disposition"]
+        cd.encode("latin-1")   # what a strict WSGI server (gunicorn) requires
+        self.assertTrue(cd.startswith("attachment;"))
+        self.assertIn(f"_summary.{expected_ext}", cd)
+        return cd
+
+    def test_non_ascii_filename_is_rfc5987_encoded(self):
+        for fmt in ("csv", "pdf"):
+            cd = self.assert_safe_disposition(self.summary("Révision été 文書.pdf", fmt), fmt)
+            self.assertIn("filename*=UTF-8''", cd)
+
+    def test_quote_in_filename(self):
+        # e.g. a job whose stored upload name has quotes
+        with A.app.test_request_context():
+            for fmt in ("csv", "pdf"):
+                resp = A._summary_response([], fmt, 'Q3 "final" é')
+                cd = self.assert_safe_disposition(resp, fmt)
+                _, params = parse_options_header(cd)
+                self.assertEqual(params["filename"], f'Q3 "final" é_summary.{fmt}')   # from filename*
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+from tests.support import BACKEND_DIR  # noqa: F401  (puts backend/ on sys.path)
+
+from issue_merge import merge_issues
+from local_rules import make_context, run_local_rules
+
+TEXT = ("Join us on Monday. September 1st at Bristol-Myers Squibb  headquarters ,  and bring a a friend.\n"
+        "A second line that is fine.")
+PAGES = [{"page_number": 1, "text": TEXT, "raw_text": TEXT}]
+BMS = [{"name": "Bristol Myers Squibb", "preferred": "Bristol Myers Squibb", "disallow": ["Bristol-Myers Squibb"]}]
+
+
+def issue(excerpt, problem, suggestion="Fix it.", itype="grammar", page=1, **extra):
+    return {"type": itype, "page": page, "sentence_or_excerpt": excerpt,
+            "problem": problem, "suggestion": suggestion, **extra}
+
+
+class MergeIssuesTest(unittest.TestCase):
+    def test_distinct_local_hits_on_one_line_stay_separate(self):
+        raw = run_local_rules(PAGES, make_context(brand_rules=BMS))
+        self.assertGreaterEqual(len(raw), 5)   # date, brand, 2x spacing, space before comma, repeated word
+        merged = merge_issues(raw, PAGES)
+        self.assertEqual(len(merged), len(raw))
+        self.assertFalse(any(it.get("merged_count") for it in merged))
+
+    def test_exact_duplicates_merge(self):
+        a = issue("Monday. September 1st", "Period after weekday.", itype="date_format")
+        merged = merge_issues([a, dict(a)], PAGES)
+        self.assertEqual(len(merged), 1)
+        self.assertEqual(merged[0]["merged_count"], 2)
+        self.assertEqual(merged[0]["problem"], "Period after weekday.")
+
+    def test_same_excerpt_different_type_stays_separate(self):
+        a = issue("on Monday. September 1st at", "Period after weekday.", itype="date_format")
+        b = issue("on Monday. September 1st at", "Should read 1.", itype="style")
+        self.assertEqual(len(merge_issues([a, b], PAGES)), 2)
+
+    def test_model_issue_quoting_the_same_text_merges_with_local_hit(self):
+        local = [it for it in run_local_rules(PAGES, make_context(brand_rules=BMS))
+                 if it["type"] == "brand_inconsistency"]
+        model = issue("Join us on Monday. September 1st at Bristol-Myers Squibb  headquarters",
+                      "Hyphenated brand name “Bristol-Myers Squibb”.",
+                      "Use “Bristol Myers Squibb” in body copy.", itype="brand")
+        merged = merge_issues([model] + local, PAGES)
+        self.assertEqual(len(merged), 1)
+        self.assertEqual(merged[0]["type"], "brand/brand_inconsistency")
+        # both suggestions survive
+        self.assertIn("in body copy", merged[0]["suggestion"])
+        self.assertIn("Use “Bristol Myers Squibb”.", merged[0]["suggestion"])
+        self.assertEqual(merged[0]["span"], local[0]["span"])
+
+    def test_model_issues_on_one_sentence_with_different_quotes_stay_separate(self):
+        sentence = "Join us on Monday. September 1st at Bristol-Myers Squibb  headquarters"
+        a = issue(sentence, "Period after “Monday.”", itype="punctuation")
+        b = issue(sentence, "Double space in “Squibb  headquarters”.", itype="spacing")
+        c = issue(sentence, "Sentence is long.", itype="style")   # no quote: exact-duplicate rule only
+        self.assertEqual(len(merge_issues([a, b, c], PAGES)), 3)
+
+    def test_overlapping_problem_spans_merge(self):
+        a = issue("x", "Repeated “a a”.", span=[TEXT.index("a a"), TEXT.index("a a") + 3], itype="repeated_word")
+        b = issue("x", "Article twice.", span=[TEXT.index("a a") + 2, TEXT.index("a a") + 9], itype="grammar")
+        merged = merge_issues([a, b], PAGES)
+        self.assertEqual(len(merged), 1)
+        self.assertEqual(merged[0]["merged_count"], 2)
+
+    def test_unlocated_issues_only_merge_when_identical(self):
+        a = issue("not on the page", "Problem one.")
+        b = issue("not on the page", "Problem two.")
+        self.assertEqual(len(merge_issues([a, b, dict(a)], PAGES)), 2)
+
+    def test_output_is_in_page_order(self):
+        a = issue("A second line", "Fine?", page=1)
+        b = issue("whatever", "Elsewhere.", page=2)
+        c = issue("Join us", "Opening.", page=1)
+        merged = merge_issues([b, a, c], PAGES)
+        self.assertEqual([m["problem"] for m in merged], ["Opening.", "Fine?", "Elsewhere."])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import threading
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from tests.support import load_app
+
+A = load_app()
+
+from db import db  # noqa: E402
+from jobs import JobRunner  # noqa: E402
+from models import ProofJob  # noqa: E402
+
+
+def add_job(status="queued", age=0.0, **fields):
+    job_id = uuid.uuid4().hex
+    with A.app.app_context():
+        db.session.add(ProofJob(id=job_id, status=status,
+                                updated_at=datetime.utcnow() - timedelta(seconds=age), **fields))
+        db.session.commit()
+    return job_id
+
+
+def status_of(job_id):
+    with A.app.app_context():
+        job = db.session.get(ProofJob, job_id)
+        return None if job is None else (job.status, job.error)
+
+
+class JobRunnerTest(unittest.TestCase):
+    def setUp(self):
+        with A.app.app_context():
+            ProofJob.query.delete()
+            db.session.commit()
+        self.seen = []
+
+    def runner(self, process=None, **kwargs):
+        runner = JobRunner(A.app, process or (lambda job, progress: self.seen.append(job.id)),
+                           workers=1, sweep_every=0, **kwargs)
+        self.addCleanup(runner._executor.shutdown, wait=True)
+        return runner
+
+    def test_claim_is_exclusive(self):
+        job_id = add_job()
+        runner = self.runner()
+        with A.app.app_context():
+            self.assertTrue(runner._claim(job_id))
+            self.assertFalse(runner._claim(job_id))
+        self.assertEqual(status_of(job_id)[0], "running")
+
+    def test_resume_requeues_queued_and_stale_running_jobs(self):
+        queued = add_job()
+        stale = add_job("running", age=3600)
+        busy = add_job("running", age=5)
+        finished = add_job("done")
+        runner = self.runner(stale_after=900)
+        self.assertEqual(runner.resume(), 2)
+        runner._executor.shutdown(wait=True)
+        self.assertEqual(sorted(self.seen), sorted([queued, stale]))
+        self.assertEqual(status_of(queued)[0], "done")
+        self.assertEqual(status_of(stale)[0], "done")
+        self.assertEqual(status_of(busy)[0], "running")
+        self.assertEqual(status_of(finished)[0], "done")
+
+    def test_failed_job_records_error(self):
+        def boom(job, progress):
+            progress("extracting", 0.2)
+            raise ValueError("bad pdf")
+        job_id = add_job()
+        runner = self.runner(boom)
+        self.assertTrue(runner.submit(job_id))
+        runner._executor.shutdown(wait=True)
+        self.assertEqual(status_of(job_id), ("failed", "bad pdf"))
+
+    def test_submit_refuses_when_queue_is_full(self):
+        release = threading.Event()
+        runner = self.runner(lambda job, progress: release.wait(5), max_queued=1)
+        self.assertTrue(runner.submit(add_job()))
+        self.assertFalse(runner.submit(add_job()))
+        release.set()
+
+    def test_sweep_deletes_expired_finished_jobs_and_files(self):
+        jobs_dir = Path(A.JOBS_DIR)
+        old_result = jobs_dir / "old.annotated.pdf"
+        old_result.write_bytes(b"%PDF")
+        expired = add_job("done", age=7200, result_path=str(old_result))
+        expired_failed = add_job("failed", age=7200, input_path=str(jobs_dir / "gone.pdf"))
+        recent = add_job("done", age=60)
+        running = add_job("running", age=7200)
+        runner = self.runner(ttl=3600)
+        self.assertEqual(runner.sweep(), 2)
+        self.assertFalse(old_result.exists())
+        self.assertIsNone(status_of(expired))
+        self.assertIsNone(status_of(expired_failed))
+        self.assertEqual(status_of(recent)[0], "done")
+        self.assertEqual(status_of(running)[0], "running")
+        self.assertEqual(self.runner(ttl=0).sweep(), 0)
+
+
+class ProcessJobTest(unittest.TestCase):
+    def test_input_is_removed_when_processing_fails(self):
+        path = Path(A.JOBS_DIR) / "not-a.pdf"
+        path.write_bytes(b"this is not a pdf")
+        job = ProofJob(id=uuid.uuid4().hex, input_path=str(path), upload_sha="x", mode="pdf")
+        with A.app.app_context(), self.assertRaises(Exception):
+            A._process_job(job, lambda stage, fraction: None)
+        self.assertFalse(path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
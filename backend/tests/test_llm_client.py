@@ -0,0 +1,170 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import openai
+
+from tests.support import BACKEND_DIR  # noqa: F401  (puts backend/ on sys.path)
+
+import llm_client
+from llm_client import CircuitBreaker, CircuitOpenError, LLMClient, TokenBucket
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def event(content=None, usage=None):
+    choices = [SimpleNamespace(delta=SimpleNamespace(content=content))] if content is not None else []
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+class FakeOpenAI:
+    """chat.completions.create() answers from a script: an exception, a response, or a list of events."""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        step = self.script.pop(0)
+        if isinstance(step, Exception):
+            raise step
+        if isinstance(step, list):
+            return self.events(step)
+        return step
+
+    @staticmethod
+    def events(steps):
+        for step in steps:
+            if isinstance(step, Exception):
+                raise step
+            yield step
+
+
+def client(fake, **kwargs):
+    kwargs.setdefault("breaker", CircuitBreaker(threshold=2, reset_after=30))
+    return LLMClient(None, max_retries=2, backoff_base=0, make_client=lambda: fake, **kwargs)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch.object(llm_client, "monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(threshold=3, reset_after=60)
+
+    def test_opens_after_threshold_consecutive_failures(self):
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "closed")
+        self.breaker.record_success()
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "closed")   # success reset the count
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "open")
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_lets_one_probe_through(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now += 61
+        self.assertEqual(self.breaker.state, "half-open")
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())   # the rest wait for the probe
+
+    def test_failed_probe_reopens_and_successful_probe_closes(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now += 61
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "open")
+        self.clock.now += 61
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertTrue(self.breaker.allow())
+
+
+class LLMClientTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(llm_client, "sleep")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_retryable_errors_are_retried_then_trip_the_breaker(self):
+        fake = FakeOpenAI(*[openai.APIConnectionError(request=None)] * 6)
+        c = client(fake)
+        for _ in range(2):
+            with self.assertRaises(openai.APIConnectionError):
+                c.chat(messages=[])
+        self.assertEqual(len(fake.calls), 6)
+        self.assertEqual(c.breaker.state, "open")
+        with self.assertRaises(CircuitOpenError):
+            c.chat(messages=[])
+
+    def test_non_retryable_errors_are_raised_at_once(self):
+        fake = FakeOpenAI(ValueError("bad request"))
+        c = client(fake)
+        with self.assertRaises(ValueError):
+            c.chat(messages=[])
+        self.assertEqual(len(fake.calls), 1)
+        self.assertEqual(c.breaker.state, "closed")
+
+    def test_stream_requests_usage_and_succeeds_only_when_consumed(self):
+        c = client(FakeOpenAI([event("a"), event("b"), event(usage=SimpleNamespace(total_tokens=10))]))
+        c.breaker.record_failure()
+        events = c.chat(stream=True, messages=[])
+        self.assertEqual(c.client.calls[0]["stream_options"], {"include_usage": True})
+        next(events)
+        self.assertEqual(c.breaker._failures, 1)   # not yet: the stream is still open
+        list(events)
+        self.assertEqual(c.breaker._failures, 0)
+
+    def test_error_mid_stream_counts_as_failure(self):
+        fake = FakeOpenAI([event("a"), RuntimeError("connection reset")],
+                          [event("a"), RuntimeError("connection reset")])
+        c = client(fake)
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                list(c.chat(stream=True, messages=[]))
+        self.assertEqual(c.breaker.state, "open")
+        self.assertEqual(len(fake.calls), 2)   # output had reached the caller: no silent retry
+
+    def test_error_before_first_event_is_retried(self):
+        fake = FakeOpenAI([openai.APIConnectionError(request=None)], [event("ok")])
+        c = client(fake)
+        self.assertEqual([e.choices[0].delta.content for e in c.chat(stream=True, messages=[])], ["ok"])
+        self.assertEqual(len(fake.calls), 2)
+        self.assertEqual(c.breaker.state, "closed")
+
+    def test_token_bucket_is_settled_against_reported_usage(self):
+        resp = SimpleNamespace(choices=[], usage=SimpleNamespace(total_tokens=100))
+        c = client(FakeOpenAI(resp, [event("x"), event(usage=SimpleNamespace(total_tokens=1500))]), tpm=6000)
+        c.chat(est_tokens=1000, messages=[])
+        self.assertAlmostEqual(c.tokens._tokens, 6000 - 100, delta=1)   # 900 over-estimate given back
+        list(c.chat(est_tokens=1000, stream=True, messages=[]))
+        self.assertAlmostEqual(c.tokens._tokens, 6000 - 1600, delta=1)  # 500 under-estimate charged
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_credit_is_capped_and_may_go_negative(self):
+        bucket = TokenBucket(60)
+        bucket.credit(100)
+        self.assertEqual(bucket._tokens, 60)
+        bucket.credit(-100)
+        self.assertEqual(bucket._tokens, -40)
+        self.assertFalse(bucket.acquire(1, timeout=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
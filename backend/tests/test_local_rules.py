@@ -0,0 +1,39 @@
+import unittest
+
+from tests.support import BACKEND_DIR  # noqa: F401  (puts backend/ on sys.path)
+
+from local_rules import make_context, run_local_rules
+
+
+def hits(text, rule):
+    pages = [{"page_number": 1, "text": text, "raw_text": text}]
+    return [it["problem"] for it in run_local_rules(pages, make_context(), rules=[rule])]
+
+
+class DoubledPunctuationTest(unittest.TestCase):
+    def test_abbreviation_before_comma_is_not_flagged(self):
+        for text in ("See e.g., the notes.", "That is, i.e., fine.", "Pens, paper, etc., and more.",
+                     "Acme Inc., a supplier.", "Sales in the U.S., rose."):
+            self.assertEqual(hits(text, "doubled_punctuation"), [], text)
+
+    def test_leading_dot_token_after_comma_is_not_flagged(self):
+        self.assertEqual(hits("Java, .NET and Go", "doubled_punctuation"), [])
+
+    def test_real_doubles_are_flagged(self):
+        self.assertEqual(hits("Wait,, no", "doubled_punctuation"), ["Doubled punctuation “,,”."])
+        self.assertEqual(hits("Total (12)., next", "doubled_punctuation"), ["Doubled punctuation “.,”."])
+        self.assertEqual(hits("wait.. what", "doubled_punctuation"), ["Doubled punctuation “..”."])
+        self.assertEqual(hits("and so on...", "doubled_punctuation"), [])
+
+
+class RepeatedWordTest(unittest.TestCase):
+    def test_repeat_on_one_line_is_flagged(self):
+        self.assertEqual(hits("bring the the cake", "repeated_words"), ["Repeated word “the”."])
+
+    def test_repeat_across_lines_is_not_flagged(self):
+        self.assertEqual(hits("Yes\nYes", "repeated_words"), [])
+        self.assertEqual(hits("Total\nTotal\n12", "repeated_words"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import io
+import unittest
+
+import fitz  # PyMuPDF
+
+from tests.support import load_app
+
+A = load_app()
+
+ADMIN = {"Authorization": "Bearer test-admin-token"}
+
+
+def pdf_bytes():
+    with fitz.open() as doc:
+        doc.new_page().insert_text((72, 72), "Hello  world.")
+        return doc.tobytes()
+
+
+class ProfileHeaderTest(unittest.TestCase):
+    def dryrun(self, headers):
+        client = A.app.test_client()
+        return client.post("/proofread-dryrun?llm=none", headers=headers,
+                           data={"file": (io.BytesIO(pdf_bytes()), "a.pdf")}, content_type="multipart/form-data")
+
+    def test_false_values_do_not_profile(self):
+        for value in ("0", "false", "no", "off", ""):
+            resp = self.dryrun({"X-Profile": value})   # no admin token needed when not profiling
+            self.assertEqual(resp.status_code, 200, value)
+            self.assertNotIn("X-Profile-Id", resp.headers)
+
+    def test_true_values_profile_for_admins(self):
+        for value in ("1", "true", "Yes"):
+            resp = self.dryrun({"X-Profile": value, **ADMIN})
+            self.assertEqual(resp.status_code, 200, value)
+            self.assertIn("X-Profile-Id", resp.headers)
+
+    def test_profiling_needs_admin_token(self):
+        self.assertEqual(self.dryrun({"X-Profile": "1"}).status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from unittest import mock
+
+from tests.support import load_app, page
+
+A = load_app()
+
+from brand_matcher import BrandMatcher  # noqa: E402
+
+BMS = {"name": "Bristol Myers Squibb", "preferred": "Bristol Myers Squibb", "abbreviations": ["BMS"],
+       "legal_names": ["Bristol-Myers Squibb Company"], "disallow": ["Bristol-Myers Squibb"]}
+
+
+class RecordingLLM(A.FakeLLM):
+    def __init__(self):
+        super().__init__()
+        self.system_prompts = []
+
+    def chat(self, est_tokens=0, **kwargs):
+        self.system_prompts.append(kwargs["messages"][0]["content"])
+        return super().chat(est_tokens, **kwargs)
+
+
+class BrandPromptPruningTest(unittest.TestCase):
+    def proof(self, text):
+        llm = RecordingLLM()
+        with mock.patch.object(A, "llm", llm), mock.patch.object(A, "BRAND_PROMPT_PRUNING", True):
+            out = A.run_ai_proof([page(1, text)], incremental=False)
+        return out, llm.system_prompts
+
+    def test_page_without_brands_gets_no_brand_policy(self):
+        out, prompts = self.proof("Nothing about any company on this page.")
+        self.assertEqual(len(prompts), 1)
+        self.assertNotIn("Bristol", prompts[0])
+        self.assertEqual(prompts[0], A.build_system_prompt([]))
+        tokens = out["prompt_tokens"]
+        self.assertEqual(tokens["full"] - tokens["sent"],
+                         A.estimate_tokens(A.make_system_prompt()) - A.estimate_tokens(prompts[0]))
+        self.assertGreater(tokens["full"], tokens["sent"])
+
+    def test_page_naming_a_brand_keeps_its_policy(self):
+        out, prompts = self.proof("Results from Bristol-Myers Squibb were strong.")
+        self.assertIn("Bristol-Myers Squibb Company", prompts[0])
+        self.assertEqual(out["prompt_tokens"]["full"], out["prompt_tokens"]["sent"])
+
+    def test_unlisted_misspelling_keeps_its_policy(self):
+        out, prompts = self.proof("Bristal Myers Squibb posted strong results.")
+        self.assertIn("Bristol-Myers Squibb Company", prompts[0])
+        self.assertEqual(out["prompt_tokens"]["full"], out["prompt_tokens"]["sent"])
+
+
+class BrandMentionsTest(unittest.TestCase):
+    def setUp(self):
+        self.matcher = BrandMatcher([BMS])
+
+    def test_exact_forms(self):
+        self.assertEqual(self.matcher.mentions("Results from bristol–myers squibb"), {0})
+        self.assertEqual(self.matcher.mentions("BMS rose"), {0})
+
+    def test_near_misses_of_name_tokens(self):
+        for text in ("Bristal Myers Squibb posted", "Bristal posted", "Sqiubb results", "Bristol Myres"):
+            self.assertEqual(self.matcher.mentions(text), {0}, text)
+
+    def test_unrelated_words_are_not_mentions(self):
+        for text in ("Nothing about any company on this page.", "Mister Brisket Squabble", "Company results"):
+            self.assertEqual(self.matcher.mentions(text), frozenset(), text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import io
+import unittest
+
+import fitz  # PyMuPDF
+
+from tests.support import load_app
+
+A = load_app()
+
+ADMIN = {"Authorization": "Bearer test-admin-token"}
+ACME = [{"name": "Acme", "preferred": "Acme Corp", "disallow": ["ACME corp"]}]
+GLOBEX = [{"name": "Globex", "preferred": "Globex Corporation", "disallow": ["GlobeX"]}]
+
+
+class TenantRuleSetTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client = A.app.test_client()
+        cls.keys = {}
+        for name, rules in (("acme", ACME), ("globex", GLOBEX)):
+            resp = cls.client.put(f"/admin/rule-sets/{name}", headers=ADMIN,
+                                  json={"rules": rules, "generate_api_key": True})
+            assert resp.status_code in (200, 201), resp.get_json()
+            cls.keys[name] = resp.get_json()["api_key"]
+
+    def brand_names(self, resp):
+        self.assertEqual(resp.status_code, 200, resp.get_json())
+        return [r["name"] for r in resp.get_json()["rules"]]
+
+    def test_api_key_selects_its_own_rule_set(self):
+        resp = self.client.get("/brand-rules", headers={"X-API-Key": self.keys["acme"]})
+        self.assertEqual(self.brand_names(resp), ["Acme"])
+
+    def test_no_key_uses_global_rules(self):
+        self.assertEqual(self.brand_names(self.client.get("/brand-rules")), ["Bristol Myers Squibb"])
+
+    def test_unknown_key_is_rejected(self):
+        resp = self.client.get("/brand-rules", headers={"X-API-Key": "not-a-key"})
+        self.assertEqual(resp.status_code, 404)
+
+    def test_naming_a_rule_set_needs_admin_token(self):
+        self.assertEqual(self.client.get("/brand-rules?rule_set=globex").status_code, 401)
+        resp = self.client.get("/brand-rules?rule_set=globex", headers={"X-API-Key": self.keys["acme"]})
+        self.assertEqual(resp.status_code, 401)
+        resp = self.client.get("/brand-rules?rule_set=globex",
+                               headers={"Authorization": "Bearer wrong"})
+        self.assertEqual(resp.status_code, 403)
+
+    def test_admin_can_name_a_rule_set(self):
+        resp = self.client.get("/brand-rules?rule_set=globex", headers=ADMIN)
+        self.assertEqual(self.brand_names(resp), ["Globex"])
+        self.assertEqual(self.client.get("/brand-rules?rule_set=nope", headers=ADMIN).status_code, 404)
+
+    def test_proofread_cannot_borrow_another_tenants_rules(self):
+        with fitz.open() as doc:
+            doc.new_page().insert_text((72, 72), "Globex and Acme.")
+            pdf = doc.tobytes()
+        resp = self.client.post("/proofread-dryrun?rule_set=globex", headers={"X-API-Key": self.keys["acme"]},
+                                data={"file": (io.BytesIO(pdf), "a.pdf")}, content_type="multipart/form-data")
+        self.assertEqual(resp.status_code, 401)
+
+
+class SystemPromptTest(unittest.TestCase):
+    def test_base_prompt_names_no_brand(self):
+        self.assertNotIn("Bristol", A.PROMPT_SYSTEM)
+        self.assertNotIn("Bristol", A.build_system_prompt(ACME))
+
+    def test_prompt_renders_selected_rules(self):
+        prompt = A.build_system_prompt(A.rules_store.snapshot().rules)
+        self.assertIn("Bristol Myers Squibb", prompt)
+        self.assertIn("Bristol-Myers Squibb Company", prompt)
+        self.assertIn("Acme Corp", A.build_system_prompt(ACME))
+
+    def test_prompt_asks_for_unlisted_variants(self):
+        self.assertIn("any other misspelling or variant of a preferred form", A.build_system_prompt(ACME))
+        self.assertNotIn("misspelling", A.build_system_prompt([]))
+
+
+if __name__ == "__main__":
+    unittest.main()
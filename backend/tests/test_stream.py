@@ -0,0 +1,83 @@
+import io
+import json
+import threading
+import unittest
+from unittest import mock
+
+import fitz  # PyMuPDF
+
+from tests.support import load_app, page
+
+A = load_app()
+
+
+def pdf_bytes():
+    with fitz.open() as doc:
+        doc.new_page().insert_text((72, 72), "Placeholder.")
+        return doc.tobytes()
+
+
+def parse_sse(body: str):
+    out = []
+    for block in body.split("\n\n"):
+        lines = [ln for ln in block.splitlines() if ln and not ln.startswith(":")]
+        if not lines:
+            continue
+        fields = dict(ln.split(": ", 1) for ln in lines)
+        out.append((fields["event"], json.loads(fields["data"])))
+    return out
+
+
+class RecordingLLM(A.FakeLLM):
+    def __init__(self):
+        super().__init__()
+        self.first_call = threading.Event()
+
+    def chat(self, est_tokens=0, **kwargs):
+        self.first_call.set()
+        return super().chat(est_tokens, **kwargs)
+
+
+class ProofreadStreamTest(unittest.TestCase):
+    def run_stream(self, n_pages=4):
+        llm = RecordingLLM()
+        waited = []
+
+        def pages(src, keep_textpages=False):
+            for n in range(1, n_pages + 1):
+                if n == n_pages:
+                    # the last page is only read once the model has been called for earlier ones
+                    waited.append(llm.first_call.wait(5))
+                yield page(n, f"Page {n} opens with a sentence that is long enough to quote here.\nEnd {n}.")
+
+        client = A.app.test_client()
+        with mock.patch.object(A, "llm", llm), mock.patch.object(A, "iter_pdf_text_per_page", pages), \
+                mock.patch.object(A, "AI_CHUNK_TOKENS", 10), mock.patch.object(A.result_cache, "get", return_value=None):
+            resp = client.post("/proofread-stream?llm=all", data={"file": (io.BytesIO(pdf_bytes()), "a.pdf")},
+                               content_type="multipart/form-data")
+            body = resp.get_data(as_text=True)
+        self.assertEqual(resp.status_code, 200)
+        return parse_sse(body), waited
+
+    def test_ai_chunks_start_before_extraction_finishes(self):
+        events, waited = self.run_stream()
+        self.assertEqual(waited, [True])
+        names = [e for e, _ in events]
+        self.assertIn("extracted", names)
+        self.assertEqual(names[-1], "done")
+        chunk_done = [d for e, d in events if e == "chunk_done"]
+        self.assertEqual(len(chunk_done), 4)   # one chunk per page at this budget
+        self.assertEqual(dict(events)["extracted"], {"pages": 4, "chunks": 4})
+
+    def test_done_carries_the_final_issue_list(self):
+        events, _ = self.run_stream(3)
+        done = events[-1][1]
+        self.assertEqual(done["issue_count"], len(done["issues"]))
+        self.assertEqual(done["llm_pages"], 3)
+        streamed = [d["issue"] for e, d in events if e == "issue"]
+        self.assertGreater(len(streamed), 0)
+        self.assertLessEqual(len(done["issues"]), done["raw_issue_count"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import fitz  # PyMuPDF
+
+from tests.support import load_app
+
+A = load_app()
+
+
+class PdfUploadTempFileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="uploads-")
+        for patcher in (mock.patch.object(tempfile, "tempdir", self.tmp),
+                        mock.patch.object(A, "UPLOAD_SPILL_BYTES", 1024)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def post(self, path, data: bytes):
+        return A.app.test_client().post(path, data={"file": (io.BytesIO(data), "big.pdf")},
+                                        content_type="multipart/form-data")
+
+    def test_corrupt_upload_above_spill_threshold_leaves_no_temp_file(self):
+        junk = b"not a pdf at all\n" * 1000
+        for path in ("/proofread-stream", "/proofread-dryrun", "/proofread"):
+            resp = self.post(path, junk)
+            self.assertGreaterEqual(resp.status_code, 400, path)
+            self.assertEqual(os.listdir(self.tmp), [], path)
+
+    def test_spilled_upload_is_removed_after_the_request(self):
+        with fitz.open() as doc:
+            for n in range(20):
+                doc.new_page().insert_text((72, 72), f"Page {n} text.")
+            pdf = doc.tobytes()
+        self.assertGreater(len(pdf), 1024)
+        resp = self.post("/proofread-dryrun?llm=none", pdf)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(os.listdir(self.tmp), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
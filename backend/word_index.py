@@ -0,0 +1,140 @@
+# backend/word_index.py — per-page word index for mapping issue excerpts to rectangles
+#
+# page.search_for() rescans the whole page for every needle and needs an exact match, so
+# it misses whenever the model normalizes whitespace, ligatures or a hyphenated line break.
+# PageWordIndex is built once per page from get_text("words") and looks excerpts up by
+# normalized token, so each lookup costs roughly O(excerpt length).
+import re
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import fitz  # PyMuPDF
+
+_HYPHENS = "-\u00ad\u2010\u2011"   # hyphen, soft hyphen, Unicode hyphens (not dashes)
+_STRIP_RE = re.compile(r"[^\w]+", re.UNICODE)
+_MAX_CANDIDATES = 64
+
+
+def norm_token(word: str) -> str:
+    # NFKC expands ligatures (ﬁ → fi); dropping punctuation and hyphens makes
+    # "Bristol-Myers", "Bristol‑Myers" and "Bristol-" + "Myers" compare equal.
+    return _STRIP_RE.sub("", unicodedata.normalize("NFKC", word).casefold())
+
+
+def excerpt_tokens(text: str) -> List[str]:
+    text = (text or "").strip()
+    if text.endswith("...") or text.endswith("…"):
+        text = text.rstrip(".…")          # truncated by safe_excerpt(); last word may be partial
+    raw = unicodedata.normalize("NFKC", text).split()
+    out: List[str] = []
+    carry = ""
+    for w in raw:
+        if w[-1] in _HYPHENS and len(w) > 1:
+            carry += w                     # "exam-" "ple" → "example"
+            continue
+        tok = norm_token(carry + w)
+        carry = ""
+        if tok:
+            out.append(tok)
+    if carry and norm_token(carry):
+        out.append(norm_token(carry))
+    return out
+
+
+class PageWordIndex:
+    """Normalized token stream for one page plus a token → positions index."""
+
+    def __init__(self, words: Sequence[Tuple]):
+        # words: (x0, y0, x1, y1, text, block_no, line_no, word_no) from get_text("words")
+        self.tokens: List[str] = []
+        self.spans: List[List[Tuple]] = []     # word tuples covered by each token
+        pending: Optional[Tuple[str, List[Tuple]]] = None
+        for n, w in enumerate(words):
+            text = w[4]
+            if pending is not None:
+                prefix, parts = pending
+                pending = None
+                tok = norm_token(prefix + text)
+                if tok:
+                    self._add(tok, parts + [w])
+                continue
+            # A hyphen at a line end usually splits one word across lines
+            nxt = words[n + 1] if n + 1 < len(words) else None
+            if (text and text[-1] in _HYPHENS and len(text) > 1
+                    and nxt is not None and (nxt[5], nxt[6]) != (w[5], w[6])):
+                pending = (text, [w])
+                continue
+            tok = norm_token(text)
+            if tok:
+                self._add(tok, [w])
+
+        self.positions: Dict[str, List[int]] = {}
+        for i, tok in enumerate(self.tokens):
+            self.positions.setdefault(tok, []).append(i)
+
+    def _add(self, tok: str, parts: List[Tuple]) -> None:
+        self.tokens.append(tok)
+        self.spans.append(parts)
+
+    @classmethod
+    def from_page(cls, page: fitz.Page, textpage: Optional[fitz.TextPage] = None) -> "PageWordIndex":
+        return cls(page.get_text("words", textpage=textpage))
+
+    def _score(self, start: int, q: List[str]) -> Tuple[int, int, int]:
+        # Greedy alignment tolerant of one-token insertions/deletions; returns (matches, first, last)
+        i, j, n = start, 0, len(self.tokens)
+        matches, first, last = 0, -1, -1
+        while i < n and j < len(q):
+            if self.tokens[i] == q[j] or (j == len(q) - 1 and len(q[j]) >= 3 and self.tokens[i].startswith(q[j])):
+                matches += 1
+                first = i if first < 0 else first
+                last = i
+                i += 1
+                j += 1
+            elif i + 1 < n and self.tokens[i + 1] == q[j]:
+                i += 1                      # extra word on the page
+            elif j + 1 < len(q) and self.tokens[i] == q[j + 1]:
+                j += 1                      # extra word in the excerpt
+            else:
+                i += 1
+                j += 1
+        return matches, first, last
+
+    def locate(self, excerpt: str, min_ratio: float = 0.75) -> List[fitz.Rect]:
+        q = excerpt_tokens(excerpt)
+        if not q:
+            return []
+        # Anchor on the rarest excerpt token that occurs on the page
+        anchor = None
+        for k, tok in enumerate(q):
+            hits = self.positions.get(tok)
+            if hits and (anchor is None or len(hits) < len(anchor[1])):
+                anchor = (k, hits)
+        if anchor is None:
+            return []
+        k, hits = anchor
+
+        best = (0, -1, -1)
+        for pos in hits[:_MAX_CANDIDATES]:
+            for start in (pos - k, pos - k - 1, pos - k + 1):
+                if start < 0:
+                    continue
+                score = self._score(start, q)
+                if score[0] > best[0]:
+                    best = score
+            if best[0] == len(q):
+                break
+        matches, first, last = best
+        if first < 0 or matches < max(1, min_ratio * len(q)):
+            return []
+        return self._rects(first, last)
+
+    def _rects(self, first: int, last: int) -> List[fitz.Rect]:
+        # One rectangle per text line, in reading order
+        lines: Dict[Tuple[int, int], fitz.Rect] = {}
+        for parts in self.spans[first:last + 1]:
+            for w in parts:
+                key = (w[5], w[6])
+                r = fitz.Rect(w[:4])
+                lines[key] = lines[key] | r if key in lines else r
+        return list(lines.values())
@@ -1,6 +1,6 @@
 // frontend/src/components/ProofreaderWidget.jsx
 import { useEffect, useMemo, useRef, useState } from "react";
-import { apiUrl } from "../lib/api"; // env-driven base
+import { apiUrl, postEventStream } from "../lib/api"; // env-driven base
 
 export default function ProofreaderWidget() {
   const [file, setFile] = useState(null);
@@ -10,6 +10,7 @@ export default function ProofreaderWidget() {
 
   const [uploadPct, setUploadPct] = useState(0);
   const [phase, setPhase] = useState("idle"); // idle | upload | processing | downloading
+  const [streamStatus, setStreamStatus] = useState("");
 
   const [dragActive, setDragActive] = useState(false);
   const [query, setQuery] = useState("");
@@ -111,25 +112,69 @@ export default function ProofreaderWidget() {
     });
   }
 
+  // Preview streams issues as they are found: local checks per page, AI issues per chunk,
+  // then the final (merged) list in "done" replaces everything shown so far.
   async function doDryRun() {
     if (!file) return;
     setLoading(true);
     setError("");
     setIssues(null);
+    setStreamStatus("");
+    setPhase("upload");
+    setUploadPct(0);
+
+    let local = [];
+    const aiByChunk = new Map();
+    const show = () => setIssues([...local, ...[...aiByChunk.values()].flat()]);
+    let pagesRead = 0;
+    let chunksDone = 0;
+    let chunksTotal = null;
+    const status = () =>
+      setStreamStatus(
+        `${pagesRead} page(s) read` +
+          (chunksDone || chunksTotal ? ` · AI ${chunksDone}/${chunksTotal ?? "…"} chunk(s)` : "")
+      );
+
     try {
-      const xhr = await xhrUpload({
-        url: apiUrl("/proofread-dryrun"),
-        file,
-        responseType: "json",
+      await postEventStream("/proofread-stream", file, {
+        onUploadProgress: setUploadPct,
+        onUploaded: () => setPhase("processing"),
+        onEvent: (name, data) => {
+          if (name === "page_extracted") {
+            pagesRead += 1;
+            status();
+          } else if (name === "issues" && data.source === "local") {
+            local = local.concat(data.issues || []);
+            show();
+          } else if (name === "issues") {
+            aiByChunk.set(data.chunk, (aiByChunk.get(data.chunk) || []).concat(data.issues || []));
+            show();
+          } else if (name === "issue") {
+            aiByChunk.set(data.chunk, (aiByChunk.get(data.chunk) || []).concat([data.issue]));
+            show();
+          } else if (name === "chunk_retry") {
+            aiByChunk.delete(data.chunk);
+            show();
+          } else if (name === "extracted") {
+            chunksTotal = data.chunks;
+            status();
+          } else if (name === "chunk_done") {
+            chunksDone = data.chunks_done;
+            status();
+          } else if (name === "done") {
+            setIssues(Array.isArray(data.issues) ? data.issues : []);
+          } else if (name === "error") {
+            throw new Error(data.detail || data.error || "Proofreading failed");
+          }
+        },
       });
-      const data = xhr.response || JSON.parse(xhr.responseText || "{}");
-      setIssues(Array.isArray(data?.issues) ? data.issues : []);
     } catch (err) {
       setError(err.message || String(err));
     } finally {
       setLoading(false);
       setPhase("idle");
       setUploadPct(0);
+      setStreamStatus("");
     }
   }
 
@@ -249,7 +294,7 @@ export default function ProofreaderWidget() {
             />
           </div>
           <div style={styles.progressLabels}>
-            <span>{phase === "upload" ? `Uploading ${uploadPct}%` : "Processing…"}</span>
+            <span>{phase === "upload" ? `Uploading ${uploadPct}%` : streamStatus || "Processing…"}</span>
           </div>
           {phase === "processing" && <div className="bar-animated" />}
         </div>
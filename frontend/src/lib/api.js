@@ -19,3 +19,75 @@ export async function upload(path, file, fieldName = "file") {
   return res;
 }
 
+
+// POST a file to a Server-Sent Events endpoint (e.g. /proofread-stream) and call
+// onEvent(name, data) for each event as it arrives. EventSource can't POST, so this
+// reads the response text incrementally from an XHR, which also gives upload progress.
+export function postEventStream(path, file, { onEvent, onUploadProgress, onUploaded, fieldName = "file" } = {}) {
+  return new Promise((resolve, reject) => {
+    const fd = new FormData();
+    fd.append(fieldName, file);
+
+    const xhr = new XMLHttpRequest();
+    xhr.open("POST", apiUrl(path));
+    xhr.timeout = 600000;
+
+    let seen = 0;
+    let buffer = "";
+    const parse = () => {
+      buffer += xhr.responseText.slice(seen);
+      seen = xhr.responseText.length;
+      let cut;
+      while ((cut = buffer.indexOf("\n\n")) >= 0) {
+        const block = buffer.slice(0, cut);
+        buffer = buffer.slice(cut + 2);
+        let name = "message";
+        const data = [];
+        for (const line of block.split("\n")) {
+          if (line.startsWith("event: ")) name = line.slice(7);
+          else if (line.startsWith("data: ")) data.push(line.slice(6));
+        }
+        if (data.length) onEvent?.(name, JSON.parse(data.join("\n")));
+      }
+    };
+
+    xhr.upload.onprogress = (e) => {
+      if (e.lengthComputable) onUploadProgress?.(Math.round((e.loaded / e.total) * 100));
+    };
+    xhr.upload.onloadend = () => onUploaded?.();
+    let failed = false;
+    const safeParse = () => {
+      try {
+        parse();
+        return true;
+      } catch (err) {
+        // a malformed event, or onEvent giving up (e.g. on an "error" event)
+        failed = true;
+        xhr.abort();
+        reject(err);
+        return false;
+      }
+    };
+
+    xhr.onprogress = () => {
+      if (!failed && xhr.status >= 200 && xhr.status < 300) safeParse();
+    };
+    xhr.onload = () => {
+      if (failed) return;
+      if (xhr.status >= 200 && xhr.status < 300) {
+        if (safeParse()) resolve();
+        return;
+      }
+      let msg = `Request failed (${xhr.status})`;
+      try {
+        const data = JSON.parse(xhr.responseText || "{}");
+        msg = data.detail || data.error || msg;
+      } catch {}
+      reject(new Error(msg));
+    };
+    xhr.onerror = () => reject(new Error("Network error"));
+    xhr.ontimeout = () => reject(new Error("Request timed out"));
+
+    xhr.send(fd);
+  });
+}